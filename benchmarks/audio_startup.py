@@ -0,0 +1,59 @@
+"""
+Audio backend startup benchmark.
+
+Imports utils.audio_player in fresh interpreters, as main.py does before the
+main window is created, and then initializes BASS the way the first playback
+or bass.start() does. Prints the median of each step: the import is what
+startup pays now, the import and the initialization together is what it paid
+when BASS was initialized at import time.
+
+Run from the repository root, where bass.dll is:
+    python benchmarks/audio_startup.py [runs]
+"""
+
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CHILD = """
+import json, time
+start = time.perf_counter()
+from utils.audio_player import bass
+imported = time.perf_counter()
+error = None
+try:
+    bass.initialize()
+except Exception as e:
+    error = str(e)
+initialized = time.perf_counter()
+print(json.dumps({"import": imported - start, "initialize": initialized - imported, "ready": bass.is_ready, "error": error}))
+"""
+
+
+def run_child() -> dict:
+    result = subprocess.run(
+        [sys.executable, "-c", CHILD], cwd=ROOT, capture_output=True, text=True, check=True
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main() -> None:
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    samples = [run_child() for _ in range(runs)]
+    if samples[0]["error"]:
+        print(f"BASS could not be initialized, only the import is measured: {samples[0]['error']}")
+
+    import_time = statistics.median(sample["import"] for sample in samples) * 1000
+    initialize_time = statistics.median(sample["initialize"] for sample in samples) * 1000
+    print(f"{runs} runs, median times")
+    print(f"import utils.audio_player:            {import_time:8.1f} ms")
+    print(f"BASS initialization (deferred):       {initialize_time:8.1f} ms")
+    print(f"import with BASS initialized eagerly: {import_time + initialize_time:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
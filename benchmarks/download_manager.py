@@ -0,0 +1,246 @@
+"""
+Download manager check against a local stand-in for the reciter servers.
+
+Serves 40 generated files from a local HTTP server that honours Range requests
+and misbehaves for some of them: the connection is dropped halfway through the
+first response, the first response is corrupted, the file is missing (404), or
+the expected sha256 given to the manager is wrong. DownloadManager downloads
+them into an audio cache in a temporary directory, and the check verifies that
+the dropped files were resumed with a Range request, the corrupted ones were
+downloaded again, the others are cached byte for byte, and only the missing
+files and those with a wrong checksum failed.
+
+A second run is cancelled halfway through slowly served files: no file may be
+reported failed, and a new manager must resume them with Range requests.
+
+Prints the outcome of every kind of file and exits with status 1 on a mismatch.
+
+Run from the repository root:
+    python benchmarks/download_manager.py
+"""
+
+import hashlib
+import os
+import random
+import re
+import sys
+import tempfile
+import threading
+import time
+import types
+from collections import defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+# The manager and the cache are imported without the package __init__, which loads BASS.
+package = types.ModuleType("utils.audio_player")
+package.__path__ = [os.path.join(ROOT, "utils", "audio_player")]
+sys.modules["utils.audio_player"] = package
+
+from utils.audio_player.audio_cache import AudioCache
+from utils.audio_player.download_manager import DownloadManager
+
+FILE_COUNT = 40
+KINDS = ["ok", "dropped", "corrupted", "missing", "bad_checksum"]
+SLOW_CHUNK = 16 * 1024
+_range_pattern = re.compile(r"bytes=(\d+)-")
+
+
+def get_kind(index: int) -> str:
+    return KINDS[index % len(KINDS)]
+
+
+class StandInServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, files: dict, slow: bool = False) -> None:
+        super().__init__(("127.0.0.1", 0), StandInHandler)
+        self.files = files
+        self.slow = slow
+        self.requests = defaultdict(list)
+        self.lock = threading.Lock()
+
+    def url(self, name: str) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}/{name}"
+
+    def handle_error(self, request, client_address) -> None:
+        # The manager closing its connections on cancel.
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args) -> None:
+        pass
+
+    def do_GET(self) -> None:
+        name = self.path.lstrip("/")
+        range_header = self.headers.get("Range")
+        with self.server.lock:
+            attempt = len(self.server.requests[name])
+            self.server.requests[name].append(range_header)
+
+        data = self.server.files.get(name)
+        if data is None or get_kind(int(name.split(".")[0])) == "missing":
+            self.send_response(404)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        kind = get_kind(int(name.split(".")[0]))
+        start = int(_range_pattern.match(range_header).group(1)) if range_header else 0
+        if start >= len(data):
+            self.send_response(416)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        if start:
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{len(data) - 1}/{len(data)}")
+        else:
+            self.send_response(200)
+        body = data[start:]
+        if kind == "corrupted" and attempt == 0:
+            body = bytes(byte ^ 0xFF for byte in body)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+
+        if kind == "dropped" and attempt == 0:
+            # Half of the file, then the connection is lost.
+            self.wfile.write(body[:len(body) // 2])
+            self.wfile.flush()
+            self.close_connection = True
+            return
+
+        if self.server.slow:
+            for offset in range(0, len(body), SLOW_CHUNK):
+                self.wfile.write(body[offset:offset + SLOW_CHUNK])
+                self.wfile.flush()
+                time.sleep(0.02)
+        else:
+            self.wfile.write(body)
+
+
+def start_server(files: dict, slow: bool = False) -> StandInServer:
+    server = StandInServer(files, slow)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def read_cached(cache: AudioCache, url: str) -> bytes:
+    path = cache.get_path(url)
+    if path is None:
+        return b""
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def check_faults(folder: str) -> list:
+    rng = random.Random(1)
+    # At least 256 KiB, so half a file is more than the chunk the manager writes at once.
+    files = {f"{index}.mp3": rng.randbytes(rng.randint(256, 512) * 1024) for index in range(FILE_COUNT)}
+    server = start_server(files)
+    cache = AudioCache(os.path.join(folder, "faults"), 1024 * 1024 * 1024)
+    urls = [server.url(name) for name in files]
+    checksums = {}
+    for index, (name, data) in enumerate(files.items()):
+        checksums[server.url(name)] = "0" * 64 if get_kind(index) == "bad_checksum" else hashlib.sha256(data).hexdigest()
+
+    manager = DownloadManager(cache)
+    start = time.perf_counter()
+    manager.download(urls, checksums)
+    manager.wait(120)
+    elapsed = time.perf_counter() - start
+    progress = manager.progress()
+    failed = manager.failed
+    manager.close()
+    server.shutdown()
+
+    errors = []
+    outcomes = defaultdict(lambda: [0, 0])
+    for index, (name, data) in enumerate(files.items()):
+        kind = get_kind(index)
+        url = server.url(name)
+        requests = server.requests[name]
+        cached = read_cached(cache, url) == data
+        outcomes[kind][0 if cached else 1] += 1
+
+        if kind in ("missing", "bad_checksum"):
+            if cached or url not in failed:
+                errors.append(f"{name} ({kind}) should have failed")
+        elif not cached or url in failed:
+            errors.append(f"{name} ({kind}) was not downloaded")
+        if kind == "dropped" and (len(requests) < 2 or not requests[1] or requests[1] == "bytes=0-"):
+            errors.append(f"{name} was not resumed with a Range request: {requests}")
+        if kind == "corrupted" and len(requests) < 2:
+            errors.append(f"{name} was not downloaded again after its checksum mismatch")
+
+    expected_failed = sum(get_kind(index) in ("missing", "bad_checksum") for index in range(FILE_COUNT))
+    if progress.failed_files != expected_failed or progress.completed_files != FILE_COUNT - expected_failed:
+        errors.append(f"unexpected progress {progress}")
+
+    print(f"{FILE_COUNT} files in {elapsed:.1f} s, {progress.downloaded_bytes / (1024 * 1024):.1f} MiB downloaded")
+    print(f"{'kind':<14} {'cached':>7} {'failed':>7}")
+    for kind in KINDS:
+        print(f"{kind:<14} {outcomes[kind][0]:>7} {outcomes[kind][1]:>7}")
+    return errors
+
+
+def check_cancel(folder: str) -> list:
+    rng = random.Random(2)
+    # Only files served without faults, slowly so the cancel happens in the middle.
+    files = {f"{index * len(KINDS)}.mp3": rng.randbytes(1024 * 1024) for index in range(8)}
+    server = start_server(files, slow=True)
+    cache = AudioCache(os.path.join(folder, "cancel"), 1024 * 1024 * 1024)
+    urls = [server.url(name) for name in files]
+
+    manager = DownloadManager(cache, max_workers=4)
+    manager.download(urls)
+    while manager.progress().downloaded_bytes < 1024 * 1024:
+        time.sleep(0.01)
+    manager.close()
+    deadline = time.monotonic() + 10
+    while not manager.progress().finished and time.monotonic() < deadline:
+        time.sleep(0.05)
+    cancelled = manager.progress()
+
+    server.slow = False
+    manager = DownloadManager(cache)
+    manager.download(urls)
+    manager.wait(60)
+    resumed = manager.progress()
+    manager.close()
+    server.shutdown()
+
+    errors = []
+    if not cancelled.finished or cancelled.failed_files or cancelled.cancelled_files + cancelled.completed_files != len(files):
+        errors.append(f"unexpected progress after cancel {cancelled}")
+    if resumed.completed_files != len(files) or any(read_cached(cache, url) != data for url, data in zip(urls, files.values())):
+        errors.append(f"the cancelled files were not completed {resumed}")
+    resumed_with_range = sum(any(requests[1:]) for requests in server.requests.values())
+    if not resumed_with_range:
+        errors.append("no cancelled file was resumed with a Range request")
+
+    print(f"\ncancelled: {cancelled.cancelled_files} files, {cancelled.failed_files} failed, "
+          f"{resumed_with_range} resumed with a Range request")
+    return errors
+
+
+def main() -> None:
+    with tempfile.TemporaryDirectory() as folder:
+        errors = check_faults(folder) + check_cancel(folder)
+
+    for error in errors:
+        print(error)
+    print("\nOK" if not errors else f"\n{len(errors)} errors")
+    sys.exit(1 if errors else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,255 @@
+"""
+Gapless playback benchmark.
+
+Runs GaplessPlayer against a stub BASS library written in Python: decoding
+streams read headerless float samples from files, named .wav as the player
+checks the extension, and the output stream is rendered by
+calling its STREAMPROC in blocks the way the BASS update thread does, with a
+device buffer delaying when rendered data is heard. A few ayah-sized tracks are
+queued back to back, and the harness prints for each boundary the gap between
+the last sample of a track and the first sample of the next one in the output,
+how far from the boundary on_track_changed was called, which is within one
+block as the stub only moves the heard position per block, and the time spent
+in the STREAMPROC.
+
+Run from the repository root:
+    python benchmarks/gapless_playback.py [tracks]
+"""
+
+import ctypes
+import os
+import statistics
+import sys
+import tempfile
+import time
+import types
+from array import array
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+FREQ = 44100
+CHANS = 2
+SAMPLE_SIZE = 4
+# 1411 frames, not a divisor of the track lengths, so boundaries fall inside blocks.
+BLOCK_SIZE = 1411 * CHANS * SAMPLE_SIZE
+DEVICE_BUFFER_BLOCKS = 4
+STREAMPROC_END = 0x80000000
+DATA_ERROR = 0xFFFFFFFF
+
+
+class StubChannel:
+    def __init__(self, freq: int, chans: int, data: bytes = b"", proc=None) -> None:
+        self.freq = freq
+        self.chans = chans
+        self.data = data
+        self.position = 0
+        self.proc = proc
+        self.playing = False
+        self.syncs = []
+
+
+class StubFunction:
+    """Accepts the argtypes and restype BassInitializer sets."""
+
+    def __init__(self, function) -> None:
+        self.function = function
+        self.argtypes = None
+        self.restype = None
+
+    def __call__(self, *args):
+        return self.function(*args)
+
+
+class StubBass:
+    """The BASS functions used by the players, on channels held in memory."""
+
+    def __init__(self) -> None:
+        self.channels = {}
+        self.next_handle = 1
+
+    def __getattr__(self, name):
+        method = getattr(type(self), "_" + name, None)
+        function = StubFunction(method.__get__(self) if method else lambda *args: 0)
+        setattr(self, name, function)
+        return function
+
+    def _add(self, channel: StubChannel) -> int:
+        handle = self.next_handle
+        self.next_handle += 1
+        self.channels[handle] = channel
+        return handle
+
+    def _BASS_Init(self, *args):
+        return 1
+
+    def _BASS_StreamCreateFile(self, mem, file, offset, length, flags):
+        if mem:
+            data = ctypes.string_at(file, length)
+        else:
+            with open(file, "rb") as f:
+                data = f.read()
+        # Files named *.mono.wav are single channel, to check format mismatches.
+        chans = 1 if not mem and file.endswith(b".mono.wav") else CHANS
+        return self._add(StubChannel(FREQ, chans, data))
+
+    def _BASS_StreamCreate(self, freq, chans, flags, proc, user):
+        return self._add(StubChannel(freq, chans, proc=proc))
+
+    def _BASS_ChannelGetInfo(self, handle, info):
+        channel = self.channels.get(handle)
+        if channel is None:
+            return 0
+        info._obj.freq = channel.freq
+        info._obj.chans = channel.chans
+        return 1
+
+    def _BASS_ChannelGetData(self, handle, buffer, length):
+        channel = self.channels.get(handle)
+        if channel is None:
+            return DATA_ERROR
+        if length == 0:
+            return len(channel.data) - channel.position
+        chunk = channel.data[channel.position:channel.position + length]
+        if not chunk:
+            return DATA_ERROR
+        ctypes.memmove(buffer, chunk, len(chunk))
+        channel.position += len(chunk)
+        return len(chunk)
+
+    def _BASS_ChannelIsActive(self, handle):
+        channel = self.channels.get(handle)
+        if channel is None:
+            return 0
+        if channel.proc is None:
+            return 1 if channel.position < len(channel.data) else 0
+        return 1 if channel.playing else 0
+
+    def _BASS_ChannelSetSync(self, handle, sync_type, param, proc, user):
+        self.channels[handle].syncs.append((param, proc))
+        return len(self.channels[handle].syncs)
+
+    def _BASS_ChannelPlay(self, handle, restart):
+        self.channels[handle].playing = True
+        return 1
+
+    def _BASS_ChannelStop(self, handle):
+        if handle in self.channels:
+            self.channels[handle].playing = False
+        return 1
+
+    def _BASS_StreamFree(self, handle):
+        return 1 if self.channels.pop(handle, None) is not None else 0
+
+    def _BASS_ChannelGetLength(self, handle, mode):
+        channel = self.channels.get(handle)
+        return len(channel.data) if channel is not None else -1
+
+    def _BASS_ChannelGetPosition(self, handle, mode):
+        channel = self.channels.get(handle)
+        return channel.position if channel is not None else -1
+
+    def _BASS_ChannelSetPosition(self, handle, position, mode):
+        self.channels[handle].position = position
+        return 1
+
+    def _BASS_ChannelBytes2Seconds(self, handle, position):
+        return position / (FREQ * CHANS * SAMPLE_SIZE)
+
+    def _BASS_ChannelSeconds2Bytes(self, handle, seconds):
+        return int(seconds * FREQ) * CHANS * SAMPLE_SIZE
+
+    def _BASS_ChannelSetAttribute(self, *args):
+        return 1
+
+    def render(self, handle: int, fill_times: list) -> bytes:
+        """Play an output stream to its end as the BASS update thread would, returns what was heard."""
+        channel = self.channels[handle]
+        buffer = ctypes.create_string_buffer(BLOCK_SIZE)
+        rendered = bytearray()
+        ended = False
+        while not ended or channel.position < len(rendered):
+            if not ended:
+                start = time.perf_counter()
+                result = channel.proc(handle, ctypes.addressof(buffer), BLOCK_SIZE, None)
+                fill_times.append(time.perf_counter() - start)
+                ended = bool(result & STREAMPROC_END)
+                rendered += buffer.raw[:result & ~STREAMPROC_END]
+            # The device plays what was rendered DEVICE_BUFFER_BLOCKS blocks ago.
+            heard = len(rendered) if ended else max(len(rendered) - DEVICE_BUFFER_BLOCKS * BLOCK_SIZE, 0)
+            channel.position = max(channel.position, heard)
+            for sync in [sync for sync in channel.syncs if sync[0] <= channel.position]:
+                channel.syncs.remove(sync)
+                sync[1](1, handle, 0, None)
+        channel.playing = False
+        return bytes(rendered)
+
+
+def install_stub() -> StubBass:
+    """Make BassInitializer load the stub and import the players without the package __init__."""
+    stub = StubBass()
+    real_cdll = ctypes.CDLL
+    ctypes.CDLL = lambda path, *args, **kwargs: stub if path.lower().endswith("bass.dll") else real_cdll(path, *args, **kwargs)
+    package = types.ModuleType("utils.audio_player")
+    package.__path__ = [os.path.join(ROOT, "utils", "audio_player")]
+    sys.modules["utils.audio_player"] = package
+    return stub
+
+
+def write_track(folder: str, index: int, seconds: float) -> tuple:
+    """Samples of track i are i * 1000 + frame / frames, so every boundary is recognisable."""
+    frames = int(seconds * FREQ)
+    samples = array("f", (index * 1000 + frame / frames for frame in range(frames) for _ in range(CHANS)))
+    path = os.path.join(folder, f"{index}.wav")
+    with open(path, "wb") as f:
+        samples.tofile(f)
+    return path, samples.tobytes()
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 6
+    stub = install_stub()
+    from utils.audio_player.gapless_player import GaplessPlayer
+
+    with tempfile.TemporaryDirectory() as folder:
+        # Ayah-like lengths between 1.5 and 9 seconds.
+        tracks = [write_track(folder, index, 1.5 + (index * 2.7) % 7.5) for index in range(count)]
+        mono_path = os.path.join(folder, "mono.mono.wav")
+        with open(mono_path, "wb") as f:
+            f.write(b"\0" * 4096)
+
+        player = GaplessPlayer(1.0)
+        changes = []
+        player.on_track_changed = lambda source: changes.append((source, stub.channels[player.current_channel].position))
+
+        player.load_audio(tracks[0][0])
+        for path, _ in tracks[1:]:
+            assert player.enqueue(path, after=player._queue[-1].source if player._queue else player.source)
+        assert not player.enqueue(mono_path), "a track of another format was queued"
+        assert not player.enqueue(tracks[0][0], after="missing"), "a track was queued after the wrong one"
+        player.play()
+
+        fill_times = []
+        output = stub.render(player.current_channel, fill_times)
+
+    expected = b"".join(data for _, data in tracks)
+    print(f"{count} tracks, {len(output) // (CHANS * SAMPLE_SIZE)} frames rendered in blocks of {BLOCK_SIZE // (CHANS * SAMPLE_SIZE)} frames")
+    print(f"output identical to the concatenated tracks: {output == expected}")
+
+    samples = array("f")
+    samples.frombytes(output)
+    boundary = 0
+    print(f"{'boundary':>8} {'gap (frames)':>13} {'track change error (frames)':>29}")
+    for index, (path, data) in enumerate(tracks[1:], 1):
+        boundary += len(tracks[index - 1][1])
+        first = next(i for i in range(0, len(samples), CHANS) if int(samples[i]) == index * 1000) * SAMPLE_SIZE
+        source, heard = next(change for change in changes if change[0] == path)
+        print(f"{index:>8} {(first - boundary) // (CHANS * SAMPLE_SIZE):>13} {(heard - boundary) // (CHANS * SAMPLE_SIZE):>29}")
+
+    print(f"track changes reported: {len(changes)} of {count - 1}")
+    print(f"STREAMPROC: {len(fill_times)} calls, median {statistics.median(fill_times) * 1e6:.1f} us, max {max(fill_times) * 1e6:.1f} us")
+
+
+if __name__ == "__main__":
+    main()
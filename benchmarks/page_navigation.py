@@ -0,0 +1,63 @@
+"""
+Page flipping benchmark.
+
+Flips through all 604 pages with the previous per-navigation SQL query and with
+the preloaded QuranCorpus, and prints the latency of each approach.
+
+Run from the repository root:
+    python benchmarks/page_navigation.py
+"""
+
+import os
+import sys
+import sqlite3
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.chdir(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core_functions.quran_class import QuranConst
+from core_functions.quran_corpus import QuranCorpus
+
+
+def sql_pages(db_file) -> float:
+    """The query pattern quran_mgr used before the corpus was introduced."""
+    conn = sqlite3.connect(db_file)
+    cursor = conn.cursor()
+    start = time.perf_counter()
+    for page_number in range(1, QuranConst.max_page + 1):
+        cursor.execute(f"SELECT * FROM quran WHERE page = {page_number}")
+        rows = cursor.fetchall()
+        data_list = [(row[0], row[1], row[2], row[3], row[4], row[5], row[6], row[7], row[8], row[9], row[10], None, None) for row in rows]
+    elapsed = time.perf_counter() - start
+    conn.close()
+    return elapsed
+
+
+def corpus_pages(db_file) -> float:
+    corpus = QuranCorpus.load(db_file)
+    start = time.perf_counter()
+    for page_number in range(1, QuranConst.max_page + 1):
+        data_list = corpus.get_division(QuranCorpus.PAGE, page_number)
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    db_file = QuranConst.databases[0]
+
+    load_start = time.perf_counter()
+    QuranCorpus.load(db_file)
+    load_time = time.perf_counter() - load_start
+
+    before = min(sql_pages(db_file) for _ in range(5))
+    after = min(corpus_pages(db_file) for _ in range(5))
+    pages = QuranConst.max_page
+
+    print(f"Corpus load (once per session): {load_time * 1000:.1f} ms")
+    print(f"SQL per page:    {before / pages * 1e6:8.1f} us  ({before * 1000:.1f} ms for {pages} pages)")
+    print(f"Corpus per page: {after / pages * 1e6:8.1f} us  ({after * 1000:.1f} ms for {pages} pages)")
+    print(f"Speedup: {before / after:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Tashkeel/hamza-insensitive search benchmark.
+
+Compares the query QuranSearchManager used to build, 13 nested REPLACE() calls
+applied to every verse, with LIKE and FTS5 matching on the precomputed
+normalized text stored in the search index.
+
+Run from the repository root:
+    python benchmarks/search_normalization.py
+"""
+
+import os
+import sys
+import sqlite3
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.chdir(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core_functions.search_index import SearchIndex, normalize_text
+
+SEARCH_TEXTS = ("الله", "الرحمن", "يؤمنون", "الصلاة", "انزلنا")
+ROUNDS = 10
+
+
+def replace_chain_query() -> str:
+    """The query built by QuranSearchManager.search with no_tashkil and no_hamza."""
+    query = "SELECT * FROM quran WHERE page >= ? AND page <= ? AND text LIKE ?;"
+    for char in ['َ', 'ً', 'ُ', 'ٌ', 'ِ', 'ٍ', 'ْ', 'ّ']:
+        query = query.replace('AND text', f"AND REPLACE(text, '{char}', '')")
+        query = query.replace('REPLACE(text', f"REPLACE(REPLACE(text, '{char}', '')")
+    for char in ['أ', 'إ', 'آ', 'ء', 'ؤ']:
+        query = query.replace('AND text', f"AND REPLACE(text, '{char}', 'ا')")
+        query = query.replace('REPLACE(text', f"REPLACE(REPLACE(text, '{char}', 'ا')")
+    return query
+
+
+def measure(cursor: sqlite3.Cursor, query: str, make_params) -> float:
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        for search_text in SEARCH_TEXTS:
+            cursor.execute(query, make_params(search_text))
+            cursor.fetchall()
+    return (time.perf_counter() - start) / (ROUNDS * len(SEARCH_TEXTS))
+
+
+def main() -> None:
+    SearchIndex.ensure_built()
+    conn = sqlite3.connect(SearchIndex.source_path)
+    cursor = conn.cursor()
+    cursor.execute("ATTACH DATABASE ? AS search_index;", (SearchIndex.file_path,))
+
+    column = SearchIndex.get_column(True, True)
+    results = {
+        "REPLACE chain": measure(
+            cursor, replace_chain_query(),
+            lambda text: (1, 604, f"%{text}%")
+        ),
+        "Stored text LIKE": measure(
+            cursor,
+            f"SELECT quran.* FROM search_index.verses JOIN quran ON quran.number = verses.number WHERE verses.{column} LIKE ? AND verses.number BETWEEN 1 AND 6236;",
+            lambda text: (f"%{normalize_text(text, True, True)}%",)
+        ),
+        "Stored text FTS5": measure(
+            cursor,
+            "SELECT quran.* FROM search_index.verses_substrings JOIN quran ON quran.number = verses_substrings.rowid WHERE verses_substrings MATCH ? AND verses_substrings.rowid BETWEEN 1 AND 6236;",
+            lambda text: (SearchIndex.build_match_query(column, normalize_text(text, True, True), False),)
+        ),
+    }
+    conn.close()
+
+    baseline = results["REPLACE chain"]
+    for name, elapsed in results.items():
+        print(f"{name:18} {elapsed * 1000:8.2f} ms per search  ({baseline / elapsed:5.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
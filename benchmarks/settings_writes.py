@@ -0,0 +1,102 @@
+"""
+Settings write stress benchmark.
+
+Replays holding a volume key down, the way VolumeController.adjust_volume and
+switch_category write a setting on every key repeat, against a config.ini in a
+temporary directory. Prints the time spent in the calls and the number of times
+config.ini was written, for the former full rewrite on every call and for
+SettingsManager, which writes the changes once after the keys are released.
+
+Run from the repository root:
+    python benchmarks/settings_writes.py [presses]
+"""
+
+import configparser
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.chdir(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.settings import SettingsManager
+
+
+def key_presses(count: int) -> list:
+    """The settings written by count volume key repeats, switching category every 50."""
+    writes = []
+    volume = 50
+    for press in range(count):
+        if press % 50 == 0:
+            writes.append({"audio": {"current_volume_category": press // 50 % 4}})
+        volume = max(0, min(100, volume + (1 if press % 200 < 100 else -1)))
+        writes.append({"audio": {"volume_level": volume}})
+    return writes
+
+
+def rewrite_every_call(path: str, writes: list) -> tuple:
+    """The former write_settings: the whole file is written and read back on every call."""
+    config = configparser.ConfigParser()
+    config.read_dict(SettingsManager.default_settings)
+    file_writes = 0
+    start = time.perf_counter()
+    for new_settings in writes:
+        config.read_dict(new_settings)
+        with open(path, "w", encoding="utf-8") as config_file:
+            config.write(config_file)
+        file_writes += 1
+        config.read(path, encoding="utf-8")
+    return time.perf_counter() - start, file_writes
+
+
+def debounced(path: str, writes: list) -> tuple:
+    SettingsManager.path = path
+    SettingsManager.config = configparser.ConfigParser()
+    SettingsManager.current_settings
+    SettingsManager.flush()
+
+    file_writes = 0
+    replace = os.replace
+
+    def counting_replace(*args, **kwargs):
+        nonlocal file_writes
+        file_writes += 1
+        return replace(*args, **kwargs)
+
+    os.replace = counting_replace
+    try:
+        start = time.perf_counter()
+        for new_settings in writes:
+            SettingsManager.write_settings(new_settings)
+        elapsed = time.perf_counter() - start
+        # The key is released: the pending flush runs once.
+        time.sleep(SettingsManager.flush_delay + 0.5)
+    finally:
+        os.replace = replace
+
+    expected = writes[-1]["audio"]["volume_level"]
+    saved = configparser.ConfigParser()
+    saved.read(path, encoding="utf-8")
+    assert saved.getint("audio", "volume_level") == expected, "the last volume was not saved"
+    return elapsed, file_writes
+
+
+def main() -> None:
+    presses = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    writes = key_presses(presses)
+
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, "config.ini")
+        old_time, old_writes = rewrite_every_call(path, writes)
+        os.remove(path)
+        new_time, new_writes = debounced(path, writes)
+
+    print(f"{len(writes)} settings writes from {presses} key presses")
+    print(f"{'':<24} {'ms total':>10} {'us per call':>12} {'file writes':>12}")
+    print(f"{'rewrite every call':<24} {old_time * 1000:>10.1f} {old_time / len(writes) * 1e6:>12.1f} {old_writes:>12}")
+    print(f"{'SettingsManager':<24} {new_time * 1000:>10.1f} {new_time / len(writes) * 1e6:>12.1f} {new_writes:>12}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Startup time budget check.
+
+Starts main.py with --profile-startup several times, the way it starts at
+login with --minimized unless --shown is given, waits for each startup report
+and closes the program. Prints the median of the total, of every phase and the
+slowest imports, and exits with status 1 when the median total is over the
+budget, so it can run before a release or in CI on a low-end machine.
+
+The first run after a reboot is the cold start that matters at login, later
+runs find the files in the OS cache. Close Albayan before running it, a
+running instance makes the started one exit.
+
+Run from the repository root:
+    python benchmarks/startup_budget.py [--budget MS] [--runs N] [--shown]
+
+The budget defaults to the ALBAYAN_STARTUP_BUDGET environment variable, or 2000 ms.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def profile_startup(shown: bool, timeout: float) -> dict:
+    with tempfile.TemporaryDirectory() as folder:
+        report_path = os.path.join(folder, "startup_profile.json")
+        command = [sys.executable, "main.py", f"--profile-startup={report_path}"]
+        if not shown:
+            command.append("--minimized")
+
+        process = subprocess.Popen(command, cwd=ROOT)
+        try:
+            deadline = time.monotonic() + timeout
+            while not os.path.exists(report_path):
+                if process.poll() is not None:
+                    raise RuntimeError(f"Albayan exited with status {process.returncode} before its startup report")
+                if time.monotonic() > deadline:
+                    raise RuntimeError(f"No startup report after {timeout} seconds")
+                time.sleep(0.05)
+            with open(report_path, encoding="utf-8") as f:
+                return json.load(f)
+        finally:
+            process.terminate()
+            process.wait()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--budget", type=float, default=float(os.environ.get("ALBAYAN_STARTUP_BUDGET", 2000)), help="maximum median startup time in ms")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--shown", action="store_true", help="start with the window shown instead of --minimized")
+    parser.add_argument("--timeout", type=float, default=60, help="seconds to wait for each report")
+    parser.add_argument("--top", type=int, default=15, help="number of slowest imports to print")
+    args = parser.parse_args()
+
+    reports = [profile_startup(args.shown, args.timeout) for _ in range(args.runs)]
+    totals = [report["total"] for report in reports]
+    total = statistics.median(totals)
+
+    print(f"{args.runs} runs {'shown' if args.shown else 'minimized'}, totals: {', '.join(f'{value:.0f}' for value in totals)} ms")
+    print(f"\n{'phase':<24} {'median ms':>10}")
+    for name in dict.fromkeys(phase["name"] for report in reports for phase in report["phases"]):
+        durations = [phase["duration"] for report in reports for phase in report["phases"] if phase["name"] == name]
+        print(f"{name:<24} {statistics.median(durations):>10.1f}")
+    for name in dict.fromkeys(mark for report in reports for mark in report["marks"]):
+        print(f"{'at ' + name:<24} {statistics.median(report['marks'][name] for report in reports if name in report['marks']):>10.1f}")
+    print(f"{'imports (self time)':<24} {statistics.median(report['import_total'] for report in reports):>10.1f}")
+
+    print(f"\n{'slowest imports':<48} {'cumulative':>10} {'self':>8}")
+    for entry in reports[-1]["imports"][:args.top]:
+        print(f"{entry['module']:<48} {entry['cumulative']:>10.1f} {entry['self']:>8.1f}")
+
+    print(f"\nmedian startup {total:.0f} ms, budget {args.budget:.0f} ms")
+    if total > args.budget:
+        print("Startup is over budget.")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
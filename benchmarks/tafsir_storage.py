@@ -0,0 +1,92 @@
+"""
+Compressed tafsir storage benchmark.
+
+Converts every installed tafaseer database to a CompressedTafsir file in a
+temporary directory, checks that each ayah reads back identical, and prints the
+file sizes and the single-ayah lookup latency of the database and of the
+compressed file, with and without the decompressed block already cached.
+
+Run from the repository root:
+    python benchmarks/tafsir_storage.py [zlib|zstd]
+"""
+
+import os
+import random
+import sys
+import sqlite3
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.chdir(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core_functions.tafsir_store import CompressedTafsir
+from utils.db_registry import DatabaseRegistry
+
+TAFASEER_DIR = os.path.join("database", "tafaseer")
+
+
+def read_database(db_path: str) -> dict:
+    conn = sqlite3.connect(db_path)
+    texts = {}
+    for surah_number in range(1, 115):
+        for text, number in conn.execute(f"SELECT text, number FROM tafsir_{surah_number};"):
+            texts[number] = text
+    conn.close()
+    return texts
+
+
+def database_lookup(db_path: str, numbers: list) -> float:
+    """The per-ayah query TafaseerManager runs against a database."""
+    conn = sqlite3.connect(db_path)
+    surahs = {number: surah_number for surah_number in range(1, 115) for (number,) in conn.execute(f"SELECT number FROM tafsir_{surah_number};")}
+    start = time.perf_counter()
+    for number in numbers:
+        conn.execute(f"SELECT text FROM tafsir_{surahs[number]} WHERE number = ?", [number]).fetchone()
+    elapsed = time.perf_counter() - start
+    conn.close()
+    return elapsed / len(numbers)
+
+
+def store_lookup(store: CompressedTafsir, numbers: list, cold: bool) -> float:
+    start = time.perf_counter()
+    for number in numbers:
+        if cold:
+            store._block_cache.clear()
+        store.get_text(number)
+    return (time.perf_counter() - start) / len(numbers)
+
+
+def main() -> None:
+    codec = sys.argv[1] if len(sys.argv) > 1 else None
+    db_files = sorted(name for name in os.listdir(TAFASEER_DIR) if name.lower().endswith(".db"))
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for name in db_files:
+            db_path = os.path.join(TAFASEER_DIR, name)
+            store_path = os.path.join(temp_dir, os.path.splitext(name)[0] + CompressedTafsir.extension)
+
+            start = time.perf_counter()
+            CompressedTafsir.build(db_path, store_path, codec)
+            build_time = time.perf_counter() - start
+            store = CompressedTafsir.open(store_path)
+
+            texts = read_database(db_path)
+            mismatches = sum(store.get_text(number) != (text or None) for number, text in texts.items())
+            numbers = list(texts)
+            random.shuffle(numbers)
+
+            db_size = os.path.getsize(db_path)
+            store_size = os.path.getsize(store_path)
+            print(f"{name} ({store.codec}, built in {build_time:.2f} s, {mismatches} mismatches)")
+            print(f"  size:            {db_size / 1024:8.0f} KB -> {store_size / 1024:6.0f} KB  ({db_size / store_size:.1f}x smaller)")
+            print(f"  database lookup: {database_lookup(db_path, numbers) * 1e6:8.1f} us per ayah")
+            print(f"  cold lookup:     {store_lookup(store, numbers, True) * 1e6:8.1f} us per ayah (block decompressed)")
+            print(f"  in order:        {store_lookup(store, sorted(numbers), False) * 1e6:8.1f} us per ayah (block cached)")
+
+        # The temporary files can only be removed once closed.
+        DatabaseRegistry.close_all()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Whole-word search benchmark.
+
+Compares the REGEXP query QuranSearchManager used to run, a Python callback
+called by SQLite for every verse, with the FTS5 word index and with the
+in-memory WordIndex used when the FTS index is not available.
+
+Run from the repository root:
+    python benchmarks/whole_word_search.py
+"""
+
+import os
+import re
+import sys
+import sqlite3
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.chdir(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core_functions.search_index import SearchIndex
+from core_functions.search import QuranSearchManager, SearchCriteria
+from core_functions.word_index import WordIndex
+
+SEARCH_TEXTS = ("الله", "الرحمن", "قل هو", "الصلاة", "انزلنا")
+ROUNDS = 10
+
+
+def measure(search) -> float:
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        for search_text in SEARCH_TEXTS:
+            search(search_text)
+    return (time.perf_counter() - start) / (ROUNDS * len(SEARCH_TEXTS))
+
+
+def main() -> None:
+    conn = sqlite3.connect(os.path.join("database", "quran", "Verses.DB"))
+    conn.create_function("REGEXP", 2, lambda expr, item: re.search(expr, item) is not None)
+    cursor = conn.cursor()
+
+    def regexp_search(search_text: str) -> list:
+        cursor.execute("SELECT * FROM quran WHERE page >= ? AND page <= ? AND text REGEXP ?;", (1, 604, rf"\b{search_text}\b"))
+        return cursor.fetchall()
+
+    SearchIndex.ensure_built()
+    manager = QuranSearchManager()
+    manager.set(no_tashkil=True, no_hamza=True, match_whole_word=True, criteria=SearchCriteria.page, _from=1, _to=604)
+
+    start = time.perf_counter()
+    WordIndex.load(os.path.join("database", "quran", "Verses.DB"), True, True)
+    build_time = time.perf_counter() - start
+
+    results = {
+        "REGEXP callback": measure(regexp_search),
+        "FTS5 word index": measure(manager._search_with_index),
+        "WordIndex": measure(manager._search_without_index),
+    }
+    conn.close()
+
+    baseline = results["REGEXP callback"]
+    for name, elapsed in results.items():
+        print(f"{name:16} {elapsed * 1000:8.2f} ms per search  ({baseline / elapsed:6.1f}x)")
+    print(f"WordIndex built once in {build_time * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
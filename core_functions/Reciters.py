@@ -1,9 +1,8 @@
-import os
 import sqlite3
-from typing import List, Dict, Optional
+from typing import List, Dict, Iterable, Optional, Tuple
 from functools import lru_cache
 from abc import ABC, abstractmethod
-from exceptions.database import DBNotFoundError
+from utils.db_registry import DatabaseRegistry
 
 
 class RecitersManager(ABC):
@@ -12,46 +11,36 @@ class RecitersManager(ABC):
         self.table_name = table_name
 
     def _connect(self) -> sqlite3.Connection:
-
-        if not os.path.isfile(self.db_path):
-            raise DBNotFoundError(self.db_path)
-        
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-
-        return conn
+        return DatabaseRegistry.get(self.db_path)
 
     def get_reciters(self) -> List[sqlite3.Row]:
         """Fetches all reciters from the database."""
-        with self._connect() as conn:
-            cursor = conn.cursor()
-            cursor.execute(f"""
-                SELECT *,
-                    CASE
-                        WHEN bitrate < 64 THEN 'Low'
-                        WHEN bitrate BETWEEN 64 AND 128 THEN 'Medium'
-                        ELSE 'High'
-                    END AS quality
-                FROM {self.table_name}
-                ORDER BY name, bitrate;
-            """)
+        cursor = self._connect().cursor()
+        cursor.execute(f"""
+            SELECT *,
+                CASE
+                    WHEN bitrate < 64 THEN 'Low'
+                    WHEN bitrate BETWEEN 64 AND 128 THEN 'Medium'
+                    ELSE 'High'
+                END AS quality
+            FROM {self.table_name}
+            ORDER BY name, bitrate;
+        """)
 
-            return cursor.fetchall()
+        return cursor.fetchall()
 
     def get_reciter(self, id: int) -> sqlite3.Row:
-        with self._connect() as conn:
-            cursor = conn.cursor()
-            cursor.execute(f"SELECT * FROM {self.table_name} WHERE id = ?;", (id,))
-            return cursor.fetchone()
+        cursor = self._connect().cursor()
+        cursor.execute(f"SELECT * FROM {self.table_name} WHERE id = ?;", (id,))
+        return cursor.fetchone()
 
     @lru_cache(maxsize=1)
     def _get_base_url(self, reciter_id: int) -> Optional[str]:
-        with self._connect() as conn:
-            cursor = conn.cursor()
-            cursor.execute(f"SELECT url FROM {self.table_name} WHERE id = ?", (reciter_id,))
-            result = cursor.fetchone()
-            if result:
-                return result["url"]
+        cursor = self._connect().cursor()
+        cursor.execute(f"SELECT url FROM {self.table_name} WHERE id = ?", (reciter_id,))
+        result = cursor.fetchone()
+        if result:
+            return result["url"]
         return None
 
     @abstractmethod
@@ -68,6 +57,15 @@ class SurahReciter(RecitersManager):
         if base_url:
             return f"{base_url}/{surah_number:03}.mp3"
         return None
+
+    def get_urls(self, reciter_id: int, surah_numbers: Optional[Iterable[int]] = None) -> List[str]:
+        """URLs of the surahs of a reciter, by default all the surahs available for it."""
+        if surah_numbers is None:
+            reciter = self.get_reciter(reciter_id)
+            if reciter is None:
+                return []
+            surah_numbers = [int(number) for number in reciter["available_suras"].split(",") if number.strip()]
+        return [url for url in (self.get_url(reciter_id, surah_number) for surah_number in surah_numbers) if url]
     
 
 class AyahReciter(RecitersManager):
@@ -79,4 +77,8 @@ class AyahReciter(RecitersManager):
         if base_url:
             return f"{base_url}{surah_number:03}{aya_number:03}.mp3"
         return None
+
+    def get_urls(self, reciter_id: int, positions: Iterable[Tuple[int, int]]) -> List[str]:
+        """URLs of the (surah_number, aya_number) positions of a reciter, for example the ayahs of a range of juz."""
+        return [url for url in (self.get_url(reciter_id, *position) for position in positions) if url]
     
\ No newline at end of file
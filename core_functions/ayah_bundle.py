@@ -0,0 +1,86 @@
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Callable, Dict, Tuple
+from core_functions.info import AyaInfo, E3rab, TanzilAyah
+from core_functions.tafaseer import TafaseerManager
+
+
+class AyahBundle:
+    """
+    Everything known about an ayah: its info, e3rab, reasons of revelation and
+    the tafsir of every installed category.
+
+    Each resource is read the first time it is accessed and kept, so opening the
+    context menu of an ayah reads nothing and an action only reads what it shows.
+    Bundles are cached by ayah number, repeated actions on the same ayah return
+    the kept result, and a thread accessing a resource being read waits for it.
+
+    A resource that can not be read, such as a database that is not installed,
+    raises its error when accessed and does not affect the others.
+    """
+
+    cache_size = 16
+    _cache: "OrderedDict[int, AyahBundle]" = OrderedDict()
+    _lock = threading.Lock()
+
+    def __init__(self, surah_number: int, ayah_number: int) -> None:
+        assert 1 <= surah_number <= 114, "Out of surah range."
+        assert 1 <= ayah_number, "Out of ayah range."
+        self.surah_number = surah_number
+        self.ayah_number = ayah_number
+        self._results: Dict[Tuple[str, ...], Future] = {}
+        self._results_lock = threading.Lock()
+
+    @classmethod
+    def get(cls, surah_number: int, ayah_number: int) -> "AyahBundle":
+        """Return the bundle of an ayah, its resources are read when accessed."""
+        with cls._lock:
+            bundle = cls._cache.get(ayah_number)
+            if bundle is not None:
+                cls._cache.move_to_end(ayah_number)
+                return bundle
+
+            bundle = cls._cache[ayah_number] = cls(surah_number, ayah_number)
+            if len(cls._cache) > cls.cache_size:
+                cls._cache.popitem(last=False)
+            return bundle
+
+    @classmethod
+    def clear_cache(cls) -> None:
+        with cls._lock:
+            cls._cache.clear()
+
+    def _get_result(self, key: Tuple[str, ...], read: Callable[[], str]) -> str:
+        """Read a resource on the first access, the next ones return or raise the same result."""
+        with self._results_lock:
+            result = self._results.get(key)
+            is_reader = result is None
+            if is_reader:
+                result = self._results[key] = Future()
+
+        if is_reader:
+            try:
+                result.set_result(read())
+            except Exception as e:
+                result.set_exception(e)
+        return result.result()
+
+    @property
+    def info(self) -> str:
+        return self._get_result(("info",), lambda: AyaInfo(self.ayah_number).text)
+
+    @property
+    def e3rab(self) -> str:
+        return self._get_result(("e3rab",), lambda: E3rab(self.surah_number, self.ayah_number).text)
+
+    @property
+    def tanzil(self) -> str:
+        return self._get_result(("tanzil",), lambda: TanzilAyah(self.ayah_number).text)
+
+    def get_tafsir(self, tafaseer_category: str) -> str:
+        """Return the formatted tafsir of an installed category."""
+        return self._get_result(
+            ("tafsir", tafaseer_category),
+            lambda: TafaseerManager.read(tafaseer_category, self.surah_number, self.ayah_number)
+        )
@@ -1,89 +1,58 @@
-import sqlite3
-from typing import List, Dict
+from array import array
+from bisect import bisect_right
+from typing import Dict, Optional, Tuple
 
 class AyahData:
     def __init__(self):
-        self.connect()
-        self.create_table()
-    
-    def connect(self) -> None:
-        """Connect to temporary database to store ayah positions in the text."""
-        self.conn = sqlite3.connect(':memory:')
-        self.conn.row_factory = sqlite3.Row
-        self.cursor = self.conn.cursor()
-
-    def create_table(self) -> None:
-        """Create the table to store ayah data."""
-        self.cursor.execute('''
-            CREATE TEMPORARY TABLE IF NOT EXISTS ayah_data (
-                ayah_number INTEGER NOT NULL,
-                            surah_number INTEGER NOT NULL,
-                            ayah_number_in_surah INTEGER NOT NULL,
-                first_position INTEGER NOT NULL,
-                last_position INTEGER NOT NULL,
-                PRIMARY KEY (ayah_number, first_position, last_position)
-            )
-        ''')
-        self.conn.commit()
+        self.first_positions = array("i")
+        self.last_positions = array("i")
+        self.ayah_numbers = array("i")
+        self.surah_numbers = array("i")
+        self._positions: Dict[int, int] = {}
+        self._ayah_numbers: Dict[Tuple[int, int], int] = {}
+        self._ayah_range: Dict[int, Dict[str, int]] = {}
 
     def insert(self, ayah_number: int, surah_number: int, ayah_number_in_surah: int, first_position: int, last_position: int):
-        """Insert a new ayah into the table."""
+        """Insert a new ayah, keeping the arrays sorted by first position."""
+
+        index = len(self.first_positions)
+        if index and first_position < self.first_positions[-1]:
+            index = bisect_right(self.first_positions, first_position)
+
+        self.first_positions.insert(index, first_position)
+        self.last_positions.insert(index, last_position)
+        self.ayah_numbers.insert(index, ayah_number)
+        self.surah_numbers.insert(index, surah_number)
+
+        self._positions.setdefault(ayah_number, first_position)
+        self._ayah_numbers.setdefault((surah_number, ayah_number_in_surah), ayah_number)
+
+        surah_range = self._ayah_range.setdefault(surah_number, {
+            "surah_number": surah_number,
+            "max_ayah": ayah_number_in_surah,
+            "min_ayah": ayah_number_in_surah
+        })
+        surah_range["max_ayah"] = max(surah_range["max_ayah"], ayah_number_in_surah)
+        surah_range["min_ayah"] = min(surah_range["min_ayah"], ayah_number_in_surah)
+
+    def get(self, position: int) -> Optional[int]:
+        """Retrieve ayah number by a specific position, or the closest ayah before it."""
+        index = bisect_right(self.first_positions, position) - 1
+        if index < 0:
+            return None
+        return self.ayah_numbers[index]
 
-        self.cursor.execute('''
-            INSERT INTO ayah_data (ayah_number, surah_number, ayah_number_in_surah, first_position, last_position)
-            VALUES (?, ?, ?, ?, ?)
-        ''', (ayah_number, surah_number, ayah_number_in_surah, first_position, last_position))
-        self.conn.commit()
-    
-    def get(self, position: int) -> int:
-        """Retrieve ayah number by a specific position."""
-    
-        self.cursor.execute('''
-            SELECT ayah_number FROM ayah_data
-            WHERE ? BETWEEN first_position AND last_position
-        ''', (position,))        
-        result = self.cursor.fetchone()
-        
-        if result:
-            return result['ayah_number']
-        else:
-            if position > 1:
-                return self.get(position - 1)
-        
     def get_position(self, ayah_number: int) -> int:
         """Get position for Specific ayah"""
-        self.cursor.execute("SELECT first_position FROM ayah_data WHERE ayah_number = ?;", (ayah_number,))
-        result = self.cursor.fetchone()
-
-        if result:
-            return result["first_position"]
-        else:
-            return 0
+        return self._positions.get(ayah_number, 0)
 
-    def get_ayah_number(self, ayah_number_in_surah: int, surah_number) -> int:
+    def get_ayah_number(self, ayah_number_in_surah: int, surah_number) -> Optional[int]:
         """Get ayah number by surah number and ayah number in surah."""
-        self.cursor.execute("SELECT ayah_number FROM ayah_data WHERE ayah_number_in_surah = ? AND surah_number = ?;", (ayah_number_in_surah, surah_number))
-        result = self.cursor.fetchone()
-
-        if result:
-            return result["ayah_number"]
-        else:
-            return None
+        return self._ayah_numbers.get((surah_number, ayah_number_in_surah))
 
-    def get_ayah_range(self) -> Dict[int, List[sqlite3.Row]]:
-        """Fetches the maximum and minimum ayah numbers from the ayah_data table."""
-        self.cursor.execute("""
-            SELECT 
-                surah_number,
-                MAX(ayah_number_in_surah) AS max_ayah,
-                MIN(ayah_number_in_surah) AS min_ayah
-            FROM ayah_data
-            GROUP BY surah_number;
-        """)
-    
-        return {row["surah_number"]: row for row in self.cursor.fetchall()}
+    def get_ayah_range(self) -> Dict[int, Dict[str, int]]:
+        """Returns the maximum and minimum ayah numbers in surah for each surah."""
+        return self._ayah_range
 
-    def __del__(self):
-        """Close the connection when the object is deleted."""
-        if self.conn:
-            self.conn.close()
+    def __len__(self) -> int:
+        return len(self.ayah_numbers)
@@ -3,24 +3,27 @@ import os
 import datetime
 from utils.logger import Logger
 from utils.const import albayan_folder
+from utils.db_registry import DatabaseRegistry
 
 
 class BookmarkManager:
+    _table_created = False
+
     def __init__(self) -> None:
         self.file_path = os.path.join(albayan_folder, "bookmark.db")
         self.conn = self.connect()
         self.cursor = self.conn.cursor()
-        self.create_table()
+        if not BookmarkManager._table_created:
+            # Tried again by the next manager if it failed.
+            BookmarkManager._table_created = self.create_table()
 
     def connect(self) -> sqlite3.Connection:
         try:
-            conn = sqlite3.connect(self.file_path)
-            conn.row_factory = sqlite3.Row
-            return conn
+            return DatabaseRegistry.get(self.file_path, read_only=False)
         except Exception as e:
             Logger.error(str(e))
 
-    def create_table(self) -> None:
+    def create_table(self) -> bool:
 
         query = """
             CREATE TABLE IF NOT EXISTS bookmarks (
@@ -38,8 +41,10 @@ class BookmarkManager:
         try:
             self.cursor.execute(query)
             self.conn.commit()
+            return True
         except Exception as e:
             Logger.error(str(e))
+            return False
 
     def insert_bookmark(self, name: str, ayah_number: int, ayah_number_in_surah: int, surah_number: int, surah_name: str, criteria_number: int) -> None:
 
@@ -113,10 +118,6 @@ class BookmarkManager:
     def __str__(self) -> str:
         return "Connecting to {}.".format(self.file_path)
 
-    def __del__(self):
-        if self.conn:
-            self.conn.close()
-
     def is_exist(self, ayah_number: int) -> bool:
 
         query = "SELECT 1 FROM bookmarks WHERE ayah_number = ?;"
@@ -0,0 +1,126 @@
+import threading
+from typing import Callable, Optional, Tuple
+from core_functions.search import QuranSearchManager, SearchMode
+from core_functions.search_index import normalize_text, compile_word_pattern, split_prefix_marker
+from utils.logger import Logger
+from utils.db_registry import DatabaseRegistry
+
+
+class IncrementalSearch:
+    """
+    Search-as-you-type on top of QuranSearchManager.
+
+    Keeps the ayahs whose normalized text contains the last searched text. When the
+    new text extends it, those candidates are narrowed in memory; when characters
+    are deleted or the options change, the candidates are fetched again from the
+    search index. In whole-word mode the results are the candidates that also match
+    as whole words.
+
+    The search manager owns a sqlite connection, so an instance must only be used
+    from the thread that first calls set().
+    """
+
+    def __init__(self):
+        self._manager: Optional[QuranSearchManager] = None
+        self._options: Optional[dict] = None
+        self._search_text: Optional[str] = None
+        self._candidates = []
+
+    def set(self, **options) -> None:
+        """Takes the arguments of QuranSearchManager.set, must be called before searching."""
+        if self._manager is None:
+            self._manager = QuranSearchManager()
+        if options != self._options:
+            self._manager.set(**options)
+            self._options = options
+            self.reset()
+
+    def reset(self) -> None:
+        """Forget the previous results, the next search queries the index."""
+        self._search_text = None
+        self._candidates = []
+
+    def search(self, search_text: str) -> list:
+        manager = self._manager
+        if manager.search_mode != SearchMode.text:
+            # Root and lemma lookups are a single postings read, nothing to narrow.
+            return manager.search(search_text) or []
+
+        search_text = normalize_text(search_text, manager.no_tashkil, manager.no_hamza)
+        search_text, prefix = split_prefix_marker(search_text, manager.match_whole_word)
+        if not search_text:
+            self.reset()
+            return []
+
+        if self._search_text is not None and search_text.startswith(self._search_text):
+            if search_text != self._search_text:
+                self._candidates = [candidate for candidate in self._candidates if search_text in candidate[1]]
+        else:
+            self._candidates = manager.get_candidates(search_text)
+        self._search_text = search_text
+
+        if not manager.match_whole_word:
+            return [row for row, _ in self._candidates]
+        pattern = compile_word_pattern(search_text, prefix)
+        return [row for row, text in self._candidates if pattern.search(text)]
+
+
+class LiveSearchWorker:
+    """
+    Runs an IncrementalSearch on a worker thread.
+
+    Only the latest request is kept: text submitted while a search is running
+    replaces the pending one. Results are passed to on_results(request_id, results)
+    on the worker thread, callers drop the ones older than their last request.
+    """
+
+    def __init__(self, on_results: Callable[[int, list], None]) -> None:
+        self.on_results = on_results
+        self._condition = threading.Condition()
+        self._pending: Optional[Tuple[int, str, dict]] = None
+        self._request_id = 0
+        self._stopped = False
+        self._thread: Optional[threading.Thread] = None
+
+    def submit(self, search_text: str, options: dict) -> int:
+        """Queue a search with the arguments of QuranSearchManager.set, returns its request id."""
+        with self._condition:
+            self._request_id += 1
+            self._pending = (self._request_id, search_text, options)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="LiveSearchWorker", daemon=True)
+                self._thread.start()
+            self._condition.notify()
+            return self._request_id
+
+    def stop(self) -> None:
+        with self._condition:
+            self._stopped = True
+            self._pending = None
+            self._condition.notify()
+
+    def _run(self) -> None:
+        # Created here so its connection belongs to this thread, which closes it when stopped.
+        engine = IncrementalSearch()
+        while True:
+            with self._condition:
+                while self._pending is None and not self._stopped:
+                    self._condition.wait()
+                if self._stopped:
+                    DatabaseRegistry.close_all()
+                    return
+                request_id, search_text, options = self._pending
+                self._pending = None
+
+            try:
+                engine.set(**options)
+                results = engine.search(search_text)
+            except Exception as e:
+                Logger.error(f"Live search failed for {search_text!r}: {e}")
+                engine.reset()
+                results = []
+            try:
+                self.on_results(request_id, results)
+            except Exception as e:
+                # The receiver may be gone, the worker has to keep serving the next searches.
+                Logger.error(f"Could not deliver the live search results for {search_text!r}: {e}")
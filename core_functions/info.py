@@ -1,6 +1,7 @@
 import sqlite3
 import os
 from abc import ABC, abstractmethod
+from utils.db_registry import DatabaseRegistry
 
 class Base(ABC):
     @abstractmethod
@@ -12,9 +13,7 @@ class Base(ABC):
         if not os.path.isfile(file_path):
             raise FileNotFoundError(f"No database found in: {file_path}")
 
-        conn = sqlite3.connect(file_path)
-        conn.row_factory = sqlite3.Row
-        return conn
+        return DatabaseRegistry.get(file_path)
     
     @property
     @abstractmethod
@@ -28,10 +27,6 @@ class Base(ABC):
 
         return text
 
-    def __del__(self) -> None:
-        if self._conn is not None:
-            self._conn.close()
-
         
 class E3rab(Base):
     def __init__(self, surah_number: int, ayah_number: int) -> None:
@@ -0,0 +1,232 @@
+import os
+import re
+import sqlite3
+import sys
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+from core_functions.search_index import normalize_text
+from exceptions.database import DBNotFoundError
+
+
+# Extended Buckwalter transliteration used by the Quranic Arabic Corpus.
+BUCKWALTER = {
+    "'": "ء", ">": "أ", "&": "ؤ", "<": "إ", "}": "ئ", "A": "ا", "b": "ب", "p": "ة",
+    "t": "ت", "v": "ث", "j": "ج", "H": "ح", "x": "خ", "d": "د", "*": "ذ", "r": "ر",
+    "z": "ز", "s": "س", "$": "ش", "S": "ص", "D": "ض", "T": "ط", "Z": "ظ", "E": "ع",
+    "g": "غ", "_": "ـ", "f": "ف", "q": "ق", "k": "ك", "l": "ل", "m": "م", "n": "ن",
+    "h": "ه", "w": "و", "Y": "ى", "y": "ي", "F": "ً", "N": "ٌ", "K": "ٍ", "a": "َ",
+    "u": "ُ", "i": "ِ", "~": "ّ", "o": "ْ", "^": "ٓ", "#": "ٔ", "`": "ٰ", "{": "ٱ",
+    ":": "ۜ", "@": "۟", '"': "۠", "[": "ۢ", ";": "ۣ", ",": "ۥ", ".": "ۦ", "!": "ۨ",
+    "-": "۪", "+": "۫", "%": "۬", "]": "ۭ",
+}
+_buckwalter_table = str.maketrans(BUCKWALTER)
+_location_pattern = re.compile(r"\((\d+):(\d+):(\d+):(\d+)\)")
+
+
+def buckwalter_to_arabic(text: str) -> str:
+    return text.translate(_buckwalter_table)
+
+
+def encode_postings(numbers: Iterable[int]) -> bytes:
+    """Encode ascending ayah numbers as varint deltas, most gaps fit in one byte."""
+    data = bytearray()
+    previous = 0
+    for number in numbers:
+        delta = number - previous
+        previous = number
+        while delta >= 0x80:
+            data.append(delta & 0x7F | 0x80)
+            delta >>= 7
+        data.append(delta)
+    return bytes(data)
+
+
+def decode_postings(data: bytes) -> List[int]:
+    numbers = []
+    number = delta = shift = 0
+    for byte in data:
+        delta |= (byte & 0x7F) << shift
+        if byte & 0x80:
+            shift += 7
+            continue
+        number += delta
+        numbers.append(number)
+        delta = shift = 0
+    return numbers
+
+
+class MorphologyIndex:
+    """
+    Root and lemma postings of the Quran words.
+
+    morphology.db is generated from the Quranic Arabic Corpus morphology file
+    with build(). It holds, for every root and lemma, the ayah numbers of the
+    words derived from it as delta-encoded varints, and a word -> root/lemma
+    table so that searching a word finds the ayahs of its root or lemma.
+    The file is small, so it is read once into memory and shared by all threads.
+    """
+
+    ROOT = "root"
+    LEMMA = "lemma"
+    file_path = os.path.join("database", "quran", "morphology.db")
+    source_path = os.path.join("database", "quran", "Verses.DB")
+    _instance: Optional["MorphologyIndex"] = None
+    _lock = threading.Lock()
+
+    def __init__(self, file_path: Union[str, os.PathLike]) -> None:
+        if not os.path.isfile(file_path):
+            raise DBNotFoundError(file_path)
+
+        conn = sqlite3.connect(file_path)
+        try:
+            postings = conn.execute("SELECT kind, key, label, data FROM postings;").fetchall()
+            words = conn.execute("SELECT word, root, lemma FROM words;").fetchall()
+        finally:
+            conn.close()
+
+        self.postings: Dict[str, Dict[str, bytes]] = {self.ROOT: {}, self.LEMMA: {}}
+        self.labels: Dict[str, Dict[str, str]] = {self.ROOT: {}, self.LEMMA: {}}
+        for kind, key, label, data in postings:
+            self.postings[kind][key] = data
+            self.labels[kind][key] = label
+
+        self.words: Dict[str, List[Tuple[str, str]]] = {}
+        for word, root, lemma in words:
+            self.words.setdefault(word, []).append((root, lemma))
+
+    @classmethod
+    def is_available(cls) -> bool:
+        return os.path.isfile(cls.file_path)
+
+    @classmethod
+    def load(cls) -> "MorphologyIndex":
+        with cls._lock:
+            if cls._instance is None:
+                cls._instance = cls(cls.file_path)
+            return cls._instance
+
+    @staticmethod
+    def normalize_key(text: str) -> str:
+        """Roots and lemmas are looked up without tashkil, hamzat or spaces, "ك ت ب" is "كتب"."""
+        return "".join(normalize_text(text, True, True).split())
+
+    def get_keys(self, kind: str, search_text: str) -> List[str]:
+        """
+        Return the roots or lemmas matching search_text: itself if it is one,
+        otherwise those of the word search_text.
+        """
+        key = self.normalize_key(search_text)
+        if key in self.postings[kind]:
+            return [key]
+
+        index = 0 if kind == self.ROOT else 1
+        keys = {analysis[index] for analysis in self.words.get(key, ()) if analysis[index]}
+        return sorted(keys)
+
+    def get_label(self, kind: str, key: str) -> str:
+        return self.labels[kind].get(key, key)
+
+    def get_ayahs(self, kind: str, search_text: str) -> List[int]:
+        """Return the ascending numbers of the ayahs containing a word of the root or lemma of search_text."""
+        keys = self.get_keys(kind, search_text)
+        if len(keys) == 1:
+            return decode_postings(self.postings[kind][keys[0]])
+
+        numbers = set()
+        for key in keys:
+            numbers.update(decode_postings(self.postings[kind][key]))
+        return sorted(numbers)
+
+    @classmethod
+    def build(cls, morphology_file: Union[str, os.PathLike], output_path: Union[str, os.PathLike] = None) -> None:
+        """
+        Build morphology.db from quranic-corpus-morphology-0.4.txt, whose lines are
+        LOCATION FORM TAG FEATURES separated by tabs, for example:
+        (1:1:2:1)	somi	N	STEM|POS:N|LEM:{som|ROOT:smw|M|GEN
+        """
+        output_path = output_path or cls.file_path
+        if not os.path.isfile(cls.source_path):
+            raise DBNotFoundError(cls.source_path)
+
+        source = sqlite3.connect(cls.source_path)
+        try:
+            ayah_numbers = {
+                (sura_number, number_in_surah): number
+                for number, sura_number, number_in_surah in source.execute("SELECT number, sura_number, numberInSurah FROM quran;")
+            }
+        finally:
+            source.close()
+
+        # Segments of a word share its location up to the segment number.
+        words: Dict[Tuple[int, int, int], Dict[str, object]] = {}
+        with open(morphology_file, encoding="UTF-8") as f:
+            for line in f:
+                location = _location_pattern.match(line)
+                if location is None:
+                    continue
+                sura_number, number_in_surah, word_number, _ = map(int, location.groups())
+                _, form, _, features = line.rstrip("\n").split("\t")
+                word = words.setdefault((sura_number, number_in_surah, word_number), {"form": "", "root": "", "lemma": ""})
+                word["form"] += buckwalter_to_arabic(form)
+                for feature in features.split("|"):
+                    name, _, value = feature.partition(":")
+                    if name == "ROOT":
+                        word["root"] = buckwalter_to_arabic(value)
+                    elif name == "LEM":
+                        word["lemma"] = buckwalter_to_arabic(value)
+
+        postings: Dict[Tuple[str, str], set] = {}
+        labels: Dict[Tuple[str, str], str] = {}
+        word_keys = set()
+        for (sura_number, number_in_surah, _), word in words.items():
+            number = ayah_numbers.get((sura_number, number_in_surah))
+            if number is None:
+                continue
+            keys = {}
+            for kind in (cls.ROOT, cls.LEMMA):
+                if word[kind]:
+                    key = cls.normalize_key(word[kind])
+                    keys[kind] = key
+                    postings.setdefault((kind, key), set()).add(number)
+                    labels.setdefault((kind, key), word[kind])
+            word_keys.add((cls.normalize_key(word["form"]), keys.get(cls.ROOT, ""), keys.get(cls.LEMMA, "")))
+
+        temp_path = str(output_path) + ".tmp"
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        conn = sqlite3.connect(temp_path)
+        try:
+            conn.executescript("""
+                CREATE TABLE postings (
+                    kind TEXT,
+                    key TEXT,
+                    label TEXT,
+                    count INTEGER,
+                    data BLOB,
+                    PRIMARY KEY (kind, key)
+                ) WITHOUT ROWID;
+                CREATE TABLE words (
+                    word TEXT,
+                    root TEXT,
+                    lemma TEXT,
+                    PRIMARY KEY (word, root, lemma)
+                ) WITHOUT ROWID;
+            """)
+            conn.executemany(
+                "INSERT INTO postings VALUES (?, ?, ?, ?, ?);",
+                [
+                    (kind, key, labels[(kind, key)], len(numbers), encode_postings(sorted(numbers)))
+                    for (kind, key), numbers in postings.items()
+                ]
+            )
+            conn.executemany("INSERT INTO words VALUES (?, ?, ?);", sorted(word_keys))
+            conn.commit()
+        finally:
+            conn.close()
+
+        os.replace(temp_path, output_path)
+
+
+if __name__ == "__main__":
+    # python -m core_functions.morphology_index quranic-corpus-morphology-0.4.txt
+    MorphologyIndex.build(sys.argv[1])
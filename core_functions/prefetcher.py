@@ -0,0 +1,71 @@
+import queue
+import threading
+from typing import Any, Callable, Optional, Tuple
+from utils.logger import Logger
+
+
+class DivisionPrefetcher:
+    """
+    Renders the divisions around the reading position on a worker thread.
+
+    After each navigation, schedule() queues current_pos ± 1 .. ± depth. Jobs belong
+    to a generation; when the reader jumps away (another division type, or further
+    than depth + 1 from the last position) the generation changes and the pending
+    jobs of the old position are dropped.
+    """
+
+    def __init__(self, render: Callable[[int, int, Any], None], depth: int = 1) -> None:
+        """
+        :param render: Called on the worker thread with (division, position, context)
+        and expected to store the rendered division in the caller's cache.
+        :param depth: How many divisions to prefetch on each side, 0 disables prefetching.
+        """
+        self.render = render
+        self.depth = depth
+        self._jobs: queue.Queue = queue.Queue()
+        self._generation = 0
+        self._last_position: Optional[Tuple[int, int]] = None
+        self._thread: Optional[threading.Thread] = None
+        # Guards _thread, so a worker never exits leaving jobs queued after its last get().
+        self._lock = threading.Lock()
+
+    def schedule(self, division: int, position: int, max_position: int, context: Any = None) -> None:
+        if self.depth < 1:
+            return
+
+        last_position = self._last_position
+        self._last_position = (division, position)
+        if last_position is None or last_position[0] != division or abs(last_position[1] - position) > self.depth + 1:
+            self.cancel()
+
+        for step in range(1, self.depth + 1):
+            for target in (position + step, position - step):
+                if 1 <= target <= max_position:
+                    self._jobs.put((self._generation, division, target, context))
+
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="DivisionPrefetcher", daemon=True)
+                self._thread.start()
+
+    def cancel(self) -> None:
+        """Drop every pending job."""
+        self._generation += 1
+
+    def _run(self) -> None:
+        while True:
+            try:
+                generation, division, position, context = self._jobs.get(timeout=5)
+            except queue.Empty:
+                with self._lock:
+                    # Jobs queued after the timeout are run by this worker instead of waiting for the next schedule().
+                    if not self._jobs.empty():
+                        continue
+                    self._thread = None
+                    return
+            if generation != self._generation:
+                continue
+            try:
+                self.render(division, position, context)
+            except Exception as e:
+                Logger.error(f"Failed to prefetch division {division}:{position}: {e}")
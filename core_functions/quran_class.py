@@ -19,12 +19,16 @@ For more information, visit: https://github.com/baaziznasser/qurani
 
 
 import os
-import sqlite3
-from typing import List, Dict, Union
+from collections import OrderedDict
+from bisect import bisect_left, bisect_right
+import threading
+from typing import List, Dict, Tuple, Union
 from core_functions.ayah_data import AyahData
+from core_functions.quran_corpus import QuranCorpus
+from core_functions.prefetcher import DivisionPrefetcher
 from utils.settings import SettingsManager
 from utils.const import data_folder
-from exceptions.database import DBNotFoundError
+from exceptions.database import DBNotFoundError, AyahNotFoundError
 
 
 class QuranConst:
@@ -52,6 +56,8 @@ class QuranConst:
 
 
 class quran_mgr:
+    text_cache_size = 64
+
     def __init__(self):
         self.show_ayah_number = True
         self.aya_to_line = True
@@ -59,81 +65,112 @@ class quran_mgr:
         self.max_pos = 604
         self.type = 0
         self.data_list = []
-        self.conn = None
-        self.cursor = None
+        self.corpus = None
+        self.db_file = None
         self.text = ""
         self.ayah_data = None
+        self._text_cache = OrderedDict()
+        self._text_cache_lock = threading.Lock()
+        self.prefetcher = DivisionPrefetcher(self._prefetch_division, depth=1)
         
     def load_quran(self, db_file: Union[str, int]):
         db_file = QuranConst.databases[db_file] if isinstance(db_file, int) else db_file
         if not os.path.isfile(db_file):
             raise DBNotFoundError(db_file)
         
-        self.conn = sqlite3.connect(db_file)
-        self.cursor = self.conn.cursor()
+        if self.db_file is not None and os.path.abspath(db_file) != os.path.abspath(self.db_file):
+            self.clear_text_cache()
+        self.db_file = db_file
+        self.corpus = QuranCorpus.load(db_file)
         QuranConst.SURAS = self.get_suras()
 
     def reload_quran(self, db_file: Union[str, int]):
         self.load_quran(db_file)
         return self.goto(self.current_pos)
 
+    def clear_text_cache(self) -> None:
+        self.prefetcher.cancel()
+        with self._text_cache_lock:
+            self._text_cache.clear()
+
+    def _get_render_options(self) -> tuple:
+        return (
+            self.show_ayah_number,
+            self.aya_to_line,
+            SettingsManager.current_settings["reading"]["auto_page_turn"]
+        )
+
+    @staticmethod
+    def _get_cache_key(division: int, position: int, options: tuple, db_file) -> tuple:
+        return (division, position, *options, os.path.abspath(db_file))
+
+    def _store_cached_text(self, key: tuple, value: tuple) -> None:
+        with self._text_cache_lock:
+            self._text_cache[key] = value
+            self._text_cache.move_to_end(key)
+            if len(self._text_cache) > self.text_cache_size:
+                self._text_cache.popitem(last=False)
+
+    def _get_cached_text(self, division: int, position: int) -> str:
+        """Render a division, reusing the text of recently visited or prefetched divisions."""
+        options = self._get_render_options()
+        key = self._get_cache_key(division, position, options, self.db_file)
+        with self._text_cache_lock:
+            cached = self._text_cache.get(key)
+            if cached is not None:
+                self._text_cache.move_to_end(key)
+
+        if cached is None:
+            self.data_list = self.corpus.get_division(division, position)
+            text = self.get_text()
+            if not text:
+                return text
+            cached = (text, self.ayah_data, self.data_list)
+            self._store_cached_text(key, cached)
+
+        self.text, self.ayah_data, self.data_list = cached
+        self.prefetcher.schedule(division, position, QuranConst.get_max(division), (options, self.corpus, self.db_file))
+        return self.text
+
+    def _prefetch_division(self, division: int, position: int, context: tuple) -> None:
+        """Runs on the prefetcher thread, the corpus is read-only so no lock is needed to read it."""
+        options, corpus, db_file = context
+        key = self._get_cache_key(division, position, options, db_file)
+        with self._text_cache_lock:
+            if key in self._text_cache:
+                return
+
+        data_list = corpus.get_division(division, position)
+        if not data_list:
+            return
+        text, ayah_data = self._render_text(data_list, position, options)
+        self._store_cached_text(key, (text, ayah_data, data_list))
+
     def get_suras(self) -> List[Union[str, int]]:
-        self.cursor.execute("SELECT DISTINCT REPLACE(sura_name, 'سورة ', '') AS sura_name, sura_number from quran ORDER BY sura_number;")
-        return self.cursor.fetchall()
+        return self.corpus.get_suras()
 
-    def get_surah(self, surah_number):
-        self.current_pos = surah_number
-        self.max_pos = 114
-        self.type = 1
+    def _get_division(self, division: int, number: int) -> str:
+        self.current_pos = number
+        self.max_pos = QuranConst.get_max(division)
+        self.type = division
         self.current_pos = self.max_pos if self.current_pos > self.max_pos else self.current_pos
 
-        self.cursor.execute(f"SELECT * FROM quran WHERE sura_number = {surah_number}")
-        rows = self.cursor.fetchall()
-        self.data_list = [(row[0], row[1], row[2], row[3], row[4], row[5], row[6], row[7], row[8], row[9], row[10], None, None) for row in rows]
-        return self.get_text()
+        return self._get_cached_text(division, number)
 
-    def get_hizb(self, hizb_number):
-        self.current_pos = hizb_number
-        self.max_pos = 60
-        self.type = 3
-        self.current_pos = self.max_pos if self.current_pos > self.max_pos else self.current_pos
+    def get_surah(self, surah_number):
+        return self._get_division(QuranCorpus.SURAH, surah_number)
 
-        self.cursor.execute(f"SELECT * FROM quran WHERE hizb = {hizb_number}")
-        rows = self.cursor.fetchall()
-        self.data_list = [(row[0], row[1], row[2], row[3], row[4], row[5], row[6], row[7], row[8], row[9], row[10], None, None) for row in rows]
-        return self.get_text()
+    def get_hizb(self, hizb_number):
+        return self._get_division(QuranCorpus.HIZB, hizb_number)
 
     def get_juzz(self, juzz_number):
-        self.current_pos = juzz_number
-        self.max_pos = 30
-        self.type = 4
-        self.current_pos = self.max_pos if self.current_pos > self.max_pos else self.current_pos
-        self.cursor.execute(f"SELECT * FROM quran WHERE juz = {juzz_number}")
-        rows = self.cursor.fetchall()
-        self.data_list = [(row[0], row[1], row[2], row[3], row[4], row[5], row[6], row[7], row[8], row[9], row[10], None, None) for row in rows]
-        return self.get_text()
+        return self._get_division(QuranCorpus.JUZ, juzz_number)
 
     def get_quarter(self, quarter_number):
-        self.current_pos = quarter_number
-        self.max_pos = 240
-        self.type = 2
-        self.current_pos = self.max_pos if self.current_pos > self.max_pos else self.current_pos
-
-        self.cursor.execute(f"SELECT * FROM quran WHERE hizbQuarter = {quarter_number}")
-        rows = self.cursor.fetchall()
-        self.data_list = [(row[0], row[1], row[2], row[3], row[4], row[5], row[6], row[7], row[8], row[9], row[10], None, None) for row in rows]
-        return self.get_text()
+        return self._get_division(QuranCorpus.QUARTER, quarter_number)
 
     def get_page(self, page_number):
-        self.current_pos = page_number
-        self.max_pos = 604
-        self.type = 0
-        self.current_pos = self.max_pos if self.current_pos > self.max_pos else self.current_pos
-
-        self.cursor.execute(f"SELECT * FROM quran WHERE page = {page_number}")
-        rows = self.cursor.fetchall()
-        self.data_list = [(row[0], row[1], row[2], row[3], row[4], row[5], row[6], row[7], row[8], row[9], row[10], None, None) for row in rows]
-        return self.get_text()
+        return self._get_division(QuranCorpus.PAGE, page_number)
 
     def get_range(self, from_surah = False, from_ayah = False, to_surah = False, to_ayah = False):
         self.current_pos = -1
@@ -142,36 +179,35 @@ class quran_mgr:
 
         #check from_surah real number
         if from_surah >= 1:
-            self.cursor.execute(f"select number from quran WHERE sura_number = {from_surah}")
-            result = self.cursor.fetchall()
+            start, stop = self.corpus.get_surah_bounds(from_surah)
+            ayah_count = stop - start
             if from_ayah < 1:
                 from_ayah = 1
-            elif from_ayah > len(result):
-                from_ayah = len(result	)
+            elif from_ayah > ayah_count:
+                from_ayah = ayah_count
             else:
-                from_ayah = int(result[0][0])+(int(from_ayah)-1)
+                from_ayah = self.corpus.number[start] + (int(from_ayah) - 1)
 
         #check to_surah real number
         if to_surah >= 1:
-            self.cursor.execute(f"select number from quran WHERE sura_number = {to_surah}")
-            result = self.cursor.fetchall()
+            start, stop = self.corpus.get_surah_bounds(to_surah)
+            ayah_count = stop - start
             if to_ayah < 1:
-                to_ayah = len(result)
-            elif to_ayah > len(result):
-                to_ayah = len(result	)
+                to_ayah = ayah_count
+            elif to_ayah > ayah_count:
+                to_ayah = ayah_count
             else:
-                to_ayah = int(result[0][0])+(int(to_ayah)-1)
+                to_ayah = self.corpus.number[start] + (int(to_ayah) - 1)
 
+        numbers = self.corpus.number
         if to_ayah:
             from_ayah = 1 if from_ayah is False else from_ayah
-            query = f"SELECT * FROM quran WHERE number BETWEEN {from_ayah} AND {to_ayah}"
+            start, stop = bisect_left(numbers, from_ayah), bisect_right(numbers, to_ayah)
         elif from_ayah and to_ayah is False:
-            query = f"SELECT * FROM quran WHERE  number >= {from_ayah}"
+            start, stop = bisect_left(numbers, from_ayah), len(numbers)
         else:
-            query = f"SELECT * FROM quran WHERE number > 1'"
-        self.cursor.execute(query)
-        rows = self.cursor.fetchall()
-        self.data_list = [(row[0], row[1], row[2], row[3], row[4], row[5], row[6], row[7], row[8], row[9], row[10], None, None) for row in rows]
+            start, stop = bisect_right(numbers, 1), len(numbers)
+        self.data_list = self.corpus.get_rows(start, stop)
         return self.get_text()
 
 
@@ -179,100 +215,58 @@ class quran_mgr:
         if self.current_pos >= self.max_pos:
             return ""
         self.current_pos += 1
-        if self.type == 0:
-            return self.get_page(self.current_pos)
-        elif self.type == 1:
-            return self.get_surah(self.current_pos)
-        elif self.type == 2:
-            return self.get_quarter(self.current_pos)
-        elif self.type == 3:
-            return self.get_hizb(self.current_pos)
-        else:
-            return self.get_juzz(self.current_pos)
+        return self._get_division(self.type, self.current_pos)
 
 
     def back(self):
         if self.current_pos <= 1:
             return ""
         self.current_pos -= 1
-
-        if self.type == 0:
-            return self.get_page(self.current_pos)
-        elif self.type == 1:
-            return self.get_surah(self.current_pos)
-        elif self.type == 2:
-            return self.get_quarter(self.current_pos)
-        elif self.type == 3:
-            return self.get_hizb(self.current_pos)
-        else:
-            return self.get_juzz(self.current_pos)
+        return self._get_division(self.type, self.current_pos)
 
 
     def goto(self, goto):
         if goto > self.max_pos:
             return ""
         self.current_pos = goto
-
-        if self.type == 0:
-            return self.get_page(self.current_pos)
-        elif self.type == 1:
-            return self.get_surah(self.current_pos)
-        elif self.type == 2:
-            return self.get_quarter(self.current_pos)
-        elif self.type == 3:
-            return self.get_hizb(self.current_pos)
-        else:
-            return self.get_juzz(self.current_pos)
+        return self._get_division(self.type, self.current_pos)
 
     def get_by_ayah_number(self, ayah_number) -> str:
 
-        col_name = None
-        match self.type:
-            case 0:
-                col_name = "page"
-            case 1:
-                col_name = "sura_number"
-            case 2:
-                col_name = "hizbQuarter"
-            case 3:
-                col_name = "hizb"
-            case 4:
-                col_name = "juz"
-
-        assert col_name is not None, "Must set a valid type."
-        query = f"""
-        SELECT * FROM quran WHERE {col_name} = (
-        SELECT DISTINCT {col_name} FROM quran WHERE number = ? LIMIT 1
-    )
-"""
-        self.cursor.execute(query, (ayah_number,))
-
-        rows = self.cursor.fetchall()
-        self.data_list = [(row[0], row[1], row[2], row[3], row[4], row[5], row[6], row[7], row[8], row[9], row[10], None, None) for row in rows]
-        self.cursor.execute(f"SELECT DISTINCT {col_name}, text FROM quran WHERE number = ?", (ayah_number,))
-        ayah_result = self.cursor.fetchone()
-        self.current_pos = ayah_result[0]
+        assert self.type in range(5), "Must set a valid type."
+        index = self.corpus.index_of(ayah_number)
+        if index == -1:
+            raise AyahNotFoundError(ayah_number)
+        self.current_pos = self.corpus.get_division_value(self.type, index)
         self.max_pos = QuranConst.get_max(self.type)
         return {
-            "ayah_text": ayah_result[1],
-            "full_text": self.get_text()
+            "ayah_text": self.corpus.text[index],
+            "full_text": self._get_cached_text(self.type, self.current_pos)
         }
     
     def get_ayah_info(self, position: int) -> list:
         ayah_number = self.ayah_data.get(position)
-        self.cursor.execute("SELECT sura_number, number, sura_name, numberInSurah FROM quran WHERE number = ?", (ayah_number,))
-        return self.cursor.fetchone()
+        if ayah_number is None:
+            return None
+        return self.corpus.get_ayah_info(ayah_number)
 
     def get_text(self):
 
         if not self.data_list:
             return ""
 
+        self.text, self.ayah_data = self._render_text(self.data_list, self.current_pos, self._get_render_options())
+        return self.text
+
+    @staticmethod
+    def _render_text(data_list: list, current_pos: int, options: tuple) -> Tuple[str, AyahData]:
+        """Build the text of data_list, without touching the manager state so it can run on any thread."""
+        show_ayah_number, aya_to_line, auto_page_turn = options
         text = ""
         current_position = 0
         ayah_data = AyahData()
 
-        for ayah_index, ayah in enumerate(self.data_list):
+        for ayah_index, ayah in enumerate(data_list):
             ayah_text = ayah[0]
             ayah_number = ayah[4]
             if int(ayah_number) == 1:
@@ -281,15 +275,15 @@ class quran_mgr:
                 if  ayah[3] != 1:
                     ayah_text = ayah_text.replace("بِسْمِ اللَّهِ الرَّحْمَٰنِ الرَّحِيمِ ", f"بِسْمِ اللَّهِ الرَّحْمَٰنِ الرَّحِيمِ\n")
 
-            if self.show_ayah_number:
+            if show_ayah_number:
                 ayah_text += f" ({ayah_number})"
 
-            if self.aya_to_line:
+            if aya_to_line:
                 ayah_text = f"{ayah_text}\n"
             else:
                 ayah_text += " "
 
-            ayah_text = f"|\n{ayah_text}" if ayah_index == 0 and self.current_pos != 1 else ayah_text
+            ayah_text = f"|\n{ayah_text}" if ayah_index == 0 and current_pos != 1 else ayah_text
             text += ayah_text
 
             # Calculate the positions
@@ -298,8 +292,5 @@ class quran_mgr:
             last_position = current_position - 1
             ayah_data.insert(ayah[1], ayah[3], ayah[4], first_position, last_position)
 
-        text = text + "|" if SettingsManager.current_settings["reading"]["auto_page_turn"] else text.strip()
-        self.text = text
-        self.ayah_data = ayah_data
-
-        return text
+        text = text + "|" if auto_page_turn else text.strip()
+        return text, ayah_data
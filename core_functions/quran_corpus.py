@@ -0,0 +1,138 @@
+import os
+import sqlite3
+from array import array
+from bisect import bisect_left
+from typing import Dict, List, Optional, Tuple, Union
+from exceptions.database import DBNotFoundError
+
+
+class QuranCorpus:
+    """
+    Columnar in-memory copy of the quran table.
+
+    The whole table is read once per database file, every division (page, surah,
+    quarter, hizb, juz) is stored as an offset table, so fetching a division is a
+    slice of the columns without any SQL round trip.
+    """
+
+    # Same order as quran_mgr.type and QuranConst._max.
+    PAGE, SURAH, QUARTER, HIZB, JUZ = range(5)
+    _columns = ("page", "sura_number", "hizbQuarter", "hizb", "juz")
+    _instances: Dict[str, "QuranCorpus"] = {}
+
+    def __init__(self, db_file: Union[str, os.PathLike]) -> None:
+        if not os.path.isfile(db_file):
+            raise DBNotFoundError(db_file)
+
+        conn = sqlite3.connect(db_file)
+        try:
+            rows = conn.execute("""
+                SELECT text, number, sura_name, sura_number, numberInSurah, juz, hizb, page, hizbQuarter, sajda, sajdaObligation
+                FROM quran
+                ORDER BY number;
+            """).fetchall()
+        finally:
+            conn.close()
+
+        self.text: List[str] = [row[0] for row in rows]
+        self.number = array("i", (row[1] for row in rows))
+        self.sura_number = array("i", (row[3] for row in rows))
+        self.number_in_surah = array("i", (row[4] for row in rows))
+        self.juz = array("i", (row[5] for row in rows))
+        self.hizb = array("i", (row[6] for row in rows))
+        self.page = array("i", (row[7] for row in rows))
+        self.hizb_quarter = array("i", (row[8] for row in rows))
+        self.sajda = array("b", (int(bool(row[9])) for row in rows))
+        self.sajda_obligation = array("b", (int(bool(row[10])) for row in rows))
+
+        # Surah names are stored once per surah instead of once per ayah.
+        self.sura_names: List[str] = [""] * (max(self.sura_number, default=0) + 1)
+        for row in rows:
+            self.sura_names[row[3]] = row[2]
+
+        division_columns = (self.page, self.sura_number, self.hizb_quarter, self.hizb, self.juz)
+        self._offsets = [self._build_offsets(column) for column in division_columns]
+        self._division_columns = division_columns
+
+    @classmethod
+    def load(cls, db_file: Union[str, os.PathLike]) -> "QuranCorpus":
+        """Return the corpus of db_file, reading the database only the first time."""
+        key = os.path.abspath(db_file)
+        if key not in cls._instances:
+            cls._instances[key] = cls(db_file)
+        return cls._instances[key]
+
+    @staticmethod
+    def _build_offsets(column: array) -> array:
+        """offsets[value] is the first row of the division, offsets[value + 1] is its end."""
+        max_value = max(column, default=0)
+        offsets = array("i", [0] * (max_value + 2))
+        offsets[max_value + 1] = len(column)
+        for value in range(max_value, 0, -1):
+            offsets[value] = bisect_left(column, value)
+        return offsets
+
+    def __len__(self) -> int:
+        return len(self.text)
+
+    def get_max(self, division: int) -> int:
+        return len(self._offsets[division]) - 2
+
+    def get_division_bounds(self, division: int, position: int) -> Tuple[int, int]:
+        """Return the (start, stop) row indexes of a division."""
+        offsets = self._offsets[division]
+        if not 1 <= position < len(offsets) - 1:
+            return 0, 0
+        return offsets[position], offsets[position + 1]
+
+    def get_division_value(self, division: int, index: int) -> int:
+        return self._division_columns[division][index]
+
+    def index_of(self, ayah_number: int) -> int:
+        """Return the row index of an ayah, or -1 if not found."""
+        index = bisect_left(self.number, ayah_number)
+        if index < len(self.number) and self.number[index] == ayah_number:
+            return index
+        return -1
+
+    def get_surah_bounds(self, surah_number: int) -> Tuple[int, int]:
+        return self.get_division_bounds(self.SURAH, surah_number)
+
+    def get_row(self, index: int) -> tuple:
+        return (
+            self.text[index],
+            self.number[index],
+            self.sura_names[self.sura_number[index]],
+            self.sura_number[index],
+            self.number_in_surah[index],
+            self.juz[index],
+            self.hizb[index],
+            self.page[index],
+            self.hizb_quarter[index],
+            self.sajda[index],
+            self.sajda_obligation[index],
+            None,
+            None
+        )
+
+    def get_ayah_info(self, ayah_number: int) -> Optional[Tuple[int, int, str, int]]:
+        """Return (sura_number, number, sura_name, numberInSurah) of an ayah, or None if not found."""
+        index = self.index_of(ayah_number)
+        if index == -1:
+            return None
+        sura_number = self.sura_number[index]
+        return sura_number, self.number[index], self.sura_names[sura_number], self.number_in_surah[index]
+
+    def get_rows(self, start: int, stop: int) -> List[tuple]:
+        """Rows in the same layout as quran_mgr.data_list."""
+        return [self.get_row(index) for index in range(start, stop)]
+
+    def get_division(self, division: int, position: int) -> List[tuple]:
+        return self.get_rows(*self.get_division_bounds(division, position))
+
+    def get_suras(self) -> List[Tuple[str, int]]:
+        return [
+            (name.replace("سورة ", ""), number)
+            for number, name in enumerate(self.sura_names)
+            if name
+        ]
@@ -1,7 +1,14 @@
 import sqlite3
-import re
 import os
-from exceptions.database import DBNotFoundError, DatabaseConnectionError, InvalidSearchTextError, InvalidCriteriaError
+from pathlib import Path
+from bisect import bisect_left, bisect_right
+from typing import Iterator, List, Optional, Tuple
+from core_functions.search_index import SearchIndex, normalize_text, split_prefix_marker
+from core_functions.word_index import WordIndex
+from core_functions.morphology_index import MorphologyIndex
+from utils.logger import Logger
+from utils.db_registry import DatabaseRegistry
+from exceptions.database import DBNotFoundError, DatabaseConnectionError, InvalidSearchTextError, InvalidCriteriaError, InvalidSearchModeError
 
 
 class SearchCriteria:
@@ -31,11 +38,38 @@ class SearchCriteria:
         return list(cls._arabic_criteria_dict.keys())
 
 
+class SearchMode:
+    text = "text"
+    root = MorphologyIndex.ROOT
+    lemma = MorphologyIndex.LEMMA
+    _arabic_modes_dict = {
+        "النص": text,
+        "الجذر": root,
+        "الأصل المعجمي": lemma
+    }
+
+    @classmethod
+    def is_valid(cls, search_mode) -> bool:
+        return search_mode in cls._arabic_modes_dict.values()
+
+    @classmethod
+    def get_mode_by_arabic_name(cls, arabic_mode) -> str:
+        return cls._arabic_modes_dict.get(arabic_mode)
+
+    @classmethod
+    def get_arabic_modes(cls) -> list:
+        """Text search is always available, root and lemma modes need the morphology index."""
+        if not MorphologyIndex.is_available():
+            return ["النص"]
+        return list(cls._arabic_modes_dict.keys())
+
+
 class QuranSearchManager:
     def __init__(self):
         self.no_tashkil = False
         self.no_hamza = False
         self.match_whole_word = False
+        self.search_mode = SearchMode.text
         self._criteria = None
         self._from = None
         self._to = None
@@ -43,13 +77,18 @@ class QuranSearchManager:
         self._to_ayah = None
         self._conn = None
         self._cursor = None
+        self._file_path = None
+        self._index_available = False
         self._connect()
 
-    def set(self, no_tashkil:bool=False, no_hamza:bool=False, match_whole_word:bool=False, criteria:str=None, _from:int=None, _to:int=None, from_ayah:int=None, to_ayah:int=None) -> None:
+    def set(self, no_tashkil:bool=False, no_hamza:bool=False, match_whole_word:bool=False, criteria:str=None, _from:int=None, _to:int=None, from_ayah:int=None, to_ayah:int=None, search_mode:str=SearchMode.text) -> None:
 
         if not  SearchCriteria.is_valid(criteria):
             raise InvalidCriteriaError(criteria)
 
+        if not SearchMode.is_valid(search_mode):
+            raise InvalidSearchModeError(search_mode)
+
         if self._conn is None:
                 raise DatabaseConnectionError("QuranSearchManager._conn is None, you must connect to database first.")
 
@@ -75,6 +114,7 @@ class QuranSearchManager:
         self.no_tashkil = no_tashkil
         self.no_hamza = no_hamza
         self.match_whole_word = match_whole_word
+        self.search_mode = search_mode
         self._from = _from
         self._to = _to
         self._from_ayah = from_ayah
@@ -86,14 +126,33 @@ class QuranSearchManager:
         if not os.path.isfile(file_path):
             raise DBNotFoundError(file_path)
         
-        # connect to database
+        # connect to database, the connection is shared with the other managers of this thread.
+        self._file_path = file_path
+        self._conn = DatabaseRegistry.get(file_path)
+        self._cursor = self._conn.cursor()
+
+        self._attach_index()
+
+    def _attach_index(self) -> None:
+        """Attach the full-text index. Until it is built in the background, search falls back to scanning."""
+        if not SearchIndex.is_ready() and not SearchIndex.is_built():
+            SearchIndex.build_in_background()
+            self._index_available = False
+            return
         try:
-            self._conn = sqlite3.connect(file_path)
-            self._conn.row_factory = sqlite3.Row
-            self._conn.create_function("REGEXP", 2, lambda expr, item: re.search(expr, item) is not None)
-            self._cursor = self._conn.cursor()
-        except sqlite3.Error as e:
-            raise DatabaseConnectionError(cause=e)
+            self._cursor.execute("PRAGMA database_list;")
+            if not any(row["name"] == "search_index" for row in self._cursor.fetchall()):
+                self._cursor.execute("ATTACH DATABASE ? AS search_index;", (f"{Path(SearchIndex.file_path).as_uri()}?mode=ro",))
+            self._index_available = True
+        except (sqlite3.Error, OSError) as e:
+            Logger.error(f"Search index is not available, falling back to full scan: {e}")
+            self._index_available = False
+
+    def _has_index(self) -> bool:
+        """Whether the index is attached, attaching it once its background build finished."""
+        if not self._index_available and SearchIndex.is_ready():
+            self._attach_index()
+        return self._index_available
     
     def search(self, search_text:str) -> list:
 
@@ -103,45 +162,195 @@ class QuranSearchManager:
         if not search_text:
             return None
 
-        if self.match_whole_word:
-            operator = "REGEXP"
-            search_text = rf"\b{search_text}\b"
-        else:
-            operator = "LIKE"
-            search_text = f"%{search_text}%"
-
-        query = f"SELECT * FROM quran WHERE {self._criteria} >= ? AND {self._criteria} <= ? AND text {operator} ?;"
-        if self.no_tashkil:
-            # remove all tashkil from the text to search
-            tashkil = ['َ', 'ً', 'ُ', 'ٌ', 'ِ', 'ٍ', 'ْ', 'ّ']
-            for char in tashkil:
-                search_text = search_text.replace(char, '')
-                query = query.replace('AND text', f"AND REPLACE(text, '{char}', '')")
-                query = query.replace('REPLACE(text', f"REPLACE(REPLACE(text, '{char}', '')")
-        if self.no_hamza:
-            # replace all hamzat with 'ا'
-            hamzat = ['أ', 'إ', 'آ', 'ء', 'ؤ']
-            for char in hamzat:
-                search_text = search_text.replace(char, 'ا')
-                # replace all hamzat with 'ا' in the SQL query
-                query = query.replace('AND text', f"AND REPLACE(text, '{char}', 'ا')")
-                query = query.replace('REPLACE(text', f"REPLACE(REPLACE(text, '{char}', 'ا')")
-
-        self._cursor.execute(query, (self._from, self._to, search_text))
-        result = self._cursor.fetchall()
+        if self.search_mode != SearchMode.text:
+            return self._search_morphology(search_text)
+
+        result = self._search_with_index(search_text)
+        if result is None:
+            result = self._search_without_index(search_text)
         return result
 
+    def iter_search(self, search_text: str, page_size: int = 50, ranked: bool = False) -> Iterator[list]:
+        """
+        Yield the results of search_text in pages of page_size rows, read from the
+        database only when the next page is requested.
+
+        When ranked, index results are ordered by relevance instead of ayah number:
+        bm25 (term frequency and verse length), doubled when the verse contains the
+        text exactly as typed, diacritics included. Ranked whole-word queries of
+        several words also match the words near each other, ahead of which come the
+        verses containing the exact phrase.
+        """
+        if not isinstance(search_text, str):
+            raise InvalidSearchTextError(search_text)
+        if not search_text:
+            return
+
+        query = self._get_index_query(search_text, ranked) if self.search_mode == SearchMode.text else None
+        if query is None:
+            result = self.search(search_text) or []
+            for start in range(0, len(result), page_size):
+                yield result[start:start + page_size]
+            return
+
+        # A cursor of its own, so other queries can run while the pages are consumed.
+        from_where, where_params, order_by, order_params = query
+        cursor = self._conn.cursor()
+        try:
+            cursor.execute(f"SELECT quran.* {from_where} {order_by};", where_params + order_params)
+            while True:
+                rows = cursor.fetchmany(page_size)
+                if not rows:
+                    return
+                yield rows
+        finally:
+            cursor.close()
+
+    def count(self, search_text: str, ranked: bool = False) -> int:
+        """Number of results of search_text, ranked whole-word queries also count the near matches."""
+        if not search_text:
+            return 0
+        query = self._get_index_query(search_text, ranked) if self.search_mode == SearchMode.text else None
+        if query is None:
+            return len(self.search(search_text) or [])
+
+        from_where, where_params, _, _ = query
+        self._cursor.execute(f"SELECT COUNT(*) {from_where};", where_params)
+        return self._cursor.fetchone()[0]
+
+    def _search_with_index(self, search_text: str) -> list:
+        """Search the FTS5 index, returns None if the query can not be answered by the index."""
+        query = self._get_index_query(search_text)
+        if query is None:
+            return None
+
+        from_where, where_params, order_by, order_params = query
+        self._cursor.execute(f"SELECT quran.* {from_where} {order_by};", where_params + order_params)
+        return self._cursor.fetchall()
+
+    def _get_index_query(self, search_text: str, ranked: bool = False) -> Optional[Tuple[str, tuple, str, tuple]]:
+        """
+        Build the FROM/WHERE clause of an index search, its parameters, the ORDER BY
+        clause and its parameters, or return None if the query can not be answered
+        by the index.
+        """
+        if not self._has_index():
+            return None
+
+        column = SearchIndex.get_column(self.no_tashkil, self.no_hamza)
+        if column is None:
+            return None
+
+        exact_text, _ = split_prefix_marker(search_text, self.match_whole_word)
+        exact_rank = "(CASE WHEN instr(quran.text, ?) > 0 THEN 2 ELSE 1 END)"
+        table = "verses_words" if self.match_whole_word else "verses_substrings"
+        search_text = normalize_text(search_text, self.no_tashkil, self.no_hamza)
+        match_query = SearchIndex.build_match_query(column, search_text, self.match_whole_word)
+        first, last = SearchIndex.get_number_range(self._cursor, self._criteria, self._from, self._to)
+        if match_query is None:
+            search_text = search_text.strip()
+            if self.match_whole_word or not search_text:
+                return None
+            # Too short for the trigram index, compare with the stored normalized text.
+            from_where = f"""
+                FROM search_index.verses
+                JOIN quran ON quran.number = verses.number
+                WHERE verses.{column} LIKE ? AND verses.number BETWEEN ? AND ?
+            """
+            if ranked:
+                return from_where, (f"%{search_text}%", first, last), f"ORDER BY {exact_rank} DESC, verses.number", (exact_text,)
+            return from_where, (f"%{search_text}%", first, last), "ORDER BY verses.number", ()
+
+        from_where = f"""
+            FROM search_index.{table}
+            JOIN quran ON quran.number = {table}.rowid
+            WHERE {table} MATCH ? AND {table}.rowid BETWEEN ? AND ?
+        """
+        if not ranked:
+            return from_where, (match_query, first, last), f"ORDER BY {table}.rowid", ()
+
+        near_query = SearchIndex.build_near_query(column, search_text) if self.match_whole_word else None
+        if near_query is None:
+            return from_where, (match_query, first, last), f"ORDER BY bm25({table}) * {exact_rank}, {table}.rowid", (exact_text,)
+
+        phrase_rank = f"(CASE WHEN {table}.rowid IN (SELECT rowid FROM search_index.{table} WHERE {table} MATCH ?) THEN 4 ELSE 1 END)"
+        order_by = f"ORDER BY bm25({table}) * {phrase_rank} * {exact_rank}, {table}.rowid"
+        return from_where, (near_query, first, last), order_by, (match_query, exact_text)
+
+    def _search_without_index(self, search_text: str) -> list:
+        """Search the in-memory word index, used only when the FTS index could not be built."""
+        search_text = normalize_text(search_text, self.no_tashkil, self.no_hamza)
+        word_index = WordIndex.load(self._file_path, self.no_tashkil, self.no_hamza)
+        first, last = self._get_number_range()
+        return self._fetch_rows(word_index.search(search_text, self.match_whole_word, first, last))
+
+    def _search_morphology(self, search_text: str) -> list:
+        """Find the ayahs containing words of the root or lemma of search_text."""
+        numbers = MorphologyIndex.load().get_ayahs(self.search_mode, search_text)
+        first, last = self._get_number_range()
+        return self._fetch_rows(numbers[bisect_left(numbers, first):bisect_right(numbers, last)])
+
+    def _get_number_range(self) -> Tuple[int, int]:
+        """Divisions are contiguous, so a division range is a range of ayah numbers."""
+        self._cursor.execute(f"SELECT MIN(number), MAX(number) FROM quran WHERE {self._criteria} BETWEEN ? AND ?;", (self._from, self._to))
+        first, last = self._cursor.fetchone()
+        return first or 0, last or 0
+
+    def _fetch_rows(self, numbers: List[int], chunk_size: int = 500) -> list:
+        """Fetch the rows of ayah numbers, in chunks to stay under the SQLite variable limit."""
+        rows = []
+        for start in range(0, len(numbers), chunk_size):
+            chunk = numbers[start:start + chunk_size]
+            self._cursor.execute(f"SELECT * FROM quran WHERE number IN ({', '.join('?' * len(chunk))}) ORDER BY number;", chunk)
+            rows.extend(self._cursor.fetchall())
+        return rows
+
+    def get_candidates(self, search_text: str) -> List[Tuple[sqlite3.Row, str]]:
+        """
+        Return (row, normalized text) for the ayahs of the range whose normalized text
+        contains search_text, whatever match_whole_word is.
+
+        A longer search text only matches a subset of these rows, which is what
+        IncrementalSearch relies on to narrow results in memory.
+        """
+        search_text, _ = split_prefix_marker(normalize_text(search_text, self.no_tashkil, self.no_hamza), self.match_whole_word)
+        if not search_text:
+            return []
+
+        column = SearchIndex.get_column(self.no_tashkil, self.no_hamza)
+        if self._has_index() and column is not None:
+            first, last = SearchIndex.get_number_range(self._cursor, self._criteria, self._from, self._to)
+            match_query = SearchIndex.build_match_query(column, search_text, False)
+            if match_query is None:
+                query = f"""
+                    SELECT quran.*, verses.{column} AS normalized_text FROM search_index.verses
+                    JOIN quran ON quran.number = verses.number
+                    WHERE verses.{column} LIKE ? AND verses.number BETWEEN ? AND ?
+                    ORDER BY verses.number;
+                """
+                self._cursor.execute(query, (f"%{search_text}%", first, last))
+            else:
+                query = f"""
+                    SELECT quran.*, verses_substrings.{column} AS normalized_text FROM search_index.verses_substrings
+                    JOIN quran ON quran.number = verses_substrings.rowid
+                    WHERE verses_substrings MATCH ? AND verses_substrings.rowid BETWEEN ? AND ?
+                    ORDER BY verses_substrings.rowid;
+                """
+                self._cursor.execute(query, (match_query, first, last))
+            return [(row, row["normalized_text"]) for row in self._cursor.fetchall()]
+
+        word_index = WordIndex.load(self._file_path, self.no_tashkil, self.no_hamza)
+        first, last = self._get_number_range()
+        rows = self._fetch_rows(word_index.search(search_text, False, first, last))
+        return [(row, word_index.get_text(row["number"])) for row in rows]
+
     def __str__(self) -> str:
         return "Quran Search Manager Information:\n" \
             "No Tashkil: {}\n" \
             "No Hamza: {}\n" \
+            "Search Mode: {}\n" \
             "Criteria: {}\n" \
             "From: {}\n" \
             "To: {}\n" \
             "From Ayah: {}\n" \
-            "To Ayah: {}\n".format(self.no_tashkil, self.no_hamza, self._criteria, self._from, self._to, self._from_ayah, self._to_ayah)
-
-    def __del__(self):
-        if self._conn is not None:
-            self._conn.close()
-
+            "To Ayah: {}\n".format(self.no_tashkil, self.no_hamza, self.search_mode, self._criteria, self._from, self._to, self._from_ayah, self._to_ayah)
@@ -0,0 +1,235 @@
+import os
+import re
+import sqlite3
+import threading
+from typing import Optional, Tuple
+from utils.const import albayan_folder
+from utils.logger import Logger
+from exceptions.database import DBNotFoundError
+
+
+# Harakat, tanween, shadda, sukun and the other combining marks (U+064B-U+065F),
+# superscript alef, tatweel and the Uthmani annotation marks (U+06D6-U+06ED).
+TASHKIL = tuple(map(chr, (*range(0x064B, 0x0660), 0x0670, 0x0640, *range(0x06D6, 0x06EE))))
+HAMZAT = {
+    'أ': 'ا',
+    'إ': 'ا',
+    'آ': 'ا',
+    'ء': 'ا',
+    'ؤ': 'ا',
+    'ٱ': 'ا',
+    'ئ': 'ي',
+    chr(0x0654): '',
+    chr(0x0655): '',
+}
+_tashkil_table = str.maketrans("", "", "".join(TASHKIL))
+_hamza_table = str.maketrans(HAMZAT)
+
+
+def normalize_text(text: str, no_tashkil: bool = False, no_hamza: bool = False) -> str:
+    """Remove tashkil and/or replace hamzat, the same way for the index and the searched text."""
+    if no_tashkil:
+        text = text.translate(_tashkil_table)
+    if no_hamza:
+        text = text.translate(_hamza_table)
+    return text
+
+
+def split_prefix_marker(search_text: str, whole_word: bool) -> Tuple[str, bool]:
+    """
+    Return search_text without its trailing * and whether the last word is a prefix.
+    The * is a prefix marker in whole-word searches only, substring searches keep it as typed.
+    """
+    prefix = whole_word and search_text.endswith("*")
+    if whole_word:
+        search_text = search_text.rstrip("*")
+    return search_text.strip(), prefix
+
+
+def compile_word_pattern(search_text: str, prefix: bool = False) -> re.Pattern:
+    """Match search_text as whole words of an already normalized text, or as the start of a word if prefix."""
+    words = r"\s+".join(map(re.escape, search_text.split()))
+    return re.compile(rf"(?<!\S){words}" + ("" if prefix else r"(?!\S)"))
+
+
+class SearchIndex:
+    """
+    FTS5 index over Verses.DB, generated once into the user data folder.
+
+    verses stores, for every ayah, its divisions and one normalized text per
+    combination of the ignore tashkil / ignore hamza options, so searching never
+    normalizes the Quran text at query time.
+    verses_words (word index, for whole-word, prefix and phrase queries) and
+    verses_substrings (trigram index, for substring queries) index those texts,
+    with the ayah number as rowid.
+
+    The index takes seconds to build on a slow machine, so it is built by
+    build_in_background() and searches scan Verses.DB until is_ready().
+    """
+
+    version = 2
+    file_path = os.path.join(albayan_folder, "search_index.db")
+    source_path = os.path.join("database", "quran", "Verses.DB")
+    word_tokenizer = "unicode61 remove_diacritics 0 categories 'L* N* Co M*'"
+    columns = {
+        (False, False): "text",
+        (True, False): "text_no_tashkil",
+        (False, True): "text_no_hamza",
+        (True, True): "text_normalized",
+    }
+
+    _ready = False
+    # Held for the whole build, only ever taken by the building thread.
+    _build_lock = threading.Lock()
+    # Guards _build_thread only, so callers on the UI thread never wait for a build.
+    _thread_lock = threading.Lock()
+    _build_thread: Optional[threading.Thread] = None
+
+    @classmethod
+    def is_built(cls) -> bool:
+        if not os.path.isfile(cls.file_path):
+            return False
+        try:
+            conn = sqlite3.connect(cls.file_path)
+            try:
+                cls._ready = conn.execute("PRAGMA user_version;").fetchone()[0] == cls.version
+                return cls._ready
+            finally:
+                conn.close()
+        except sqlite3.Error:
+            return False
+
+    @classmethod
+    def is_ready(cls) -> bool:
+        """Whether the index was found built, without opening it again."""
+        return cls._ready
+
+    @classmethod
+    def ensure_built(cls) -> None:
+        with cls._build_lock:
+            if not cls.is_built():
+                cls.build()
+                cls._ready = True
+
+    @classmethod
+    def build_in_background(cls) -> Optional[threading.Thread]:
+        """Build the index on a background thread unless it is ready or already being built."""
+        def run() -> None:
+            try:
+                cls.ensure_built()
+            except Exception as e:
+                Logger.error(f"Could not build the search index: {e}")
+
+        with cls._thread_lock:
+            if cls._ready or (cls._build_thread is not None and cls._build_thread.is_alive()):
+                return cls._build_thread
+            cls._build_thread = threading.Thread(target=run, name="SearchIndexBuild", daemon=True)
+            cls._build_thread.start()
+            return cls._build_thread
+
+    @classmethod
+    def build(cls) -> None:
+        """Build the index in a temporary file and move it into place once complete."""
+        if not os.path.isfile(cls.source_path):
+            raise DBNotFoundError(cls.source_path)
+
+        temp_path = cls.file_path + ".tmp"
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+        source = sqlite3.connect(cls.source_path)
+        conn = sqlite3.connect(temp_path)
+        try:
+            text_columns = ", ".join(cls.columns.values())
+            conn.executescript(f"""
+                CREATE TABLE verses (
+                    number INTEGER PRIMARY KEY,
+                    page INTEGER,
+                    sura_number INTEGER,
+                    hizb INTEGER,
+                    juz INTEGER,
+                    hizbQuarter INTEGER,
+                    text TEXT,
+                    text_no_tashkil TEXT,
+                    text_no_hamza TEXT,
+                    text_normalized TEXT
+                );
+                CREATE INDEX idx_verses_page ON verses(page, number);
+                CREATE INDEX idx_verses_sura_number ON verses(sura_number, number);
+                CREATE INDEX idx_verses_hizb ON verses(hizb, number);
+                CREATE INDEX idx_verses_juz ON verses(juz, number);
+                CREATE INDEX idx_verses_hizbQuarter ON verses(hizbQuarter, number);
+                CREATE VIRTUAL TABLE verses_words USING fts5(
+                    {text_columns}, content='verses', content_rowid='number', tokenize="{cls.word_tokenizer}"
+                );
+                CREATE VIRTUAL TABLE verses_substrings USING fts5(
+                    {text_columns}, content='verses', content_rowid='number', tokenize='trigram'
+                );
+            """)
+
+            rows = source.execute("SELECT number, page, sura_number, hizb, juz, hizbQuarter, text FROM quran ORDER BY number;").fetchall()
+            conn.executemany(
+                "INSERT INTO verses VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?);",
+                [
+                    (*row, *(normalize_text(row[6], no_tashkil, no_hamza) for no_tashkil, no_hamza in list(cls.columns)[1:]))
+                    for row in rows
+                ]
+            )
+            conn.execute("INSERT INTO verses_words(verses_words) VALUES ('rebuild');")
+            conn.execute("INSERT INTO verses_substrings(verses_substrings) VALUES ('rebuild');")
+            conn.execute("INSERT INTO verses_words(verses_words) VALUES ('optimize');")
+            conn.execute("INSERT INTO verses_substrings(verses_substrings) VALUES ('optimize');")
+            conn.execute(f"PRAGMA user_version = {cls.version};")
+            conn.commit()
+        finally:
+            conn.close()
+            source.close()
+
+        os.replace(temp_path, cls.file_path)
+
+    @classmethod
+    def get_column(cls, no_tashkil: bool, no_hamza: bool) -> Optional[str]:
+        """Return the indexed column for a normalization, or None if it is not indexed."""
+        return cls.columns.get((no_tashkil, no_hamza))
+
+    @staticmethod
+    def build_match_query(column: str, search_text: str, whole_word: bool) -> Optional[str]:
+        """
+        Build an FTS5 query restricted to column.
+
+        Whole-word queries are phrase queries on verses_words, a trailing * makes the
+        last word a prefix. Other queries are substring queries on verses_substrings,
+        which needs at least three characters, shorter ones return None and should
+        be matched against the stored text of the verses table instead.
+        """
+        search_text, prefix = split_prefix_marker(search_text, whole_word)
+        if not search_text or (not whole_word and len(search_text) < 3):
+            return None
+
+        phrase = '"{}"'.format(search_text.replace('"', '""'))
+        if prefix:
+            phrase += " *"
+        return f"{{{column}}} : {phrase}"
+
+    @staticmethod
+    def build_near_query(column: str, search_text: str, distance: int = 10) -> Optional[str]:
+        """
+        Build an FTS5 query matching the words of search_text in any order, at most
+        distance words apart, or None for a single word.
+        """
+        prefix = search_text.endswith("*")
+        words = search_text.rstrip("*").split()
+        if len(words) < 2:
+            return None
+
+        phrases = ['"{}"'.format(word.replace('"', '""')) for word in words]
+        if prefix:
+            phrases[-1] += " *"
+        return f"{{{column}}} : NEAR({' '.join(phrases)}, {distance})"
+
+    @staticmethod
+    def get_number_range(cursor: sqlite3.Cursor, criteria: str, _from: int, _to: int) -> Tuple[int, int]:
+        """Divisions are contiguous, so a division range is a range of ayah numbers."""
+        cursor.execute(f"SELECT MIN(number), MAX(number) FROM search_index.verses WHERE {criteria} BETWEEN ? AND ?;", (_from, _to))
+        first, last = cursor.fetchone()
+        return first or 0, last or 0
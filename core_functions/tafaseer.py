@@ -1,5 +1,12 @@
-import sqlite3
 import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+from core_functions.quran_corpus import QuranCorpus
+from core_functions.tafsir_store import CompressedTafsir
+from utils.db_registry import DatabaseRegistry
 from exceptions.database import DBNotFoundError
 
 class Category:
@@ -34,53 +41,215 @@ class Category:
         return list(cls._category_in_arabic.keys())
 
 class TafaseerManager:
-    def __init__(self) -> None:
+    """
+    Reads the tafsir of an ayah from the tafaseer databases.
+
+    With open_all, the tafsir of an ayah is fetched from every installed database
+    at once on a thread pool, each worker keeping its own connections open, and
+    the neighbouring ayahs can be prefetched, so switching tafsir or stepping to
+    the next or previous ayah does not wait for the database. The pool is shared
+    by all managers, so opening the dialog again reuses its threads and their
+    connections.
+
+    Formatted texts are kept in an LRU cache shared by all managers, bounded by
+    their total length since a single entry can be tens of KB.
+
+    A tafsir installed as a compressed file (see CompressedTafsir) is read from it
+    in place of its database.
+    """
+
+    prefetch_size = 8
+    text_cache_max_chars = 4_000_000
+    _text_cache: "OrderedDict[Tuple[str, int, int], str]" = OrderedDict()
+    _text_cache_chars = 0
+    _text_cache_lock = threading.Lock()
+    _shared_executor: Optional[ThreadPoolExecutor] = None
+    _shared_executor_lock = threading.Lock()
+
+    def __init__(self, open_all: bool = False) -> None:
         self._tafaseer_category = None
         self._conn = None  
+        self.open_all = open_all
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._entries: "OrderedDict[Tuple[int, int], Dict[str, Future]]" = OrderedDict()
+        self._entries_lock = threading.Lock()
+        self._installed_categories: List[str] = []
+        if open_all:
+            self._installed_categories = self.get_installed_categories()
+            self._executor = self._get_shared_executor()
+
+    @classmethod
+    def _get_shared_executor(cls) -> ThreadPoolExecutor:
+        with cls._shared_executor_lock:
+            if cls._shared_executor is None:
+                # One worker per category at most, started as needed.
+                cls._shared_executor = ThreadPoolExecutor(max_workers=len(Category._category_in_arabic), thread_name_prefix="Tafaseer")
+            return cls._shared_executor
+
+    @staticmethod
+    def get_file_path(tafaseer_category: str) -> str:
+        return os.path.join("database", "tafaseer", tafaseer_category + ".db")
+
+    @classmethod
+    def is_installed(cls, tafaseer_category: str) -> bool:
+        file_path = cls.get_file_path(tafaseer_category)
+        return os.path.isfile(CompressedTafsir.get_path(file_path)) or os.path.isfile(file_path)
+
+    @classmethod
+    def get_installed_categories(cls) -> List[str]:
+        return [category for category in Category._category_in_arabic.values() if cls.is_installed(category)]
 
     def set(self, tafaseer_category: str) -> None:
         assert Category.is_valid(tafaseer_category), "Invalid tafaseer category."
+        if self.open_all and not self.is_installed(tafaseer_category):
+            raise DBNotFoundError(self.get_file_path(tafaseer_category))
         self._tafaseer_category = tafaseer_category
-        self._connect_to_database()
+        if not self.open_all:
+            self._connect_to_database()
 
     def _connect_to_database(self) -> None:
         assert self._tafaseer_category is not None, "You must set tafaseer category."
-        file_path = os.path.join("database", "tafaseer", self._tafaseer_category + ".db")
-        if not os.path.isfile(file_path):
-            raise DBNotFoundError(file_path)
-        self._conn = sqlite3.connect(file_path)
-        self._conn.row_factory = sqlite3.Row 
-        self._cursor = self._conn.cursor()
+        self._conn = self._open_source(self._tafaseer_category)
+
+    @classmethod
+    def _open_source(cls, tafaseer_category: str) -> Union[CompressedTafsir, sqlite3.Connection]:
+        """The compressed file of the category if installed, otherwise this thread's connection to its database."""
+        file_path = cls.get_file_path(tafaseer_category)
+        store_path = CompressedTafsir.get_path(file_path)
+        if os.path.isfile(store_path):
+            return CompressedTafsir.open(store_path)
+        return DatabaseRegistry.get(file_path)
 
     def get_tafaseer(self, surah_number, ayah_number) -> str:
+        if self.open_all:
+            assert self._tafaseer_category is not None, "You must set tafaseer category."
+            return self._get_entry(surah_number, ayah_number)[self._tafaseer_category].result()
+
         assert self._conn is not None, "You must connect to database first."
         assert 1 <= surah_number <= 114, "Out of surah range."
         assert 1 <= ayah_number, "Out of ayah range."
-        query = "SELECT text FROM tafsir_{} WHERE number = ?".format(surah_number)
-        self._cursor.execute(query, [ayah_number])
-        result = self._cursor.fetchone()
+        return self._read(self._conn, self._tafaseer_category, surah_number, ayah_number)
+
+    def get_all_tafaseer(self, surah_number: int, ayah_number: int) -> Dict[str, str]:
+        """Return the tafsir of an ayah from every installed database, by category."""
+        assert self.open_all, "TafaseerManager must be created with open_all."
+        return {category: future.result() for category, future in self._get_entry(surah_number, ayah_number).items()}
+
+    def prefetch(self, ayah_number: int) -> None:
+        """Start fetching the tafaseer of the ayahs before and after ayah_number."""
+        if not self.open_all:
+            return
+        corpus = QuranCorpus.load(os.path.join("database", "quran", "quran.DB"))
+        for number in (ayah_number + 1, ayah_number - 1):
+            ayah_info = corpus.get_ayah_info(number)
+            if ayah_info is not None:
+                self._get_entry(ayah_info[0], number)
+
+    def _get_entry(self, surah_number: int, ayah_number: int) -> Dict[str, Future]:
+        assert 1 <= surah_number <= 114, "Out of surah range."
+        assert 1 <= ayah_number, "Out of ayah range."
+        key = (surah_number, ayah_number)
+        with self._entries_lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                return entry
+
+            entry = {
+                category: self._executor.submit(self.read, category, surah_number, ayah_number)
+                for category in self._installed_categories
+            }
+            self._entries[key] = entry
+            if len(self._entries) > self.prefetch_size:
+                self._entries.popitem(last=False)
+            return entry
 
-        return self.get_text(result)
+    @classmethod
+    def read(cls, tafaseer_category: str, surah_number: int, ayah_number: int) -> str:
+        """Return the formatted tafsir of an ayah from a category, can be called from any thread."""
+        return cls._read(cls._open_source(tafaseer_category), tafaseer_category, surah_number, ayah_number)
+
+    @classmethod
+    def _read(cls, source, tafaseer_category: str, surah_number: int, ayah_number: int) -> str:
+        """Return the formatted tafsir from the cache, or read and format it."""
+        key = (tafaseer_category, surah_number, ayah_number)
+        text = cls._get_cached_text(key)
+        if text is None:
+            if isinstance(source, CompressedTafsir):
+                text = cls.format_text(source.get_text(ayah_number))
+            else:
+                query = "SELECT text FROM tafsir_{} WHERE number = ?".format(surah_number)
+                row = source.execute(query, [ayah_number]).fetchone()
+                text = cls.format_text(row["text"] if row else None)
+            cls._store_text(key, text)
+        return text
+
+    @classmethod
+    def _get_cached_text(cls, key: Tuple[str, int, int]) -> Optional[str]:
+        with cls._text_cache_lock:
+            text = cls._text_cache.get(key)
+            if text is not None:
+                cls._text_cache.move_to_end(key)
+            return text
+
+    @classmethod
+    def _store_text(cls, key: Tuple[str, int, int], text: str) -> None:
+        with cls._text_cache_lock:
+            if key in cls._text_cache:
+                return
+            cls._text_cache[key] = text
+            cls._text_cache_chars += len(text)
+            while cls._text_cache_chars > cls.text_cache_max_chars and len(cls._text_cache) > 1:
+                _, evicted = cls._text_cache.popitem(last=False)
+                cls._text_cache_chars -= len(evicted)
+
+    @classmethod
+    def clear_cache(cls) -> None:
+        with cls._text_cache_lock:
+            cls._text_cache.clear()
+            cls._text_cache_chars = 0
+
+    @staticmethod
+    def split_chunks(text: str, chunk_size: int = 4000) -> Iterator[str]:
+        """
+        Split text into chunks of about chunk_size characters, ending at line ends
+        where possible, to display long tafaseer progressively. Joined, the chunks
+        are the original text.
+        """
+        start = 0
+        while start < len(text):
+            stop = start + chunk_size
+            if stop < len(text):
+                line_end = text.rfind("\n", start, stop)
+                if line_end > start:
+                    stop = line_end + 1
+            yield text[start:stop]
+            start = stop
+
+    def close(self) -> None:
+        """Drop the pending prefetches of an open_all manager, the shared pool keeps running."""
+        with self._entries_lock:
+            for entry in self._entries.values():
+                for future in entry.values():
+                    future.cancel()
+            self._entries.clear()
+        self._executor = None
 
     def get_text(self, row) -> str:
+        return self.format_text(row["text"] if row else None)
+
+    @staticmethod
+    def format_text(text: Optional[str]) -> str:
 
-        if row:
-                    text = row["text"].replace(".", ". \n").strip()
+        if text:
+                    text = text.replace(".", ". \n").strip()
         else:
             return ""
 
         # Remove empty lines.
-        lines = text.split("\n")
-        lines = list(filter(lambda x: x.strip(), lines))
-        text = "\n".join(lines)
-
-        return text
+        return "\n".join(line for line in text.split("\n") if line.strip())
 
 
     def __str__(self) -> str:
         return "Category: {}".format(self._tafaseer_category)
 
-    def __del__(self):
-        if self._conn:
-            self._conn.close()
-
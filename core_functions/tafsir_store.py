@@ -0,0 +1,188 @@
+import os
+import sqlite3
+import sys
+import threading
+import zlib
+from array import array
+from collections import OrderedDict
+from typing import Dict, Optional, Union
+from utils.db_registry import DatabaseRegistry
+from exceptions.database import DBNotFoundError, DatabaseConnectionError
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+class CompressedTafsir:
+    """
+    Read-only tafsir stored as compressed blocks.
+
+    The ayahs of a tafsir are concatenated in order as UTF-8 and cut into blocks
+    of about block_size bytes, each compressed on its own with zlib, or zstd when
+    the zstandard module is installed. The ayahs table gives, for every ayah
+    number, its block and its byte range inside the uncompressed block, so reading
+    an ayah decompresses one block only. The index is small and is read once into
+    memory, the last decompressed blocks are kept since neighbouring ayahs share
+    them.
+
+    Files are generated from the tafaseer databases with build().
+    """
+
+    ZLIB = "zlib"
+    ZSTD = "zstd"
+    extension = ".tafsir"
+    version = 1
+    block_cache_size = 32
+    _instances: Dict[str, "CompressedTafsir"] = {}
+    _lock = threading.Lock()
+
+    def __init__(self, file_path: Union[str, os.PathLike]) -> None:
+        if not os.path.isfile(file_path):
+            raise DBNotFoundError(file_path)
+        self.file_path = os.path.abspath(file_path)
+
+        conn = DatabaseRegistry.get(self.file_path)
+        meta = dict(conn.execute("SELECT key, value FROM meta;").fetchall())
+        self.codec = meta.get("codec")
+        if self.codec == self.ZSTD:
+            if zstandard is None:
+                raise DatabaseConnectionError(f"{self.file_path} is zstd compressed and zstandard is not installed")
+            self._decompress = zstandard.ZstdDecompressor().decompress
+        elif self.codec == self.ZLIB:
+            self._decompress = zlib.decompress
+        else:
+            raise DatabaseConnectionError(f"{self.file_path} has an unknown codec: {self.codec!r}")
+
+        # Indexed by ayah number, a block of -1 marks an ayah without tafsir.
+        rows = conn.execute("SELECT number, block, offset, length FROM ayahs ORDER BY number;").fetchall()
+        size = rows[-1][0] + 1 if rows else 0
+        self.blocks = array("i", [-1]) * size
+        self.offsets = array("I", [0]) * size
+        self.lengths = array("I", [0]) * size
+        for number, block, offset, length in rows:
+            self.blocks[number] = block
+            self.offsets[number] = offset
+            self.lengths[number] = length
+
+        self._block_cache: "OrderedDict[int, bytes]" = OrderedDict()
+        self._block_cache_lock = threading.Lock()
+
+    @classmethod
+    def open(cls, file_path: Union[str, os.PathLike]) -> "CompressedTafsir":
+        """Return the shared reader of file_path, it can be used from any thread."""
+        file_path = os.path.abspath(file_path)
+        with cls._lock:
+            instance = cls._instances.get(file_path)
+            if instance is None:
+                instance = cls._instances[file_path] = cls(file_path)
+            return instance
+
+    def get_text(self, ayah_number: int) -> Optional[str]:
+        """Return the raw tafsir of an ayah, None if it has none."""
+        if not 0 <= ayah_number < len(self.blocks) or self.blocks[ayah_number] < 0:
+            return None
+        data = self._get_block(self.blocks[ayah_number])
+        offset = self.offsets[ayah_number]
+        return data[offset:offset + self.lengths[ayah_number]].decode("UTF-8")
+
+    def _get_block(self, block_id: int) -> bytes:
+        with self._block_cache_lock:
+            data = self._block_cache.get(block_id)
+            if data is not None:
+                self._block_cache.move_to_end(block_id)
+                return data
+
+        # Each thread reads through its own registry connection.
+        conn = DatabaseRegistry.get(self.file_path)
+        data = self._decompress(conn.execute("SELECT data FROM blocks WHERE id = ?;", (block_id,)).fetchone()[0])
+        with self._block_cache_lock:
+            self._block_cache[block_id] = data
+            if len(self._block_cache) > self.block_cache_size:
+                self._block_cache.popitem(last=False)
+        return data
+
+    @classmethod
+    def get_path(cls, db_path: Union[str, os.PathLike]) -> str:
+        return os.path.splitext(db_path)[0] + cls.extension
+
+    @classmethod
+    def build(
+        cls,
+        db_path: Union[str, os.PathLike],
+        output_path: Union[str, os.PathLike] = None,
+        codec: str = None,
+        block_size: int = 16384
+    ) -> None:
+        """
+        Convert a tafaseer database, whose tables tafsir_{surah} hold the text of
+        each ayah by its number in the Quran, to a compressed file next to it.
+        codec defaults to zstd when zstandard is installed, zlib otherwise.
+        """
+        output_path = output_path or cls.get_path(db_path)
+        codec = codec or (cls.ZSTD if zstandard is not None else cls.ZLIB)
+        if codec == cls.ZSTD:
+            if zstandard is None:
+                raise ValueError("zstd needs the zstandard module.")
+            compress = zstandard.ZstdCompressor(level=19).compress
+        elif codec == cls.ZLIB:
+            compress = lambda data: zlib.compress(data, 9)
+        else:
+            raise ValueError(f"Unknown codec: {codec!r}")
+        if not os.path.isfile(db_path):
+            raise DBNotFoundError(db_path)
+
+        source = sqlite3.connect(db_path)
+        try:
+            tables = [
+                row[0] for row in source.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name LIKE 'tafsir\\_%' ESCAPE '\\';")
+            ]
+            texts = {}
+            for table in tables:
+                for text, number in source.execute(f"SELECT text, number FROM {table};"):
+                    if text:
+                        texts[number] = text.encode("UTF-8")
+        finally:
+            source.close()
+
+        blocks = []
+        ayahs = []
+        block = bytearray()
+        for number in sorted(texts):
+            if block and len(block) + len(texts[number]) > block_size:
+                blocks.append(compress(bytes(block)))
+                block = bytearray()
+            ayahs.append((number, len(blocks), len(block), len(texts[number])))
+            block += texts[number]
+        if block:
+            blocks.append(compress(bytes(block)))
+
+        temp_path = str(output_path) + ".tmp"
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        conn = sqlite3.connect(temp_path)
+        try:
+            conn.executescript("""
+                PRAGMA page_size = 4096;
+                CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT) WITHOUT ROWID;
+                CREATE TABLE blocks (id INTEGER PRIMARY KEY, data BLOB);
+                CREATE TABLE ayahs (number INTEGER PRIMARY KEY, block INTEGER, offset INTEGER, length INTEGER);
+            """)
+            conn.executemany(
+                "INSERT INTO meta VALUES (?, ?);",
+                [("version", str(cls.version)), ("codec", codec), ("block_size", str(block_size))]
+            )
+            conn.executemany("INSERT INTO blocks VALUES (?, ?);", enumerate(blocks))
+            conn.executemany("INSERT INTO ayahs VALUES (?, ?, ?, ?);", ayahs)
+            conn.commit()
+            conn.execute("VACUUM;")
+        finally:
+            conn.close()
+
+        os.replace(temp_path, output_path)
+
+
+if __name__ == "__main__":
+    # python -m core_functions.tafsir_store database/tafaseer/katheer.db [zlib|zstd]
+    CompressedTafsir.build(sys.argv[1], codec=sys.argv[2] if len(sys.argv) > 2 else None)
@@ -0,0 +1,100 @@
+import os
+import sqlite3
+import threading
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Dict, List, Tuple, Union
+from core_functions.search_index import normalize_text, compile_word_pattern, split_prefix_marker
+from exceptions.database import DBNotFoundError
+
+
+class WordIndex:
+    """
+    In-memory inverted index of the words of the quran table, for one normalization.
+
+    Words are the whitespace separated tokens of the normalized text, which is what
+    whole-word matching means outside of the FTS index. A query only verifies its
+    compiled pattern against the ayahs that contain all of its words, instead of
+    every ayah of the range. Used when the FTS index is not available.
+    """
+
+    _instances: Dict[Tuple[str, bool, bool], "WordIndex"] = {}
+    _lock = threading.Lock()
+
+    def __init__(self, db_file: Union[str, os.PathLike], no_tashkil: bool = False, no_hamza: bool = False) -> None:
+        if not os.path.isfile(db_file):
+            raise DBNotFoundError(db_file)
+
+        conn = sqlite3.connect(db_file)
+        try:
+            rows = conn.execute("SELECT number, text FROM quran ORDER BY number;").fetchall()
+        finally:
+            conn.close()
+
+        self.number = array("i", (row[0] for row in rows))
+        self.text: List[str] = [normalize_text(row[1], no_tashkil, no_hamza) for row in rows]
+
+        # postings[word] holds the indexes of the ayahs containing word, in ascending order.
+        postings: Dict[str, array] = {}
+        for index, text in enumerate(self.text):
+            for word in set(text.split()):
+                postings.setdefault(word, array("i")).append(index)
+        self.postings = postings
+        self.words = sorted(postings)
+
+    @classmethod
+    def load(cls, db_file: Union[str, os.PathLike], no_tashkil: bool = False, no_hamza: bool = False) -> "WordIndex":
+        """Return the index of db_file for a normalization, building it only the first time."""
+        key = (os.path.abspath(db_file), no_tashkil, no_hamza)
+        with cls._lock:
+            if key not in cls._instances:
+                cls._instances[key] = cls(db_file, no_tashkil, no_hamza)
+            return cls._instances[key]
+
+    def _get_postings(self, word: str, prefix: bool = False) -> array:
+        if not prefix:
+            return self.postings.get(word, array("i"))
+
+        start = bisect_left(self.words, word)
+        stop = bisect_right(self.words, word + "\uffff", start)
+        if stop - start == 1:
+            return self.postings[self.words[start]]
+        return array("i", sorted({index for word in self.words[start:stop] for index in self.postings[word]}))
+
+    def get_text(self, number: int) -> str:
+        """Normalized text of ayah number."""
+        return self.text[bisect_left(self.number, number)]
+
+    def get_range(self, first: int, last: int) -> Tuple[int, int]:
+        """Indexes of the ayahs numbered first to last."""
+        return bisect_left(self.number, first), bisect_right(self.number, last)
+
+    def search(self, search_text: str, whole_word: bool, first: int, last: int) -> List[int]:
+        """
+        Return the numbers of the ayahs first to last matching search_text, which
+        must already be normalized. In whole-word searches, a trailing * makes the last word a prefix.
+        """
+        start, stop = self.get_range(first, last)
+        search_text, prefix = split_prefix_marker(search_text, whole_word)
+        if not search_text:
+            return []
+        if not whole_word:
+            return [self.number[index] for index in range(start, stop) if search_text in self.text[index]]
+
+        words = search_text.split()
+
+        postings = [self._get_postings(word) for word in words[:-1]]
+        postings.append(self._get_postings(words[-1], prefix))
+        postings.sort(key=len)
+        candidates = postings[0][bisect_left(postings[0], start):bisect_left(postings[0], stop)]
+        for other in postings[1:]:
+            if not candidates:
+                break
+            other = set(other)
+            candidates = [index for index in candidates if index in other]
+
+        if len(words) == 1:
+            # A single word posting is already an exact whole-word match.
+            return [self.number[index] for index in candidates]
+        pattern = compile_word_pattern(" ".join(words), prefix)
+        return [self.number[index] for index in candidates if pattern.search(self.text[index])]
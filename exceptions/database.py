@@ -16,3 +16,12 @@ class InvalidSearchTextError(BaseException):
     def __init__(self, search_text):
         super().__init__(f"Invalid search text: '{search_text}'", None, 104)
 
+
+class InvalidSearchModeError(BaseException):
+    def __init__(self, search_mode: str):
+        super().__init__(f"Invalid search mode: '{search_mode}'", None, 105)
+
+
+class AyahNotFoundError(BaseException):
+    def __init__(self, ayah_number):
+        super().__init__(f"Ayah not found: '{ayah_number}'", None, 106)
@@ -2,28 +2,43 @@ import sys
 import os
 from multiprocessing import freeze_support
 
+from utils.startup_profiler import StartupProfiler
+StartupProfiler.enable_from_args(sys.argv)
+
 import wx
 from wx import adv as wxadv
 
 current_dir = os.path.dirname(os.path.abspath(sys.argv[0]))
 os.chdir(current_dir)
 
-from ui.wx.quran_interface import QuranInterface
+from ui.wx.system_tray import SystemTrayManager
 from utils.update import UpdateManager
 from utils.settings import SettingsManager
 from utils.const import program_name
 from utils.logger import Logger
-from utils.audio_player import StartupSoundEffectPlayer, VolumeController
+from utils.audio_player import StartupSoundEffectPlayer, VolumeController, bass
+from utils.lazy_import import LazyImport
+from core_functions.search_index import SearchIndex
+
+# Not imported when started minimized until the window is first shown.
+QuranInterface = LazyImport("ui.wx.quran_interface", "QuranInterface")
+
+StartupProfiler.mark("imports")
 
 
 class AlbayanApp(wx.App):
     """Albayan main wxPython application."""
 
     def __init__(self):
+        with StartupProfiler.phase("settings"):
+            SettingsManager.current_settings
         super().__init__(clearSigInt=True)
         self.instance_checker = None
-        self.volume_controller = VolumeController()
-        self.frame: QuranInterface | None = None
+        with StartupProfiler.phase("volume_controller"):
+            self.volume_controller = VolumeController()
+        # The QuranInterface, built by create_main_window().
+        self.frame = None
+        self.tray: SystemTrayManager | None = None
 
     def OnInit(self) -> bool:
         app_id = "Albayan" if sys.argv[0].endswith(".exe") else "Albayan_Source"
@@ -37,13 +52,67 @@ class AlbayanApp(wx.App):
             return False
 
         self.SetAppName(program_name)
-        self.frame = QuranInterface(None, title=program_name)
-        if "--minimized" not in sys.argv:
+        minimized = "--minimized" in sys.argv
+        if minimized or SettingsManager.current_settings["general"]["run_in_background_enabled"]:
+            # Otherwise the tray icon is created if the window is later hidden to run in background.
+            with StartupProfiler.phase("tray"):
+                self.create_tray()
+
+        # Not tied to the window, which a session started minimized may never show.
+        wx.CallLater(3000, self._run_background_tasks)
+
+        if minimized:
+            # Started at login: only the tray icon runs until the window is first shown.
+            self.SetExitOnFrameDelete(False)
+            StartupProfiler.mark("ready")
+            StartupProfiler.finish()
+            return True
+
+        self.create_main_window()
+        with StartupProfiler.phase("show"):
             self.frame.Show()
+        return True
 
-        wx.CallAfter(self._post_startup)
+    def create_main_window(self) -> None:
+        with StartupProfiler.phase("main_window"):
+            self.frame = QuranInterface(None, title=program_name)
+        self.SetTopWindow(self.frame)
+        self.SetExitOnFrameDelete(True)
+        self.frame.Bind(wx.EVT_WINDOW_DESTROY, self._on_frame_destroy)
+        self.frame.Bind(wx.EVT_CLOSE, self._on_frame_close)
         self._bind_global_shortcuts()
-        return True
+        wx.CallAfter(self._post_startup)
+
+    def create_tray(self) -> None:
+        if self.tray is None:
+            self.tray = SystemTrayManager(self.show_main_window, self.quit)
+
+    def show_main_window(self) -> None:
+        if self.frame is None:
+            self.create_main_window()
+        self.frame.Show()
+        self.frame.Raise()
+
+    def quit(self) -> None:
+        if self.frame is not None:
+            # Skips the close event, which only hides the window when running in background.
+            self.frame.Destroy()
+        else:
+            self.tray.hide_icon()
+            self.ExitMainLoop()
+
+    def _on_frame_close(self, event: wx.CloseEvent) -> None:
+        # QuranInterface.OnClose hides the window when running in background, the tray icon shows it again.
+        if SettingsManager.current_settings["general"]["run_in_background_enabled"]:
+            self.create_tray()
+        self.frame.OnClose(event)
+
+    def _on_frame_destroy(self, event: wx.WindowDestroyEvent) -> None:
+        event.Skip()
+        if event.GetEventObject() is self.frame and self.tray is not None:
+            # The tray icon would keep the program running without a window.
+            self.tray.hide_icon()
+            self.tray = None
 
     def _bind_global_shortcuts(self) -> None:
         if not self.frame:
@@ -92,14 +161,30 @@ class AlbayanApp(wx.App):
         if not self.frame:
             return
 
+        if self.frame.IsShown():
+            # Called once the events queued by Show(), including the first paint, are processed.
+            StartupProfiler.mark("first_paint")
+
+        # BASS is initialized once the window is shown, off the GUI thread.
         basmala = StartupSoundEffectPlayer("Audio/basmala")
-        basmala.play()
+        bass.start(on_ready=basmala.play)
 
-        check_update_enabled = SettingsManager.current_settings["general"].get("check_update_enabled", False)
-        update_manager = UpdateManager(self.frame, check_update_enabled)
-        update_manager.check_auto_update()
         self.frame.SetFocus()
         wx.CallLater(500, self.frame.focus_quran_view)
+        if SettingsManager.current_settings["general"]["preload_in_background_enabled"]:
+            # Preload the dialogs once the window had time to show.
+            wx.CallLater(3000, LazyImport.warm_up)
+        StartupProfiler.mark("ready")
+        StartupProfiler.finish()
+
+    def _run_background_tasks(self) -> None:
+        """Check for updates and build the search index, whether or not the window was shown."""
+        check_update_enabled = SettingsManager.current_settings["general"].get("check_update_enabled", False)
+        # The update dialog has no parent while the program runs in the tray only.
+        self.update_manager = UpdateManager(self.frame, check_update_enabled)
+        self.update_manager.check_auto_update()
+        if SettingsManager.current_settings["general"]["preload_in_background_enabled"]:
+            SearchIndex.build_in_background()
 
 
 def main() -> None:
@@ -7,15 +7,13 @@ from PyQt6.QtGui import QKeySequence, QShortcut
 from PyQt6.QtCore import Qt
 from core_functions.athkar.athkar_db_manager import AthkarDBManager
 from core_functions.athkar.models import AthkarCategory
-from core_functions.athkar.athkar_scheduler import AthkarScheduler
-from utils.const import user_db_path, data_folder, athkar_db_path, default_athkar_path
+from utils.const import user_db_path, athkar_db_path
 
 class AthkarDialog(QDialog):
-    athkar_scheduler = AthkarScheduler(athkar_db_path, default_athkar_path, data_folder/"athkar/text_athkar.json")
-    athkar_scheduler.start()
-
-    def __init__(self, parent):
+    def __init__(self, parent, athkar_scheduler):
         super().__init__(parent)
+        # Started by the menu bar at launch, refreshed when the settings are saved.
+        self.athkar_scheduler = athkar_scheduler
         self.setWindowTitle("الأذكار")
         self.resize(400, 350)
         self.athkar_db = AthkarDBManager(athkar_db_path)
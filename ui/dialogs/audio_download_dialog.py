@@ -0,0 +1,52 @@
+from typing import List
+from PyQt6.QtWidgets import QProgressDialog, QMessageBox
+from PyQt6.QtCore import Qt, QTimer
+from utils.audio_player import DownloadManager
+from utils.audio_player.audio_cache import AudioCache
+
+
+class AudioDownloadDialog(QProgressDialog):
+    """Downloads recitations for offline listening and shows the progress."""
+
+    def __init__(self, parent, title: str, urls: List[str]):
+        super().__init__("جارٍ التحضير للتنزيل...", "إلغاء", 0, len(urls), parent)
+        self.setWindowTitle(title)
+        self.setWindowModality(Qt.WindowModality.ApplicationModal)
+        self.setAutoClose(False)
+        self.setAutoReset(False)
+        self.setMinimumDuration(0)
+
+        self.manager = DownloadManager(AudioCache.load())
+        self.manager.download(urls)
+        self.canceled.connect(self.on_cancel)
+
+        # The manager runs on its own threads, its progress is polled from the UI thread.
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.update_progress)
+        self.timer.start(250)
+
+    def update_progress(self):
+        progress = self.manager.progress()
+        self.setValue(progress.completed_files + progress.failed_files)
+        self.setLabelText("تم تنزيل {} من {}، بسرعة {:.1f} ميغابايت في الثانية.".format(
+            progress.completed_files, progress.total_files, progress.throughput / (1024 * 1024)
+        ))
+        if progress.finished:
+            self.timer.stop()
+            self.manager.close()
+            self.show_result(progress.failed_files)
+
+    def show_result(self, failed_files: int):
+        if failed_files:
+            QMessageBox.warning(
+                self, "اكتمل التنزيل",
+                "تعذر تنزيل {} ملف، أعد التنزيل لاحقًا لإكمالها.".format(failed_files)
+            )
+        else:
+            QMessageBox.information(self, "اكتمل التنزيل", "تم تنزيل جميع الملفات، يمكنك الاستماع إليها دون اتصال.")
+        self.accept()
+
+    def on_cancel(self):
+        self.timer.stop()
+        self.manager.close()
+        self.reject()
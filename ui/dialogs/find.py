@@ -11,13 +11,14 @@ from PyQt6.QtWidgets import (
     QGroupBox,
     QLineEdit,
     QCheckBox,
-QListWidget,
 QListWidgetItem,
 QMessageBox,
 )
-from PyQt6.QtCore import Qt, QRegularExpression
+from PyQt6.QtCore import Qt, QRegularExpression, QTimer, pyqtSignal
 from PyQt6.QtGui import QKeyEvent, QKeySequence,  QRegularExpressionValidator, QShortcut
-from core_functions.search import SearchCriteria, QuranSearchManager
+from core_functions.search import SearchCriteria, SearchMode, QuranSearchManager
+from core_functions.incremental_search import LiveSearchWorker
+from ui.widgets.results_list import PagedListWidget
 from utils.settings import SettingsManager
 from utils.universal_speech import UniversalSpeech
 from utils.const import Globals
@@ -27,6 +28,8 @@ from utils.const import Globals
 
 class SearchDialog(QDialog):
     search_phrase = ""
+    live_search_delay = 150
+    live_results_ready = pyqtSignal(int, list)
 
     @classmethod
     def set_search_phrase(cls, search_phrase: str) -> None:
@@ -40,6 +43,13 @@ class SearchDialog(QDialog):
         self.search_manager = QuranSearchManager()
         self.criteria = None
         self.current_settings = SettingsManager.current_settings
+        self.live_request_id = 0
+        self.live_search = LiveSearchWorker(self.live_results_ready.emit)
+        self.live_results_ready.connect(self.on_live_results)
+        self.live_search_timer = QTimer(self)
+        self.live_search_timer.setSingleShot(True)
+        self.live_search_timer.setInterval(self.live_search_delay)
+        self.live_search_timer.timeout.connect(self.start_live_search)
         self.initUI()
 
     def initUI(self):
@@ -51,6 +61,10 @@ class SearchDialog(QDialog):
         self.search_box.setValidator(validator)
         self.search_box.textChanged.connect(self.OnEdit)
         self.search_box.setAccessibleName(self.search_label.text())
+        self.live_results_label = QLabel("النتائج:")
+        self.live_results_list = PagedListWidget(self, SearchResultsDialog.format_result)
+        self.live_results_list.setAccessibleName(self.live_results_label.text())
+        self.live_results_list.itemActivated.connect(self.on_live_result_activated)
         self.advanced_search_checkbox = QCheckBox('البحث المتقدم')
         self.advanced_search_checkbox.toggled.connect(self.show_advanced_options)
         self.search_button = QPushButton('بحث')
@@ -76,12 +90,17 @@ class SearchDialog(QDialog):
         self.search_to_label = QLabel('إلى:')
         self.search_to_combobox = QComboBox()
         self.search_to_combobox.setAccessibleName(self.search_to_label.text())
+        self.search_mode_label = QLabel('البحث في:')
+        self.search_mode_combobox = QComboBox()
+        self.search_mode_combobox.addItems(SearchMode.get_arabic_modes())
+        self.search_mode_combobox.setAccessibleName(self.search_mode_label.text())
         self.ignore_diacritics_checkbox = QCheckBox('تجاهل التشكيل')
         self.ignore_diacritics_checkbox.setChecked(self.current_settings["search"]["ignore_tashkeel"])
         self.ignore_hamza_checkbox = QCheckBox('تجاهل الهمزات')
         self.ignore_hamza_checkbox.setChecked(self.current_settings["search"]["ignore_hamza"])
         self.match_whole_word_checkbox = QCheckBox('تطابق الكلمة بأكملها')
         self.match_whole_word_checkbox.setChecked(self.current_settings["search"]["match_whole_word"])
+        self.rank_results_checkbox = QCheckBox('ترتيب النتائج حسب الصلة')
 
         self.search_type_layout = QVBoxLayout()
         self.search_type_layout.addWidget(self.search_type_radio_page)
@@ -100,15 +119,22 @@ class SearchDialog(QDialog):
         self.search_options_layout.addWidget(self.search_type_label)
         self.search_options_layout.addLayout(self.search_type_layout)
         self.search_options_layout.addLayout(self.search_from_to_layout)
+        self.search_mode_layout = QHBoxLayout()
+        self.search_mode_layout.addWidget(self.search_mode_label)
+        self.search_mode_layout.addWidget(self.search_mode_combobox)
+        self.search_options_layout.addLayout(self.search_mode_layout)
         self.search_options_layout.addWidget(self.ignore_diacritics_checkbox)
         self.search_options_layout.addWidget(self.ignore_hamza_checkbox)
         self.search_options_layout.addWidget(self.match_whole_word_checkbox)
+        self.search_options_layout.addWidget(self.rank_results_checkbox)
 
         self.advanced_search_groupbox.setLayout(self.search_options_layout)
 
         main_layout = QVBoxLayout()
         main_layout.addWidget(self.search_label)
         main_layout.addWidget(self.search_box)
+        main_layout.addWidget(self.live_results_label)
+        main_layout.addWidget(self.live_results_list)
         main_layout.addWidget(self.advanced_search_checkbox)
         main_layout.addWidget(self.advanced_search_groupbox)
         main_layout.addWidget(self.search_button)
@@ -133,6 +159,11 @@ class SearchDialog(QDialog):
         self.search_type_radio_quarter.toggled.connect(self.on_radio_toggled)
         close_shortcut = QShortcut(QKeySequence("Ctrl+F4"), self)
         close_shortcut.activated.connect(self.reject)
+        for checkbox in (self.ignore_diacritics_checkbox, self.ignore_hamza_checkbox, self.match_whole_word_checkbox):
+            checkbox.toggled.connect(self.live_search_timer.start)
+        self.search_from_combobox.currentIndexChanged.connect(self.live_search_timer.start)
+        self.search_to_combobox.currentIndexChanged.connect(self.live_search_timer.start)
+        self.search_mode_combobox.currentIndexChanged.connect(self.live_search_timer.start)
 
 
         self.on_radio_toggled()
@@ -140,6 +171,25 @@ class SearchDialog(QDialog):
 
     def OnEdit(self):
         self.search_button.setEnabled(bool(self.search_box.text()))
+        self.live_search_timer.start()
+
+    def start_live_search(self):
+        self.live_request_id = self.live_search.submit(self.search_box.text(), self.get_search_options())
+
+    def on_live_results(self, request_id: int, results: list):
+        if request_id != self.live_request_id:
+            return
+
+        self.live_results_list.set_results(results)
+        self.live_results_label.setText("النتائج: {}".format(len(results)) if self.search_box.text().strip() else "النتائج:")
+
+    def on_live_result_activated(self, item: QListWidgetItem):
+        row = self.live_results_list.row(item)
+        if not 0 <= row < len(self.live_results_list.results):
+            return
+        self.set_search_phrase(self.search_box.text())
+        Globals.effects_manager.play("move")
+        self.go_to_result(self.live_results_list.results[row]["number"])
 
     def show_advanced_options(self):
         self.advanced_search_groupbox.setEnabled(self.advanced_search_checkbox.isChecked())
@@ -148,8 +198,9 @@ class SearchDialog(QDialog):
         self.set_options_search()
         search_text = self.search_box. text()
         self.set_search_phrase(search_text)
-        search_result = self.search_manager.search(search_text)
-        if not search_result:
+        ranked = self.rank_results_checkbox.isChecked()
+        total = self.search_manager.count(search_text, ranked)
+        if not total:
             msg_box = QMessageBox(self)
             msg_box.setIcon(QMessageBox.Icon.Critical)
             msg_box.setWindowTitle("لا توجد نتائج")
@@ -160,16 +211,23 @@ class SearchDialog(QDialog):
 
             return
         
-        result_dialog = SearchResultsDialog(self, search_result)
+        result_dialog = SearchResultsDialog(self, self.search_manager.iter_search(search_text, ranked=ranked), total)
         if result_dialog.exec():
             selected_result = result_dialog.list_widget.currentRow()
-            ayah_number = search_result[selected_result]["number"]
-            ayah_result = self.parent.quran.get_by_ayah_number(ayah_number)
-            self.parent.quran_view.setText(ayah_result["full_text"])
-            self.parent.set_focus_to_ayah(ayah_number)
-            self.parent.quran_view.setFocus()
-            self.accept()
-            self.deleteLater()
+            self.go_to_result(result_dialog.list_widget.results[selected_result]["number"])
+
+    def go_to_result(self, ayah_number: int):
+        ayah_result = self.parent.quran.get_by_ayah_number(ayah_number)
+        self.parent.quran_view.setText(ayah_result["full_text"])
+        self.parent.set_focus_to_ayah(ayah_number)
+        self.parent.quran_view.setFocus()
+        self.accept()
+        self.deleteLater()
+
+    def done(self, result):
+        self.live_search_timer.stop()
+        self.live_search.stop()
+        super().done(result)
 
 
     def on_radio_toggled(self):
@@ -200,36 +258,34 @@ class SearchDialog(QDialog):
             self.search_to_combobox.addItems(self.quarters)
         self.search_to_combobox.setCurrentIndex(self.search_to_combobox.count() - 1)
 
-    def set_options_search(self):
+    def get_search_options(self) -> dict:
         
         search_from = self.search_from_combobox.currentIndex() + 1
         search_to = self.search_to_combobox.currentIndex() + 1
-        self.search_manager.set(
+        return dict(
             no_tashkil=self.ignore_diacritics_checkbox.isChecked(),
             no_hamza=self.ignore_hamza_checkbox.isChecked(),
             match_whole_word=self.match_whole_word_checkbox.isChecked(),
             criteria=self.criteria,
             _from=search_from,
-_to=search_to
+_to=search_to,
+            search_mode=SearchMode.get_mode_by_arabic_name(self.search_mode_combobox.currentText())
         )
 
+    def set_options_search(self):
+        self.search_manager.set(**self.get_search_options())
+
 
 class SearchResultsDialog(QDialog):
-    def __init__(self, parent=None, search_result=[]):
+    def __init__(self, parent=None, search_pages=iter(()), total=0):
         super().__init__(parent)
-        self.search_result = search_result
         self.setWindowTitle("نتائج البحث")
 
-        self.total_label = QLabel("عدد النتائج: {}.".format(len(search_result)))
+        self.total_label = QLabel("عدد النتائج: {}.".format(total))
         self.label = QLabel("النتائج:")
-        self.list_widget = QListWidget(self)
+        self.list_widget = PagedListWidget(self, self.format_result)
         self.list_widget.setAccessibleDescription(self.label.text())
-
-        for i, row in enumerate(search_result):
-            item = QListWidgetItem(self.format_result(row))
-            item.setData(Qt.ItemDataRole.AccessibleDescriptionRole, f"{i+1} من {len(search_result)}")
-            item.setToolTip(row["text"])
-            self.list_widget.addItem(item)
+        self.list_widget.set_pages(search_pages, total)
             
         self.go_to_button = QPushButton("الذهاب للنتيجة")
         self.go_to_button.clicked.connect(self.accept)
@@ -252,7 +308,8 @@ class SearchResultsDialog(QDialog):
         self.list_widget.setCurrentRow(0)
 
 
-    def format_result(self, row:dict) -> str:
+    @staticmethod
+    def format_result(row:dict) -> str:
         text = row["text"]
         # take first 5 words from text
         words = text.split()
@@ -267,7 +324,7 @@ class SearchResultsDialog(QDialog):
             UniversalSpeech.say(self.total_label.text())
         elif event.key() == Qt.Key.Key_R and event.modifiers() == Qt.KeyboardModifier.ControlModifier:
             current_row = self.list_widget.currentRow()
-            text = self.search_result[current_row]["text"]
+            text = self.list_widget.results[current_row]["text"]
             UniversalSpeech.say(text)
 
         return super().keyPressEvent(event)
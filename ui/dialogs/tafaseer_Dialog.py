@@ -11,7 +11,7 @@ from PyQt6.QtWidgets import (
     QMessageBox,
     QApplication
 )
-from PyQt6.QtGui import QIcon, QAction, QKeySequence, QShortcut
+from PyQt6.QtGui import QIcon, QAction, QKeySequence, QShortcut, QTextCursor
 from PyQt6.QtCore import QTimer
 from ui.widgets.qText_edit import ReadOnlyTextEdit
 from core_functions.tafaseer import TafaseerManager, Category
@@ -29,8 +29,10 @@ class TafaseerDialog(QDialog):
         self.default_category = default_category
         self.setWindowTitle(title)
         self.resize(500, 400)
-        self.tafaseer_manager = TafaseerManager()
+        self.tafaseer_manager = TafaseerManager(open_all=True)
         self.tafaseer_manager.set(Category.get_category_by_arabic_name(self.default_category))
+        self.current_text = ""
+        self._pending_chunks = None
         Globals.effects_manager.play("open")
 
         self.layout = QVBoxLayout(self)
@@ -40,7 +42,8 @@ class TafaseerDialog(QDialog):
 
         self.text_edit = ReadOnlyTextEdit(self)
         self.text_edit.setAccessibleName(self.label.text())
-        self.text_edit.setText(self.tafaseer_manager.get_tafaseer(ayah_info[0], ayah_info[1]))
+        self.show_text(self.tafaseer_manager.get_tafaseer(ayah_info[0], ayah_info[1]))
+        self.tafaseer_manager.prefetch(ayah_info[1])
         self.layout.addWidget(self.text_edit)
 
         self.button_layout = QHBoxLayout()  # استخدام QHBoxLayout بدلاً من QVBoxLayout
@@ -51,6 +54,18 @@ class TafaseerDialog(QDialog):
         self.category_button.clicked.connect(self.show_menu)
         self.button_layout.addWidget(self.category_button)
 
+        self.previous_ayah_button = QPushButton("الآية السابقة")
+        self.previous_ayah_button.setIcon(qta.icon("fa.arrow-right"))
+        self.previous_ayah_button.setShortcut(QKeySequence("Alt+P"))
+        self.previous_ayah_button.clicked.connect(lambda: self.step_ayah(-1))
+        self.button_layout.addWidget(self.previous_ayah_button)
+
+        self.next_ayah_button = QPushButton("الآية التالية")
+        self.next_ayah_button.setIcon(qta.icon("fa.arrow-left"))
+        self.next_ayah_button.setShortcut(QKeySequence("Alt+N"))
+        self.next_ayah_button.clicked.connect(lambda: self.step_ayah(1))
+        self.button_layout.addWidget(self.next_ayah_button)
+
         self.copy_button = QPushButton("نسخ التفسير")
         self.copy_button.setIcon(qta.icon("fa.copy"))
         self.copy_button.setShortcut(QKeySequence("Shift+C"))
@@ -103,12 +118,47 @@ class TafaseerDialog(QDialog):
         selected_category = self.sender().text()
         self.category_button.setText(selected_category)
         self.tafaseer_manager.set(Category.get_category_by_arabic_name(selected_category))
-        self.text_edit.setText(self.tafaseer_manager.get_tafaseer(self.ayah_info[0], self.ayah_info[1]))
+        self.show_text(self.tafaseer_manager.get_tafaseer(self.ayah_info[0], self.ayah_info[1]))
         self.text_edit.setFocus()
         Globals.effects_manager.play("change")
 
+    @exception_handler(ui_element=QMessageBox)
+    def step_ayah(self, step: int):
+        ayah_info = self.parent.quran.corpus.get_ayah_info(self.ayah_info[1] + step)
+        if ayah_info is None:
+            return
+
+        self.ayah_info = ayah_info
+        self.setWindowTitle("تفسير آية {} من {}".format(ayah_info[3], ayah_info[2]))
+        self.show_text(self.tafaseer_manager.get_tafaseer(ayah_info[0], ayah_info[1]))
+        self.tafaseer_manager.prefetch(ayah_info[1])
+        self.text_edit.setFocus()
+        Globals.effects_manager.play("change")
+
+    def show_text(self, text: str):
+        """Show the first chunk of text now and append the others on the next event loop turns."""
+        self.current_text = text
+        chunks = TafaseerManager.split_chunks(text)
+        self._pending_chunks = chunks
+        self.text_edit.setText(next(chunks, ""))
+        QTimer.singleShot(0, lambda: self.append_next_chunk(chunks))
+
+    def append_next_chunk(self, chunks):
+        # A newer text replaced this one.
+        if chunks is not self._pending_chunks:
+            return
+        chunk = next(chunks, None)
+        if chunk is None:
+            self._pending_chunks = None
+            return
+
+        cursor = QTextCursor(self.text_edit.document())
+        cursor.movePosition(QTextCursor.MoveOperation.End)
+        cursor.insertText(chunk)
+        QTimer.singleShot(0, lambda: self.append_next_chunk(chunks))
+
     def copy_content(self):
-        copied_content = self.text_edit.toPlainText()
+        copied_content = self.current_text
         clipboard = QApplication.clipboard()
         clipboard.setText(copied_content) 
         UniversalSpeech.say("تم نسخ التفسير.")
@@ -123,8 +173,9 @@ class TafaseerDialog(QDialog):
 
         if file_path:
             with open(file_path, "w") as file:
-                file.write(self.text_edit.toPlainText())
+                file.write(self.current_text)
 
     def reject(self):
         Globals.effects_manager.play("clos")
+        self.tafaseer_manager.close()
         self.deleteLater()
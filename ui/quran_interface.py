@@ -23,16 +23,11 @@ import qtawesome as qta
 from PyQt6.QtGui import QIcon, QAction, QShowEvent, QTextCursor, QKeySequence, QShortcut
 from core_functions.quran_class import quran_mgr
 from core_functions.tafaseer import Category
-from core_functions.info import E3rab, TanzilAyah, AyaInfo
+from core_functions.ayah_bundle import AyahBundle
 from core_functions.bookmark import BookmarkManager
-from ui.dialogs.quick_access import QuickAccess
-from ui.dialogs.find import SearchDialog
 from ui.widgets.button import EnterButton
 from ui.widgets.menu_bar import MenuBar
 from ui.widgets.qText_edit import QuranViewer
-from ui.dialogs.tafaseer_Dialog import TafaseerDialog
-from ui.dialogs.info_dialog import InfoDialog
-from ui.sura_player_ui.sura_player_ui import SuraPlayerWindow
 from ui.widgets.system_tray import SystemTrayManager
 from ui.widgets.toolbar import AudioToolBar
 from utils.settings import SettingsManager
@@ -40,8 +35,15 @@ from utils.universal_speech import UniversalSpeech
 from utils.user_data import UserDataManager
 from utils.const import program_name, program_icon, user_db_path, data_folder, Globals
 from utils.audio_player import SoundEffectPlayer
+from utils.lazy_import import LazyImport
+from core_functions.search_index import SearchIndex
 from exceptions.error_decorators import exception_handler
 
+QuickAccess = LazyImport("ui.dialogs.quick_access", "QuickAccess")
+SearchDialog = LazyImport("ui.dialogs.find", "SearchDialog")
+TafaseerDialog = LazyImport("ui.dialogs.tafaseer_Dialog", "TafaseerDialog")
+InfoDialog = LazyImport("ui.dialogs.info_dialog", "InfoDialog")
+
 
 class QuranInterface(QMainWindow):
     def __init__(self, title):
@@ -67,6 +69,10 @@ class QuranInterface(QMainWindow):
         self.create_layout()
         self.set_text()
         self.set_shortcut()
+        if SettingsManager.current_settings["general"]["preload_in_background_enabled"]:
+            # Preload the dialogs and build the search index once the window had time to show.
+            QTimer.singleShot(3000, LazyImport.warm_up)
+            QTimer.singleShot(3000, SearchIndex.build_in_background)
 
     def center_window(self):
         screen_geometry = QApplication.primaryScreen().availableGeometry()
@@ -348,7 +354,7 @@ class QuranInterface(QMainWindow):
         aya_info = self.get_current_ayah_info()
         title = "إعراب آية رقم {} من {}".format(aya_info[3], aya_info[2])
         label = "الإعراب"
-        text = E3rab(aya_info[0], aya_info[1]).text
+        text = AyahBundle.get(aya_info[0], aya_info[1]).e3rab
         InfoDialog(self, title, label, text).exec()
 
     @exception_handler(ui_element=QMessageBox)
@@ -356,7 +362,7 @@ class QuranInterface(QMainWindow):
         aya_info = self.get_current_ayah_info()
         title = "أسباب نزول آية رقم {} من {}".format(aya_info[3], aya_info[2])
         label = "الأسباب"
-        text = TanzilAyah(aya_info[1]).text
+        text = AyahBundle.get(aya_info[0], aya_info[1]).tanzil
 
         if text:
             InfoDialog(self, title, label, text).exec()
@@ -375,7 +381,7 @@ class QuranInterface(QMainWindow):
         aya_info = self.get_current_ayah_info()
         title = "معلومات آية رقم {} من {}".format(aya_info[3], aya_info[2])
         label = "معلومات الآية:"
-        text = AyaInfo(aya_info[1]).text
+        text = AyahBundle.get(aya_info[0], aya_info[1]).info
         InfoDialog(self, title, label, text, is_html_content=True).exec()
 
     def say_current_ayah(self):
@@ -461,6 +467,7 @@ class QuranInterface(QMainWindow):
             self.tray_manager.tray_icon.showMessage("البيان", "تم تصغير نافذة البيان على صينية النظام, البرنامج يعمل في الخلفية.", QIcon(icon_path), msecs=5000)
         else:
             self.tray_manager.hide_icon()
+            self.toolbar.prefetcher.close()
             
     @exception_handler(ui_element=QMessageBox)
     def OnRandomMessages(self, event):
@@ -1,41 +1,44 @@
-from PyQt6.QtCore import QTimer
+from PyQt6.QtCore import QObject, QTimer, pyqtSignal
 from utils.audio_player import SurahPlayer
 from utils.universal_speech import UniversalSpeech
 
-class AudioLooper:
+class AudioLooper(QObject):
     """
     Manages looping functionality in the Quran player.
     
-    When loop is active, a timer periodically checks the player's current position.
-    If the position exceeds the loop end point, the playback is restarted from the loop start point
-    after a specified delay.
+    When loop is active, the player holds a sync on the loop end point and jumps back
+    to the loop start point on the exact sample where the end point is reached.
+    With a delay, playback pauses at the end point instead and restarts from the
+    start point after the delay.
     """
+
+    # Delivered to the GUI thread from the BASS sync callback.
+    loop_reached = pyqtSignal(int)
     
-    def __init__(self, parent, player: SurahPlayer, loop_check_interval: int = 100):
+    def __init__(self, parent, player: SurahPlayer):
         """
         Initializes the AudioLooper.
         
         :param player: Reference to the main player for controlling playback.
-        :param loop_check_interval: Interval (in milliseconds) to check the player's position.
         """
 
+        super().__init__(parent)
         self.parent = parent
         self.player = player
         self.loop_start = 0 # Start point (A)
         self.loop_end = 0 # End point (B)
         self.loop_active = False  # Loop state
-        self.loop_delay = 100   # Delay (in milliseconds) before restarting the loop
-        
-        # Timer to monitor the player's current position.
-        self.monitor_timer = QTimer()
-        self.monitor_timer.setInterval(loop_check_interval)
-        self.monitor_timer.timeout.connect(self.check_loop)
+        self.loop_delay = 0   # Delay (in milliseconds) before restarting the loop
+
+        self.player.on_loop = self.loop_reached.emit
+        self.loop_reached.connect(self.on_loop_reached)
     
     def set_loop_start(self):
         """Set the start point (A) for the repeat loop."""
         self.loop_start = self.player.get_position()
         if self.loop_start > self.loop_end:
             self.loop_end = self.player.get_length()
+        self.apply_loop()
         UniversalSpeech.say(f"تم تحديد البداية عند: {self.parent.format_time(self.loop_start)}.")
     
     def set_loop_end(self):
@@ -43,6 +46,7 @@ class AudioLooper:
         self.loop_end = self.player.get_position()
         if self.loop_end < self.loop_start:
             self.loop_start = 0
+        self.apply_loop()
         UniversalSpeech.say(f"تم تحديد النهاية عند: {self.parent.format_time(self.loop_end)}.")
     
     def toggle_loop(self):
@@ -57,47 +61,44 @@ class AudioLooper:
         self.loop_active = not self.loop_active
         if self.loop_active:
             UniversalSpeech.say(f"بدأ التكرار من {self.parent.format_time(self.loop_start)} إلى {self.parent.format_time(self.loop_end)}.")
-            # Start playback from the loop start and start the monitor timer.
+            # Start playback from the loop start.
+            self.apply_loop()
             self.player.set_position(self.loop_start)
             self.player.play()
-            self.monitor_timer.start()
         else:
             UniversalSpeech.say("تم إيقاف التكرار.")
-            self.monitor_timer.stop()
+            self.player.clear_loop()
 
         return self.loop_active
 
-    def check_loop(self):
+    def apply_loop(self):
+        """Set the loop points on the player while the loop is active."""
+        if self.loop_active:
+            self.player.set_loop(self.loop_start, self.loop_end, seamless=not self.loop_delay)
+
+    def on_loop_reached(self, channel: int):
         """
-        Checks the player's current position.
-        If the position exceeds loop_end, restarts the loop after the specified delay.
+        Called when playback reaches loop_end. A seamless loop already jumped back,
+        otherwise playback pauses and restarts after the specified delay.
         """
-        current_position = self.player.get_position()
-        if current_position >= self.loop_end or current_position < self.loop_start:
-            # Stop the monitor timer to avoid multiple triggers.
-            self.monitor_timer.stop()
-            QTimer.singleShot(self.loop_delay, self.restart_loop)
+        if not self.loop_active or channel != self.player.current_channel or not self.loop_delay:
+            return
+        self.player.pause()
+        QTimer.singleShot(self.loop_delay, self.restart_loop)
     
     def restart_loop(self):
         """
-        Restarts the loop by setting the player's position to loop_start,
-        resuming playback, and restarting the monitor timer.
+        Restarts the loop by setting the player's position to loop_start
+        and resuming playback.
         """
-        if self.loop_active:
+        if self.loop_active and self.player.is_paused():
             self.player.set_position(self.loop_start)
             self.player.play()
-            self.monitor_timer.start()
 
     def resume(self):
-        """
-        Resume the looping playback if it was paused.
-        
-        This method will start the player's playback and restart the monitor timer if it is not active,
-        """
+        """Resume the looping playback if it was paused."""
         if self.loop_active:
             self.player.play()
-            if not self.monitor_timer.isActive():
-                self.monitor_timer.start()    
 
     def return_to_start(self):
         """Return playback to the loop start point."""
@@ -115,8 +116,7 @@ class AudioLooper:
         self.loop_start = 0
         self.loop_end = 0
         self.loop_active = False
-        if  self.monitor_timer.isActive():
-            self.monitor_timer.stop()
+        self.player.clear_loop()
         UniversalSpeech.say(F"تم مسح البداية والنهاية وإيقاف التكرار.")
 
 
@@ -127,4 +127,5 @@ class AudioLooper:
         :param delay: Delay in milliseconds.
         """
         self.loop_delay = delay
+        self.apply_loop()
         UniversalSpeech.say(f"Loop delay set to {self.loop_delay} milliseconds.")
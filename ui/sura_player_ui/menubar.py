@@ -20,8 +20,10 @@ class MenuBar(QMenuBar):
         self.close_window_action .triggered.connect(self.parent.OnClose)
         self.close_program_action = QAction("إغلاق البرنامج", self)
         self.close_program_action.triggered.connect(QApplication.exit)
+        self.download_reciter_action = QAction("تنزيل سور القارئ الحالي للاستماع دون اتصال", self)
 
         # Add Actions to Menu    
+        main_menu.addAction(self.download_reciter_action)
         main_menu.addAction(self.close_window_action)
         main_menu.addAction(self.close_program_action)        
         
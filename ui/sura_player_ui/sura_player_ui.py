@@ -21,6 +21,7 @@ from utils.settings import SettingsManager
 from.menubar import MenuBar
 from .key_handler import KeyHandler
 from .audio_looper import AudioLooper
+from ui.dialogs.audio_download_dialog import AudioDownloadDialog
 
 
 class SuraPlayerWindow(QMainWindow):
@@ -183,6 +184,7 @@ class SuraPlayerWindow(QMainWindow):
         self.menubar.return_to_start_action.triggered.connect(self.audio_looper.return_to_start)
         self.menubar.clear_loop_action.triggered.connect(self.audio_looper.clear_loop)
         self.close_button.clicked.connect(self.OnClose)
+        self.menubar.download_reciter_action.triggered.connect(self.OnDownloadReciter)
         self.volume_slider.valueChanged.connect(self.update_volume)
         self.time_slider.valueChanged.connect(self.update_time)
 
@@ -437,6 +439,11 @@ class SuraPlayerWindow(QMainWindow):
 
 
 
+    def OnDownloadReciter(self):
+        reciter_id = self.reciter_combo.currentData()
+        title = "تنزيل سور {}".format(self.reciter_combo.currentText())
+        AudioDownloadDialog(self, title, self.reciters.get_urls(reciter_id)).exec()
+
     def OnClose(self):
         self.stop()
         self.audio_player_thread.quit()
@@ -1,23 +1,27 @@
 import os
 from PyQt6.QtWidgets import QApplication, QMenuBar, QMenu, QMessageBox
 from PyQt6.QtGui import QIcon, QAction, QKeySequence, QShortcut, QDesktopServices
-from PyQt6.QtCore import Qt, QUrl
-from ui.dialogs.settings_dialog import SettingsDialog
-from ui.dialogs.bookmark_dialog import BookmarkDialog
-from ui.dialogs.go_to import GoToDialog
-from ui.dialogs.athkar_dialog import AthkarDialog
-from ui.sura_player_ui import SuraPlayerWindow
-from ui.dialogs.tasbih_dialog import TasbihDialog
-from ui.dialogs.prophets_stories_dialog import ProphetsStoriesDialog
+from PyQt6.QtCore import Qt, QUrl, QTimer
 from core_functions.quran_class import QuranConst
 from core_functions.tafaseer import Category
 from utils.update import UpdateManager
 from utils.settings import SettingsManager
 from utils.logger import Logger
-from utils.const import program_name, program_version, website, Globals
+from utils.const import program_name, program_version, website, Globals, data_folder, athkar_db_path, default_athkar_path
 from utils.audio_player import bass
+from utils.lazy_import import LazyImport
 from theme import ThemeManager
 
+SettingsDialog = LazyImport("ui.dialogs.settings_dialog", "SettingsDialog")
+BookmarkDialog = LazyImport("ui.dialogs.bookmark_dialog", "BookmarkDialog")
+GoToDialog = LazyImport("ui.dialogs.go_to", "GoToDialog")
+# Loads the athkar SQLAlchemy models and APScheduler.
+AthkarScheduler = LazyImport("core_functions.athkar.athkar_scheduler", "AthkarScheduler")
+AthkarDialog = LazyImport("ui.dialogs.athkar_dialog", "AthkarDialog")
+SuraPlayerWindow = LazyImport("ui.sura_player_ui", "SuraPlayerWindow")
+TasbihDialog = LazyImport("ui.dialogs.tasbih_dialog", "TasbihDialog")
+ProphetsStoriesDialog = LazyImport("ui.dialogs.prophets_stories_dialog", "ProphetsStoriesDialog")
+
 
 class MenuBar(QMenuBar):
     def __init__(self, parent=None):
@@ -26,12 +30,15 @@ class MenuBar(QMenuBar):
         self.theme_manager = ThemeManager(self.parent)
         self.update_manager = UpdateManager(self.parent)
         self.sura_player_window = None
+        self.athkar_scheduler = None
         self.our_emails = {
             "محمود عاطف": "mahmoud.atef.987123@gmail.com",
             "قيس الرفاعي": "ww258148@gmail.com",
             "أحمد بكر": "AhmedBakr593@gmail.com"
         }
         self.create_menu()
+        # The athkar reminders start at launch, whether or not their dialog is ever opened.
+        QTimer.singleShot(0, self.start_athkar_scheduler)
 
     def create_menu(self):
         navigation_menu = self.addMenu("التنقل(&M)")
@@ -158,7 +165,7 @@ class MenuBar(QMenuBar):
         tools_menu = self.addMenu("الأدوات(&T)")
         athkar_action = QAction("الأذكار", self)
         athkar_action.setShortcut(QKeySequence("Shift+A"))
-        athkar_action.triggered.connect(lambda: AthkarDialog(self.parent).exec())
+        athkar_action.triggered.connect(lambda: AthkarDialog(self.parent, self.start_athkar_scheduler()).exec())
         bookmark_manager_action = QAction("مدير العلامات", self)
         bookmark_manager_action.setShortcut(QKeySequence("Shift+D"))
         bookmark_manager_action.triggered.connect(self.OnBookmarkManager)
@@ -337,14 +344,21 @@ class MenuBar(QMenuBar):
         if self.tafaseer_menu.isEnabled():
             self.tafaseer_menu.exec()
 
+    def start_athkar_scheduler(self):
+        if self.athkar_scheduler is None:
+            self.athkar_scheduler = AthkarScheduler(athkar_db_path, default_athkar_path, data_folder/"athkar/text_athkar.json")
+            self.athkar_scheduler.start()
+        return self.athkar_scheduler
+
     def quit_application(self):
         if SettingsManager.current_settings["general"]["auto_save_position_enabled"]:
             self.parent.OnSaveCurrentPosition()
         self.parent.tray_manager.hide_icon()
         if self.sura_player_window is not None:
             self.sura_player_window.close()
+        self.parent.toolbar.prefetcher.close()
         QApplication.quit()
-        bass.BASS_Free()
+        bass.close()
 
     def Onopen_log_file(self):
         appdata_path = os.path.expandvars('%appdata%')
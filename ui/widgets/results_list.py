@@ -0,0 +1,57 @@
+from typing import Callable, Iterator, Optional
+from PyQt6.QtCore import Qt
+from PyQt6.QtWidgets import QListWidget, QListWidgetItem
+
+
+class PagedListWidget(QListWidget):
+    """
+    List filled a page at a time from an iterator of pages.
+
+    The next page is only requested when the list is scrolled to the end or the
+    current row reaches the last loaded item, so long result lists show their first
+    page immediately.
+    """
+
+    def __init__(self, parent=None, format_item: Callable[[dict], str] = str):
+        super().__init__(parent)
+        self.format_item = format_item
+        self.results = []
+        self.total = 0
+        self._pages: Optional[Iterator[list]] = None
+        self.verticalScrollBar().valueChanged.connect(self.on_scroll)
+        self.currentRowChanged.connect(self.on_current_row_changed)
+
+    def set_pages(self, pages: Iterator[list], total: int) -> None:
+        self._pages = None
+        self.clear()
+        self.results = []
+        self.total = total
+        self._pages = pages
+        self.fetch_more()
+
+    def set_results(self, results: list, page_size: int = 50) -> None:
+        self.set_pages((results[start:start + page_size] for start in range(0, len(results), page_size)), len(results))
+
+    def fetch_more(self) -> None:
+        if self._pages is None:
+            return
+
+        rows = next(self._pages, None)
+        if rows is None:
+            self._pages = None
+            return
+
+        for row in rows:
+            self.results.append(row)
+            item = QListWidgetItem(self.format_item(row))
+            item.setData(Qt.ItemDataRole.AccessibleDescriptionRole, f"{len(self.results)} من {self.total}")
+            item.setToolTip(row["text"])
+            self.addItem(item)
+
+    def on_scroll(self, value: int) -> None:
+        if value >= self.verticalScrollBar().maximum():
+            self.fetch_more()
+
+    def on_current_row_changed(self, row: int) -> None:
+        if row >= self.count() - 1:
+            self.fetch_more()
@@ -1,10 +1,10 @@
 import time
-from typing import Optional
+from typing import List, Optional, Tuple
 from PyQt6.QtWidgets import QToolBar, QPushButton, QSlider, QMessageBox
 from PyQt6.QtCore import Qt, QThread, pyqtSignal, QTimer
 from core_functions.quran_class import quran_mgr
 from core_functions.Reciters import AyahReciter
-from utils.audio_player import AyahPlayer
+from utils.audio_player import AyahPlayer, AudioPrefetcher
 from utils.settings import SettingsManager
 from utils.const import data_folder
 from utils.logger import Logger
@@ -18,15 +18,28 @@ class AudioPlayerThread(QThread):
     error_signal = pyqtSignal(ErrorMessage) 
     playback_time_changed = pyqtSignal(float, float)
     file_changed = pyqtSignal(str)
+    playback_started = pyqtSignal()
+    track_changed = pyqtSignal(str)
+    # Delivered to the GUI thread from the BASS sync callbacks.
+    stream_ended = pyqtSignal(int)
+    stream_stalled = pyqtSignal(int, bool)
 
-    def __init__(self, player: AyahPlayer, parent: Optional[object] = None):
+    def __init__(self, player: AyahPlayer, parent: Optional[object] = None, prefetcher: Optional[AudioPrefetcher] = None):
         super().__init__(parent)
         self.player = player
+        self.prefetcher = prefetcher
+        # Called on a BASS thread when a queued ayah starts, delivered to the GUI thread by the signal.
+        self.player.on_track_changed = self.track_changed.emit
+        self.player.on_end = self.stream_ended.emit
+        self.player.on_stall = self.stream_stalled.emit
         self.url = None    
         self.manually_stopped = False
         self.send_error_signal = True
+        # Only refreshes the displayed time, the end of playback comes from stream_ended.
         self.timer = QTimer()
-        self.timer.timeout.connect(self.check_playback_status)
+        self.timer.timeout.connect(self.update_playback_time)
+        self.stream_ended.connect(self.on_stream_ended)
+        self.stream_stalled.connect(lambda channel, stalled: self.statusChanged.emit())
 
     def run(self):
         if self.url:
@@ -34,9 +47,11 @@ class AudioPlayerThread(QThread):
                 try:
                     if self.player.source != self.url or self.player.is_stopped():
                         self.file_changed.emit(self.url)
-                        self.player.load_audio(self.url)
+                        data = self.prefetcher.get(self.url) if self.prefetcher else None
+                        self.player.load_audio(self.url, data=data)
                     self.player.play()
                     self.manually_stopped = False
+                    self.playback_started.emit()
                 except Exception as e:
                     message = ErrorMessage(e)
                     Logger.error(message.log_message)
@@ -47,13 +62,20 @@ class AudioPlayerThread(QThread):
                     self.statusChanged.emit()
                     self.waiting_to_load.emit(True)
 
-    def check_playback_status(self):
+    def update_playback_time(self):
         self.playback_time_changed.emit(self.player.get_position(), self.player.get_length())
         if not self.player.is_playing() and not self.player.is_stalled():
             self.timer.stop()
             self.statusChanged.emit()
-            if not self.player.is_paused() and not self.manually_stopped:
-                self.playback_finished.emit()
+
+    def on_stream_ended(self, channel: int):
+        # The end of a channel replaced before the signal was delivered.
+        if channel != self.player.current_channel:
+            return
+        self.timer.stop()
+        self.statusChanged.emit()
+        if not self.manually_stopped:
+            self.playback_finished.emit()
 
     def set_audio_url(self, url: str, send_error_signal: bool = True):
         self.url = url
@@ -112,6 +134,32 @@ class NavigationManager:
 
         return True
 
+    def get_upcoming_positions(self, count: int) -> List[Tuple[int, int]]:
+        """
+        Return the (surah, ayah) pairs played after the current one when playing
+        continuously, ayah 0 being the basmala played before the first ayah of a surah.
+        """
+        positions = []
+        if not self.ayah_range or self.current_surah not in self.ayah_range or self.current_ayah is None:
+            return positions
+
+        surah, ayah = self.current_surah, self.current_ayah
+        while len(positions) < count:
+            if ayah == 0:
+                ayah = 1
+            else:
+                ayah += 1
+                if ayah > self.ayah_range[surah]["max_ayah"]:
+                    if surah + 1 not in self.ayah_range:
+                        break
+                    surah += 1
+                    ayah = self.ayah_range[surah]["min_ayah"]
+                if ayah == 1:
+                    ayah = 0
+            positions.append((surah, ayah))
+
+        return positions
+
     def get_navigation_status(self, direction: str, ayah_step: int = 1, surah_step: int = 1) -> bool:
         if direction not in {"next", "previous"}:
             raise ValueError("Invalid direction. Use 'next' or 'previous'.")
@@ -143,7 +191,12 @@ class AudioToolBar(QToolBar):
         self.player = AyahPlayer()
         self.reciters = AyahReciter(data_folder / "quran" / "reciters.db")
         self.navigation = NavigationManager(self.parent, self.parent.quran)
-        self.audio_thread = AudioPlayerThread(self.player, self.parent)
+        self.prefetcher = AudioPrefetcher(
+            SettingsManager.current_settings["listening"]["prefetch_count"],
+            SettingsManager.current_settings["listening"]["prefetch_memory_limit"] * 1024 * 1024,
+            cache=self.player.cache
+        )
+        self.audio_thread = AudioPlayerThread(self.player, self.parent, self.prefetcher)
 
         self.play_pause_button = self.create_button("استماع الآية الحالية", self.toggle_play_pause)
         self.stop_button = self.create_button("إيقاف", self.stop_audio)
@@ -159,6 +212,8 @@ class AudioToolBar(QToolBar):
         self.audio_thread.waiting_to_load.connect(self.set_buttons_status)
         self.audio_thread.playback_finished.connect(self.OnActionAfterListening)
         self.audio_thread.error_signal.connect(self.show_error_message)
+        self.audio_thread.playback_started.connect(self.queue_next_ayah)
+        self.audio_thread.track_changed.connect(self.on_track_changed)
 
     def create_button(self, text, callback):
         button = QPushButton(text)
@@ -179,6 +234,7 @@ class AudioToolBar(QToolBar):
     def toggle_play_pause(self):
         if self.player.is_playing():
             self.player.pause()
+            self.update_play_pause_button_text()
         else:
             ayah_info = self.parent.get_current_ayah_info()
             self.navigation.set_position(ayah_info[0], ayah_info[3])
@@ -188,6 +244,7 @@ class AudioToolBar(QToolBar):
         self.audio_thread.manually_stopped = True
         self.player.stop()
         self.set_buttons_status()
+        self.update_play_pause_button_text()
 
     def play_current_ayah(self):
 
@@ -198,10 +255,57 @@ class AudioToolBar(QToolBar):
 
         reciter_id = SettingsManager.current_settings["listening"]["reciter"]
         url = self.reciters.get_url(reciter_id, self.navigation.current_surah, self.navigation.current_ayah)
+        self.prefetch_upcoming_ayahs(reciter_id, url)
         self.audio_thread.set_audio_url(url, send_error_signal=False if self.navigation.current_ayah == 0 else True)
         self.audio_thread.start()
         self.set_buttons_status()
 
+    def prefetch_upcoming_ayahs(self, reciter_id: int, url: str) -> None:
+        """Download the ayahs that follow the current one while it plays, or keep the current one when repeating."""
+        action_after_listening = SettingsManager.current_settings["listening"]["action_after_listening"]
+        if action_after_listening == 2:
+            count = self.prefetcher.depth
+        else:
+            # Only the ayah after the basmala follows it automatically.
+            count = 1 if self.navigation.current_ayah == 0 else 0
+
+        urls = [url] + [
+            self.reciters.get_url(reciter_id, surah_number, ayah_number)
+            for surah_number, ayah_number in self.navigation.get_upcoming_positions(count)
+        ]
+        self.prefetcher.prefetch(urls)
+
+    def queue_next_ayah(self) -> None:
+        """When playing continuously, queue the next ayah to start on the sample where the current one ends."""
+        if SettingsManager.current_settings["listening"]["action_after_listening"] != 2:
+            return
+        positions = self.navigation.get_upcoming_positions(1)
+        if not positions:
+            return
+
+        reciter_id = SettingsManager.current_settings["listening"]["reciter"]
+        current_url = self.reciters.get_url(reciter_id, self.navigation.current_surah, self.navigation.current_ayah)
+        url = self.reciters.get_url(reciter_id, *positions[0])
+        if url:
+            # If it can not be queued, the ayah is played when the current one finishes.
+            self.prefetcher.when_ready(url, lambda data: self.player.enqueue(url, data, after=current_url))
+
+    def on_track_changed(self, url: str) -> None:
+        """A queued ayah started playing, follow it as OnPlayNext would."""
+        positions = self.navigation.get_upcoming_positions(1)
+        reciter_id = SettingsManager.current_settings["listening"]["reciter"]
+        if not positions or self.reciters.get_url(reciter_id, *positions[0]) != url:
+            return
+
+        surah_number, ayah_number = positions[0]
+        self.navigation.set_position(surah_number, ayah_number)
+        self.navigation.has_basmala = ayah_number == 1
+        self.audio_thread.url = url
+        self.prefetch_upcoming_ayahs(reciter_id, url)
+        self.change_ayah_focus()
+        self.set_buttons_status()
+        self.queue_next_ayah()
+
     def OnPlayNext(self) -> None:
         self.stop_audio()
         if self.navigation.navigate("next"):
@@ -254,8 +358,6 @@ class AudioToolBar(QToolBar):
             self.parent.menu_bar.rewind_action.setEnabled(not self.player.is_stopped())
             self.parent.menu_bar.forward_action.setEnabled(not self.player.is_stopped())
             self.parent.menu_bar.replay_action.setEnabled(not self.player.is_stopped())
-            if  status == True:
-                self.audio_thread.timer.start(100)
 
     def show_error_message(self, message: ErrorMessage):
         msg_box =QMessageBox(self.parent,)
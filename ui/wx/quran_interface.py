@@ -9,17 +9,21 @@ import wx
 
 from core_functions.quran_class import quran_mgr
 from core_functions.tafaseer import Category
-from core_functions.info import E3rab, TanzilAyah, AyaInfo
+from core_functions.ayah_bundle import AyahBundle
 from core_functions.bookmark import BookmarkManager
-from ui.wx.dialogs.quick_access import QuickAccessDialog
-from ui.wx.dialogs.search_dialog import SearchDialog
-from ui.wx.dialogs.tafaseer_dialog import TafaseerDialog
-from ui.wx.dialogs.info_dialog import InfoDialog
 from utils.settings import SettingsManager
 from utils.universal_speech import UniversalSpeech
 from utils.user_data import UserDataManager
 from utils.const import program_name, program_icon, user_db_path, Globals
 from utils.audio_player import SoundEffectPlayer
+from utils.startup_profiler import StartupProfiler
+from utils.lazy_import import LazyImport
+
+QuickAccessDialog = LazyImport("ui.wx.dialogs.quick_access", "QuickAccessDialog")
+# Loads the search indexes.
+SearchDialog = LazyImport("ui.wx.dialogs.search_dialog", "SearchDialog")
+TafaseerDialog = LazyImport("ui.wx.dialogs.tafaseer_dialog", "TafaseerDialog")
+InfoDialog = LazyImport("ui.wx.dialogs.info_dialog", "InfoDialog")
 
 
 class QuranInterface(wx.Frame):
@@ -30,15 +34,20 @@ class QuranInterface(wx.Frame):
         if os.path.exists(program_icon):
             self.SetIcon(wx.Icon(program_icon))
         self.SetBackgroundColour(wx.Colour(20, 20, 20))
-        self.quran = quran_mgr()
-        self.quran.load_quran(SettingsManager.current_settings["reading"]["font_type"])
-        self.user_data_manager = UserDataManager(user_db_path)
-        Globals.effects_manager = SoundEffectPlayer("Audio/sounds")
-
-        self._create_ui()
-        self._create_bindings()
-        self.Centre()
-        self.set_text()
+        with StartupProfiler.phase("quran_load"):
+            self.quran = quran_mgr()
+            self.quran.load_quran(SettingsManager.current_settings["reading"]["font_type"])
+        with StartupProfiler.phase("user_data"):
+            self.user_data_manager = UserDataManager(user_db_path)
+        with StartupProfiler.phase("sound_effects"):
+            Globals.effects_manager = SoundEffectPlayer("Audio/sounds")
+
+        with StartupProfiler.phase("create_ui"):
+            self._create_ui()
+            self._create_bindings()
+            self.Centre()
+        with StartupProfiler.phase("first_text"):
+            self.set_text()
 
     def _create_ui(self) -> None:
         panel = wx.Panel(self)
@@ -294,7 +303,7 @@ class QuranInterface(wx.Frame):
         ayah_info = self.get_current_ayah_info()
         if not ayah_info:
             return
-        text = E3rab(ayah_info[0], ayah_info[1]).text
+        text = AyahBundle.get(ayah_info[0], ayah_info[1]).e3rab
         dialog = InfoDialog(self, f"إعراب آية رقم {ayah_info[3]} من {ayah_info[2]}", "الإعراب", text)
         dialog.ShowModal()
         dialog.Destroy()
@@ -303,7 +312,7 @@ class QuranInterface(wx.Frame):
         ayah_info = self.get_current_ayah_info()
         if not ayah_info:
             return
-        text = TanzilAyah(ayah_info[1]).text
+        text = AyahBundle.get(ayah_info[0], ayah_info[1]).tanzil
         if text:
             dialog = InfoDialog(
                 self,
@@ -320,7 +329,7 @@ class QuranInterface(wx.Frame):
         ayah_info = self.get_current_ayah_info()
         if not ayah_info:
             return
-        text = AyaInfo(ayah_info[1]).text
+        text = AyahBundle.get(ayah_info[0], ayah_info[1]).info
         dialog = InfoDialog(
             self,
             f"معلومات آية رقم {ayah_info[3]} من {ayah_info[2]}",
@@ -0,0 +1,35 @@
+"""System tray icon of the wxPython interface."""
+
+from __future__ import annotations
+
+import os
+from typing import Callable
+
+import wx
+from wx import adv as wxadv
+
+from utils.const import program_icon, program_name
+
+
+class SystemTrayManager(wxadv.TaskBarIcon):
+    """Tray icon of the running program, the main window it shows may not be built yet."""
+
+    def __init__(self, on_show: Callable[[], None], on_quit: Callable[[], None]) -> None:
+        super().__init__()
+        self.on_show = on_show
+        self.on_quit = on_quit
+        icon = wx.Icon(program_icon) if os.path.exists(program_icon) else wx.ArtProvider.GetIcon(wx.ART_INFORMATION)
+        self.SetIcon(icon, program_name)
+        self.Bind(wxadv.EVT_TASKBAR_LEFT_DOWN, lambda event: self.on_show())
+
+    def CreatePopupMenu(self) -> wx.Menu:
+        menu = wx.Menu()
+        show_item = menu.Append(wx.ID_ANY, "إظهار النافذة الرئيسية")
+        quit_item = menu.Append(wx.ID_ANY, "إغلاق البرنامج")
+        self.Bind(wx.EVT_MENU, lambda event: self.on_show(), show_item)
+        self.Bind(wx.EVT_MENU, lambda event: self.on_quit(), quit_item)
+        return menu
+
+    def hide_icon(self) -> None:
+        self.RemoveIcon()
+        self.Destroy()
@@ -1,7 +1,10 @@
 from .bass_player import AudioPlayer, bass
+from .gapless_player import GaplessPlayer
 from .sound_effect_player import SoundEffectPlayer
 from .startup_sound_effect_player import StartupSoundEffectPlayer
 from .athkar_player import AthkarPlayer
 from .ayah_player import AyahPlayer
 from .sura_player import SurahPlayer
 from .volume_controller import VolumeController
+from .audio_prefetcher import AudioPrefetcher
+from .download_manager import DownloadManager, DownloadProgress
@@ -0,0 +1,229 @@
+import os
+import sqlite3
+import threading
+import time
+from hashlib import sha1
+from typing import BinaryIO, Optional
+from urllib.parse import urlparse
+from utils.const import albayan_folder
+from utils.settings import SettingsManager
+from utils.logger import Logger
+
+
+class AudioCache:
+    """
+    Downloaded recitations kept on disk.
+
+    Files are named by the hash of the URL they were downloaded from, which is
+    built from the reciter, the surah and the ayah, so the same recitation always
+    maps to the same file. An SQLite index records the size and last use of every
+    file, and the least recently used files are removed once the cache grows over
+    max_bytes. Files are written under a temporary name and renamed once
+    complete, an interrupted download never leaves a partial file in the cache.
+    Files downloaded for offline listening are pinned and never evicted.
+
+    The index is shared by the player threads and the BASS download thread, so it
+    uses a single connection guarded by a lock.
+    """
+
+    temp_extension = ".part"
+    # Downloads that can be resumed, kept across sessions.
+    resume_extension = ".download"
+    _instance: Optional["AudioCache"] = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self, folder: str, max_bytes: int) -> None:
+        self.folder = folder
+        self.max_bytes = max_bytes
+        os.makedirs(folder, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(os.path.join(folder, "index.db"), check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS entries (
+                url TEXT PRIMARY KEY,
+                file_name TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                last_used REAL NOT NULL,
+                pinned INTEGER NOT NULL DEFAULT 0
+            )
+        """)
+        columns = [row[1] for row in self._conn.execute("PRAGMA table_info(entries);")]
+        if "pinned" not in columns:
+            self._conn.execute("ALTER TABLE entries ADD COLUMN pinned INTEGER NOT NULL DEFAULT 0;")
+        self._conn.commit()
+
+        # Left over by downloads interrupted when the program closed.
+        for file_name in os.listdir(folder):
+            if file_name.endswith(self.temp_extension):
+                os.remove(os.path.join(folder, file_name))
+
+    @classmethod
+    def load(cls) -> "AudioCache":
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = cls(
+                    os.path.join(albayan_folder, "audio_cache"),
+                    SettingsManager.current_settings["listening"]["audio_cache_limit"] * 1024 * 1024
+                )
+            return cls._instance
+
+    @staticmethod
+    def get_file_name(url: str) -> str:
+        return sha1(url.encode("UTF-8")).hexdigest() + os.path.splitext(urlparse(url).path)[1].lower()
+
+    def contains(self, url: str) -> bool:
+        with self._lock:
+            return self._conn.execute("SELECT 1 FROM entries WHERE url = ?;", (url,)).fetchone() is not None
+
+    def pin(self, url: str) -> bool:
+        """Keep the cached file of url from being evicted, returns False if it is not cached."""
+        with self._lock:
+            cursor = self._conn.execute("UPDATE entries SET pinned = 1 WHERE url = ?;", (url,))
+            self._conn.commit()
+            return cursor.rowcount > 0
+
+    def get_path(self, url: str) -> Optional[str]:
+        """Return the cached file of url and mark it as used, None if it is not cached."""
+        with self._lock:
+            row = self._conn.execute("SELECT file_name FROM entries WHERE url = ?;", (url,)).fetchone()
+            if row is None:
+                return None
+
+            file_path = os.path.join(self.folder, row[0])
+            if not os.path.isfile(file_path):
+                self._conn.execute("DELETE FROM entries WHERE url = ?;", (url,))
+                self._conn.commit()
+                return None
+
+            self._conn.execute("UPDATE entries SET last_used = ? WHERE url = ?;", (time.time(), url))
+            self._conn.commit()
+            return file_path
+
+    def store(self, url: str, data: bytes) -> None:
+        """Add the already downloaded content of url."""
+        writer = self.open_writer(url)
+        writer.write(data)
+        writer.commit(len(data))
+
+    def open_writer(self, url: str, resume: bool = False, pinned: bool = False) -> "CacheWriter":
+        """
+        Return a writer adding url to the cache once committed. With resume, the
+        writer continues the previous unfinished download of url.
+        """
+        return CacheWriter(self, url, resume, pinned)
+
+    def _add(self, url: str, temp_path: str, size: int, pinned: bool) -> None:
+        file_name = self.get_file_name(url)
+        with self._lock:
+            os.replace(temp_path, os.path.join(self.folder, file_name))
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?);",
+                (url, file_name, size, time.time(), int(pinned))
+            )
+            self._evict(keep=url)
+            self._conn.commit()
+
+    def _evict(self, keep: str) -> None:
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries WHERE NOT pinned;").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        rows = self._conn.execute(
+            "SELECT url, file_name, size FROM entries WHERE url != ? AND NOT pinned ORDER BY last_used;",
+            (keep,)
+        ).fetchall()
+        for url, file_name, size in rows:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(os.path.join(self.folder, file_name))
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                # Still open by a player, it is removed on a later eviction.
+                Logger.error(f"Could not remove cached audio {file_name}: {e}")
+                continue
+            self._conn.execute("DELETE FROM entries WHERE url = ?;", (url,))
+            total -= size
+
+    def clear(self) -> None:
+        with self._lock:
+            for (file_name,) in self._conn.execute("SELECT file_name FROM entries;").fetchall():
+                try:
+                    os.remove(os.path.join(self.folder, file_name))
+                except OSError:
+                    pass
+            self._conn.execute("DELETE FROM entries;")
+            self._conn.commit()
+
+
+class CacheWriter:
+    """Writes a download to a temporary file, added to the cache only when commit() finds it complete."""
+
+    def __init__(self, cache: AudioCache, url: str, resume: bool = False, pinned: bool = False) -> None:
+        self.cache = cache
+        self.url = url
+        self.pinned = pinned
+        if resume:
+            self.temp_path = os.path.join(cache.folder, cache.get_file_name(url) + cache.resume_extension)
+            self._file: Optional[BinaryIO] = open(self.temp_path, "ab")
+        else:
+            self.temp_path = os.path.join(cache.folder, f"{cache.get_file_name(url)}.{id(self):x}{cache.temp_extension}")
+            self._file = open(self.temp_path, "wb")
+        self.size = self._file.tell()
+
+    @property
+    def closed(self) -> bool:
+        return self._file is None
+
+    def write(self, data: bytes) -> None:
+        self._file.write(data)
+        self.size += len(data)
+
+    def flush(self) -> None:
+        self._file.flush()
+
+    def close(self) -> None:
+        """Close the file without adding it to the cache, a resumable download is kept on disk."""
+        if self.closed:
+            return
+        self._file.close()
+        self._file = None
+
+    def restart(self) -> None:
+        """Drop what was written, when a download can not be resumed."""
+        self._file.seek(0)
+        self._file.truncate()
+        self.size = 0
+
+    def commit(self, expected_size: Optional[int] = None) -> bool:
+        """Add the file to the cache if it has expected_size bytes, otherwise discard it."""
+        if self.closed:
+            return False
+        if not self.size or (expected_size is not None and self.size != expected_size):
+            self.discard()
+            return False
+
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+        self._file = None
+        try:
+            self.cache._add(self.url, self.temp_path, self.size, self.pinned)
+        except (OSError, sqlite3.Error) as e:
+            Logger.error(f"Could not cache {self.url}: {e}")
+            self._remove_temp()
+            return False
+        return True
+
+    def discard(self) -> None:
+        if self.closed:
+            return
+        self.close()
+        self._remove_temp()
+
+    def _remove_temp(self) -> None:
+        try:
+            os.remove(self.temp_path)
+        except OSError:
+            pass
@@ -0,0 +1,144 @@
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Callable, List, Optional
+import requests
+from utils.logger import Logger
+from .audio_cache import AudioCache
+
+
+class AudioPrefetcher:
+    """
+    Downloads the audio files that will be played next into memory.
+
+    prefetch() is given the window of URLs around the playing one, the current
+    URL first and then the next ones in playback order. Files outside the window
+    are dropped, the missing ones are downloaded on a small thread pool, and the
+    downloaded files are kept within max_bytes, giving up the furthest ones first.
+    get() returns the content of a URL once downloaded, so the player can create
+    its stream from memory instead of opening a network stream at the boundary.
+    URLs already in the audio cache are not downloaded, the player reads them
+    from the cache.
+    """
+
+    def __init__(
+        self,
+        depth: int = 3,
+        max_bytes: int = 32 * 1024 * 1024,
+        max_workers: int = 2,
+        timeout: float = 15,
+        cache: Optional[AudioCache] = None
+    ) -> None:
+        self.depth = depth
+        self.max_bytes = max_bytes
+        self.timeout = timeout
+        self.cache = cache
+        self._entries: "OrderedDict[str, Future]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="AudioPrefetcher")
+        self._session = requests.Session()
+
+    def prefetch(self, urls: List[Optional[str]]) -> None:
+        """Keep the first depth + 1 of urls, the current one and the next depth ones, in memory."""
+        window = [url for url in urls[:self.depth + 1] if url]
+        dropped = []
+        submitted = []
+        with self._lock:
+            for url in list(self._entries):
+                if url not in window:
+                    dropped.append(self._entries.pop(url))
+
+            entries = OrderedDict()
+            for url in window:
+                entry = self._entries.get(url)
+                if entry is None:
+                    try:
+                        entry = self._executor.submit(self._download, url)
+                    except RuntimeError:
+                        # Closed
+                        continue
+                    submitted.append(entry)
+                entries[url] = entry
+            self._entries = entries
+
+        # Outside the lock, the done callbacks of a cancelled or already finished
+        # download run right away on this thread and _trim() takes the lock.
+        for entry in dropped:
+            entry.cancel()
+        for entry in submitted:
+            entry.add_done_callback(lambda _: self._trim())
+
+    def get(self, url: str, wait: float = 5) -> Optional[bytes]:
+        """
+        Return the content of url if it is in the window, waiting up to wait seconds
+        for a download in progress, None if it is not available.
+        """
+        with self._lock:
+            entry = self._entries.get(url)
+        if entry is None:
+            return None
+        try:
+            return entry.result(timeout=wait)
+        except FutureTimeoutError:
+            return None
+        except Exception as e:
+            Logger.error(f"Audio prefetch failed for {url}: {e}")
+            return None
+
+    def when_ready(self, url: str, callback: Callable[[Optional[bytes]], None]) -> None:
+        """
+        Call callback with what get() would return for url once its download
+        finished, on a worker thread so it may open the URL itself.
+        """
+        with self._lock:
+            entry = self._entries.get(url)
+        if entry is None:
+            self._submit(callback, None)
+        else:
+            entry.add_done_callback(lambda _: self._submit(callback, self.get(url, wait=0)))
+
+    def _submit(self, callback: Callable[[Optional[bytes]], None], data: Optional[bytes]) -> None:
+        try:
+            self._executor.submit(callback, data)
+        except RuntimeError:
+            # Closed
+            pass
+
+    def clear(self) -> None:
+        with self._lock:
+            entries = list(self._entries.values())
+            self._entries.clear()
+        for entry in entries:
+            entry.cancel()
+
+    def close(self) -> None:
+        self.clear()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self._session.close()
+
+    def _download(self, url: str) -> Optional[bytes]:
+        if self.cache is not None and self.cache.contains(url):
+            return None
+        with self._session.get(url, stream=True, timeout=self.timeout) as response:
+            response.raise_for_status()
+            if int(response.headers.get("Content-Length", 0)) > self.max_bytes:
+                return None
+
+            data = bytearray()
+            for chunk in response.iter_content(chunk_size=64 * 1024):
+                data += chunk
+                if len(data) > self.max_bytes:
+                    return None
+            return bytes(data)
+
+    def _trim(self) -> None:
+        """Drop the furthest downloaded files until the others fit in max_bytes."""
+        with self._lock:
+            total = 0
+            for url, entry in list(self._entries.items()):
+                if not entry.done() or entry.cancelled() or entry.exception() is not None or entry.result() is None:
+                    continue
+                total += len(entry.result())
+                if total > self.max_bytes:
+                    self._entries.pop(url)
+                    total -= len(entry.result())
@@ -1,9 +1,10 @@
-from .bass_player import AudioPlayer
+from .gapless_player import GaplessPlayer
+from .audio_cache import AudioCache
 from utils.settings import SettingsManager
 
 
-class AyahPlayer(AudioPlayer):
+class AyahPlayer(GaplessPlayer):
     instances = []
     def __init__(self) -> None:
-        super().__init__(SettingsManager.current_settings["audio"]["ayah_volume_level"])    
+        super().__init__(SettingsManager.current_settings["audio"]["ayah_volume_level"], cache=AudioCache.load())    
         AyahPlayer.instances.append(self)
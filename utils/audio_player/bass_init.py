@@ -1,20 +1,64 @@
 import os
 import ctypes
-from ctypes import c_int, c_longlong, c_void_p, c_uint, c_double, c_char_p
-from enum import IntFlag
+import threading
+from ctypes import c_int, c_longlong, c_ulonglong, c_void_p, c_uint, c_double, c_char_p
+from enum import Enum, IntFlag
 from dataclasses import dataclass
-from typing import List
+from typing import Callable, List, Optional
 from exceptions.audio_pplayer import PlaybackInitializationError
+from utils.logger import Logger
 
 
 
 class BassFlag(IntFlag):
+    SAMPLE_FLOAT = 0x100  # 32-bit floating-point sample data
+    STREAM_DECODE = 0x200000  # Decode the data without playing it, read with BASS_ChannelGetData
     AUTO_FREE = 0x40000  # Automatically free the stream when it stops/ends
     STREAM_BLOCK = 0x100000  # Download/play internet file stream in small blocks
     MUSIC_NOSAMPLE = 0x100000
     STREAM_STATUS = 0x800000
     STREAM_RESTRATE = 0x80000
 
+class BassFilePosition(IntFlag):
+    DOWNLOAD = 1  # Amount of the file downloaded
+    END = 2  # Size of the file
+
+
+class BassSync(IntFlag):
+    POS = 0  # Playback reached a position, in bytes
+    END = 2  # Playback reached the end
+    STALL = 6  # Playback stalled waiting for data or resumed, data is 0 when stalled
+    MIXTIME = 0x40000000  # Called when the data is mixed instead of when it is heard
+    ONETIME = 0x80000000  # Removed after being called once
+
+
+BASS_STREAMPROC_END = 0x80000000  # Returned by a STREAMPROC with the last data
+BASS_DATA_AVAILABLE = 0  # Query the amount of data buffered by BASS_ChannelGetData
+BASS_GET_DATA_ERROR = 0xFFFFFFFF
+
+_callback_type = getattr(ctypes, "WINFUNCTYPE", ctypes.CFUNCTYPE)
+# void CALLBACK DownloadProc(const void *buffer, DWORD length, void *user), buffer is NULL once the download ends.
+DOWNLOADPROC = _callback_type(None, c_void_p, c_uint, c_void_p)
+# DWORD CALLBACK StreamProc(HSTREAM handle, void *buffer, DWORD length, void *user), returns the bytes written.
+STREAMPROC = _callback_type(c_uint, c_uint, c_void_p, c_uint, c_void_p)
+# void CALLBACK SyncProc(HSYNC handle, DWORD channel, DWORD data, void *user)
+SYNCPROC = _callback_type(None, c_uint, c_uint, c_uint, c_void_p)
+
+
+class BASS_CHANNELINFO(ctypes.Structure):
+    _fields_ = [
+        ("freq", c_uint),
+        ("chans", c_uint),
+        ("flags", c_uint),
+        ("ctype", c_uint),
+        ("origres", c_uint),
+        ("plugin", c_uint),
+        ("sample", c_uint),
+        ("filename", c_char_p),
+    ]
+
+
+
 class BASS_DEVICEINFO(ctypes.Structure):
     _fields_ = [
         ("name", c_char_p),
@@ -55,6 +99,18 @@ class BassInitializer:
         self.bass.BASS_StreamCreateFile.restype = c_int
         self.bass.BASS_StreamCreateURL.argtypes = [c_void_p, c_int, c_uint, c_void_p, c_void_p]
         self.bass.BASS_StreamCreateURL.restype = c_int
+        self.bass.BASS_StreamGetFilePosition.argtypes = [c_int, c_uint]
+        self.bass.BASS_StreamGetFilePosition.restype = c_ulonglong
+        self.bass.BASS_StreamCreate.argtypes = [c_uint, c_uint, c_uint, c_void_p, c_void_p]
+        self.bass.BASS_StreamCreate.restype = c_int
+        self.bass.BASS_ChannelGetData.argtypes = [c_int, c_void_p, c_uint]
+        self.bass.BASS_ChannelGetData.restype = c_uint
+        self.bass.BASS_ChannelGetInfo.argtypes = [c_int, c_void_p]
+        self.bass.BASS_ChannelGetInfo.restype = c_int
+        self.bass.BASS_ChannelSetSync.argtypes = [c_int, c_uint, c_ulonglong, c_void_p, c_void_p]
+        self.bass.BASS_ChannelSetSync.restype = c_uint
+        self.bass.BASS_ChannelRemoveSync.argtypes = [c_int, c_uint]
+        self.bass.BASS_ChannelRemoveSync.restype = c_int
         self.bass.BASS_ChannelBytes2Seconds.argtypes = [c_int, c_longlong]
         self.bass.BASS_ChannelBytes2Seconds.restype = c_double
         self.bass.BASS_ChannelSeconds2Bytes.argtypes = [c_int, c_double]
@@ -106,3 +162,84 @@ class BassInitializer:
         """Shuts down and frees resources used by BASS."""
         if self.bass:
             self.bass.BASS_Free()
+
+
+class BassState(Enum):
+    NOT_READY = 0
+    INITIALIZING = 1
+    READY = 2
+
+
+class BassBackend:
+    """
+    BASS, loaded and initialized on first use instead of at import.
+
+    Getting a BASS function from the backend initializes BASS if it is not ready,
+    so it is used like the library itself. start() initializes it on a background
+    thread, once the main window is shown, and a playback request made meanwhile
+    waits for it to finish. If initialization fails, the backend goes back to
+    NOT_READY and the next request tries again.
+    """
+
+    def __init__(self, bass_library_path: str = "bass.dll") -> None:
+        self.bass_library_path = bass_library_path
+        self.initializer: Optional[BassInitializer] = None
+        self.state = BassState.NOT_READY
+        self._lock = threading.Lock()
+
+    @property
+    def is_ready(self) -> bool:
+        return self.state == BassState.READY
+
+    def start(self, on_ready: Optional[Callable[[], None]] = None) -> None:
+        """Initialize BASS on a background thread, on_ready is called on it once BASS is ready."""
+        def run() -> None:
+            try:
+                self.initialize()
+            except PlaybackInitializationError as e:
+                Logger.error(str(e))
+                return
+            if on_ready is not None:
+                on_ready()
+
+        threading.Thread(target=run, name="BassBackend", daemon=True).start()
+
+    def initialize(self):
+        """Load and initialize BASS if it is not ready, returns the library."""
+        with self._lock:
+            if self.state == BassState.READY:
+                return self.initializer.bass
+
+            self.state = BassState.INITIALIZING
+            try:
+                initializer = BassInitializer(self.bass_library_path)
+                bass = initializer.initialize()
+            except PlaybackInitializationError:
+                self.state = BassState.NOT_READY
+                raise
+            except Exception as e:
+                self.state = BassState.NOT_READY
+                raise PlaybackInitializationError(cause=e)
+
+            self.initializer = initializer
+            self.state = BassState.READY
+            return bass
+
+    def __getattr__(self, name: str):
+        if not name.startswith("BASS_"):
+            raise AttributeError(name)
+        function = getattr(self.initialize(), name)
+        # Later lookups find it on the instance without going through initialize().
+        setattr(self, name, function)
+        return function
+
+    def close(self) -> None:
+        """Free BASS if it was initialized."""
+        with self._lock:
+            if self.state != BassState.READY:
+                return
+            self.initializer.close()
+            self.initializer = None
+            self.state = BassState.NOT_READY
+            for name in [name for name in vars(self) if name.startswith("BASS_")]:
+                delattr(self, name)
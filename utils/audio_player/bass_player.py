@@ -1,63 +1,203 @@
 import os
 import time
 import ctypes
-from typing import List, Optional
+import threading
+from typing import Callable, List, Optional, Tuple
 from urllib.parse import urlparse
 from .status import PlaybackStatus
-from .bass_init import BassInitializer, BassFlag
+from .bass_init import BassBackend, BassFlag, BassFilePosition, BassSync, DOWNLOADPROC, SYNCPROC
+from .audio_cache import AudioCache, CacheWriter
 from exceptions.audio_pplayer import (
     AudioFileNotFoundError, LoadFileError, UnsupportedFormatError, PlaybackControlError,
     InvalidSourceError, PlaybackInitializationError, PlaybackControlError
 )
 
-bass_initializer = BassInitializer()
-bass = bass_initializer.initialize()
+# Initialized on the first playback or by bass.start(), until then players have no channel and report STOPPED.
+bass = BassBackend()
+
+
+class StreamRecorder:
+    """
+    Saves a URL stream to the audio cache as BASS downloads it.
+
+    The download callback runs on a BASS thread and may see the end of the
+    download before BASS_StreamCreateURL returns the channel, the file is
+    committed once both are known and only if the whole file was downloaded.
+    """
+
+    def __init__(self, writer: CacheWriter) -> None:
+        self.writer = writer
+        self.channel: Optional[int] = None
+        self.finished = False
+        self._lock = threading.Lock()
+        # Referenced for as long as BASS may call it.
+        self.callback = DOWNLOADPROC(self.on_download)
+
+    def on_download(self, buffer, length, user) -> None:
+        with self._lock:
+            if self.writer.closed:
+                return
+            if buffer:
+                try:
+                    self.writer.write(ctypes.string_at(buffer, length))
+                except OSError:
+                    self.writer.discard()
+            else:
+                self.finished = True
+                self._commit()
+
+    def set_channel(self, channel: int) -> None:
+        with self._lock:
+            self.channel = channel
+            self._commit()
+
+    def discard(self) -> None:
+        with self._lock:
+            self.writer.discard()
+
+    def _commit(self) -> None:
+        if self.finished and self.channel:
+            downloaded = bass.BASS_StreamGetFilePosition(self.channel, BassFilePosition.DOWNLOAD)
+            size = bass.BASS_StreamGetFilePosition(self.channel, BassFilePosition.END)
+            self.writer.commit(size if downloaded == size else -1)
+
 
 class AudioPlayer:
     instances = []
 
-    def __init__(self, volume: float, flag: int = BassFlag.AUTO_FREE) -> None:
+    def __init__(self, volume: float, flag: int = BassFlag.AUTO_FREE, cache: Optional[AudioCache] = None) -> None:
         self.source: Optional[str] = None
         self.current_channel: Optional[int] = None
+        # BASS reads memory streams in place, the buffer must outlive the channel.
+        self._memory: Optional[ctypes.Array] = None
+        self.cache = cache
+        self._recorder: Optional[StreamRecorder] = None
         self.volume = volume
         self.supported_extensions = ('.wav', '.mp3', '.ogg')
         self.flag = flag
+        # Playback events, called on a BASS thread with the channel they happened on.
+        self.on_end: Optional[Callable[[int], None]] = None
+        self.on_stall: Optional[Callable[[int, bool], None]] = None
+        self.on_loop: Optional[Callable[[int], None]] = None
+        self._loop_sync = 0
+        self._loop_start = 0
+        self._seamless_loop = True
+        # Referenced for as long as BASS may call them.
+        self._end_proc = SYNCPROC(self._on_end_sync)
+        self._stall_proc = SYNCPROC(self._on_stall_sync)
+        self._loop_proc = SYNCPROC(self._on_loop_sync)
         AudioPlayer.instances.append(self)
     
-    def load_audio(self, source: str, attempts: Optional[int] = 3) -> None:
-        """Loads an audio file or a URL for playback."""
+    def load_audio(self, source: str, attempts: Optional[int] = 3, data: Optional[bytes] = None) -> None:
+        """
+        Loads an audio file or a URL for playback, data is the already downloaded content of source.
+        With a cache, URLs are played from their cached file when there is one, and added to it otherwise.
+        """
 
         # Stop and release the previous file
         if self.current_channel:
             self.stop()  
 
-        if not isinstance(source, str) or not source:
-            raise InvalidSourceError(source)
-
-        file_name, file_extension = os.path.splitext(source)
-        if file_extension.lower() not in self.supported_extensions:
-            raise UnsupportedFormatError(file_extension)
-
-        parsed_url = urlparse(source)
-        if parsed_url.scheme in ("http", "https") and parsed_url.netloc:
-            # Stream from URL
-            self.current_channel = bass.BASS_StreamCreateURL(source.encode(), 0, self.flag, None, None)
-        else:
-            # Load from local file
-            if not os.path.isfile(source):
-                raise AudioFileNotFoundError(source)
-            self.current_channel = bass.BASS_StreamCreateFile(False, source.encode('utf-8'), 0, 0, self.flag)
+        self.current_channel, self._memory = self._create_stream(source, data, self.flag, record=True)
 
         if not self.current_channel:
+            self._memory = None
             if attempts:
                 print(f"Trying too load: {source}.")
                 time.sleep(0.1)
+                # A download that BASS can not decode is retried from the source.
                 return self.load_audio(source, attempts - 1)
             raise LoadFileError(source)
         
         self.source = source
         self.set_volume(self.volume) 
+        self._set_syncs()
     
+    def _create_stream(self, source: str, data: Optional[bytes], flag: int, record: bool = False) -> Tuple[int, Optional[ctypes.Array]]:
+        """
+        Create a BASS stream for source, returns its handle, 0 on failure, and the
+        memory it reads from, which must be kept for as long as the stream exists.
+        With record, a URL stream is saved to the cache as it downloads.
+        """
+        if not isinstance(source, str) or not source:
+            raise InvalidSourceError(source)
+
+        file_name, file_extension = os.path.splitext(source)
+        if file_extension.lower() not in self.supported_extensions:
+            raise UnsupportedFormatError(file_extension)
+
+        parsed_url = urlparse(source)
+        is_url = parsed_url.scheme in ("http", "https") and parsed_url.netloc
+        cached_file = self.cache.get_path(source) if self.cache and is_url else None
+        if cached_file:
+            # Load from the cache
+            return bass.BASS_StreamCreateFile(False, cached_file.encode('utf-8'), 0, 0, flag), None
+
+        if data:
+            # Stream from memory
+            memory = (ctypes.c_char * len(data)).from_buffer_copy(data)
+            handle = bass.BASS_StreamCreateFile(True, ctypes.addressof(memory), 0, len(data), flag)
+            if handle and self.cache and is_url:
+                self.cache.store(source, data)
+            return handle, memory
+
+        if is_url:
+            # Stream from URL
+            if record and self.cache:
+                self._recorder = StreamRecorder(self.cache.open_writer(source))
+                handle = bass.BASS_StreamCreateURL(source.encode(), 0, flag, self._recorder.callback, None)
+                if handle:
+                    self._recorder.set_channel(handle)
+                else:
+                    self._release_recorder()
+                return handle, None
+            return bass.BASS_StreamCreateURL(source.encode(), 0, flag, None, None), None
+
+        # Load from local file
+        if not os.path.isfile(source):
+            raise AudioFileNotFoundError(source)
+        return bass.BASS_StreamCreateFile(False, source.encode('utf-8'), 0, 0, flag), None
+
+    def _set_syncs(self) -> None:
+        bass.BASS_ChannelSetSync(self.current_channel, BassSync.END, 0, self._end_proc, None)
+        bass.BASS_ChannelSetSync(self.current_channel, BassSync.STALL, 0, self._stall_proc, None)
+
+    def _on_end_sync(self, sync, channel, data, user) -> None:
+        if self.on_end is not None:
+            self.on_end(channel)
+
+    def _on_stall_sync(self, sync, channel, data, user) -> None:
+        if self.on_stall is not None:
+            self.on_stall(channel, data == 0)
+
+    def set_loop(self, start: float, end: float, seamless: bool = True) -> bool:
+        """
+        Loop playback between start and end seconds. A seamless loop jumps back to
+        start in the mixing thread, on the exact sample of end. Otherwise on_loop is
+        called when end is heard and the caller restarts the loop itself.
+        """
+        self.clear_loop()
+        if not self.current_channel or end <= start:
+            return False
+
+        self._loop_start = bass.BASS_ChannelSeconds2Bytes(self.current_channel, start)
+        self._seamless_loop = seamless
+        sync_type = BassSync.POS | BassSync.MIXTIME if seamless else BassSync.POS
+        end_position = bass.BASS_ChannelSeconds2Bytes(self.current_channel, end)
+        self._loop_sync = bass.BASS_ChannelSetSync(self.current_channel, sync_type, end_position, self._loop_proc, None)
+        return bool(self._loop_sync)
+
+    def clear_loop(self) -> None:
+        if self._loop_sync:
+            bass.BASS_ChannelRemoveSync(self.current_channel, self._loop_sync)
+            self._loop_sync = 0
+
+    def _on_loop_sync(self, sync, channel, data, user) -> None:
+        if self._seamless_loop:
+            bass.BASS_ChannelSetPosition(channel, self._loop_start, 0)
+        if self.on_loop is not None:
+            self.on_loop(channel)
+
     def play(self) -> None:
         """Plays the currently loaded audio."""
         if not self.current_channel:
@@ -75,6 +215,15 @@ class AudioPlayer:
             bass.BASS_ChannelStop(self.current_channel)
             bass.BASS_StreamFree(self.current_channel)
             self.current_channel = None
+            self._memory = None
+        self._loop_sync = 0
+        self._release_recorder()
+
+    def _release_recorder(self) -> None:
+        """Drop the recorder of the previous URL stream, its file is discarded unless already committed."""
+        if self._recorder is not None:
+            self._recorder.discard()
+            self._recorder = None
 
     def set_volume(self, volume: float) -> None:        
         """Sets the playback volume (0.0 to 1.0)."""    
@@ -179,5 +328,5 @@ class AudioPlayer:
         return self.get_playback_status() == PlaybackStatus.STOPPED   
     
     def get_error(self) -> int:
-        return bass.BASS_ErrorGetCode()
+        return bass.BASS_ErrorGetCode() if bass.is_ready else 0
     
@@ -0,0 +1,218 @@
+import hashlib
+import re
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Deque, Dict, Iterable, List, Optional, Tuple
+import requests
+from utils.logger import Logger
+from .audio_cache import AudioCache, CacheWriter
+
+_content_range_pattern = re.compile(r"bytes (\d+)-\d+/(\d+|\*)")
+
+
+class DownloadCancelled(Exception):
+    pass
+
+
+class DownloadVerificationError(Exception):
+    pass
+
+
+@dataclass(frozen=True)
+class DownloadProgress:
+    total_files: int
+    completed_files: int
+    failed_files: int
+    # Stopped by cancel(), kept to be resumed, not counted as failed.
+    cancelled_files: int
+    downloaded_bytes: int
+    # Bytes per second over the last seconds.
+    throughput: float
+
+    @property
+    def finished(self) -> bool:
+        return self.completed_files + self.failed_files + self.cancelled_files >= self.total_files
+
+
+class DownloadManager:
+    """
+    Downloads recitations into the audio cache for offline listening.
+
+    Files are downloaded on a bounded thread pool sharing one requests.Session, so
+    connections to the reciter servers are reused. Each file is written to a
+    resumable file in the cache folder: a download interrupted by an error, a
+    cancel or the program closing continues from where it stopped with a Range
+    request. A file is added to the cache, pinned so that it is never evicted,
+    only once its size matches the size announced by the server, and its sha256
+    when one is given. Files already in the cache are pinned and not downloaded again.
+
+    progress() can be polled from any thread, on_progress is called on the worker
+    threads after each file.
+    """
+
+    chunk_size = 64 * 1024
+    attempts = 3
+    throughput_window = 5
+
+    def __init__(
+        self,
+        cache: AudioCache,
+        max_workers: int = 4,
+        timeout: float = 30,
+        on_progress: Optional[Callable[[DownloadProgress], None]] = None
+    ) -> None:
+        self.cache = cache
+        self.timeout = timeout
+        self.on_progress = on_progress
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="DownloadManager")
+        self._session = requests.Session()
+        self._cancelled = threading.Event()
+        self._lock = threading.Lock()
+        self._futures: List[Future] = []
+        self._completed = 0
+        self._failed: Dict[str, Exception] = {}
+        self._cancelled_files = 0
+        self._downloaded_bytes = 0
+        self._samples: Deque[Tuple[float, int]] = deque()
+
+    def download(self, urls: Iterable[Optional[str]], checksums: Optional[Dict[str, str]] = None) -> None:
+        """Queue urls, checksums maps some of them to their expected sha256 in hex."""
+        checksums = checksums or {}
+        with self._lock:
+            for url in urls:
+                if url:
+                    self._futures.append(self._executor.submit(self._download, url, checksums.get(url)))
+
+    def progress(self) -> DownloadProgress:
+        with self._lock:
+            return self._get_progress()
+
+    @property
+    def failed(self) -> Dict[str, Exception]:
+        with self._lock:
+            return dict(self._failed)
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Wait for the queued downloads, returns False on timeout."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for future in list(self._futures):
+            remaining = None if deadline is None else max(deadline - time.monotonic(), 0)
+            try:
+                future.result(remaining)
+            except Exception:
+                if not future.done():
+                    return False
+        return True
+
+    def cancel(self) -> None:
+        """Stop the downloads, the unfinished files are kept to be resumed later."""
+        self._cancelled.set()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def close(self) -> None:
+        self.cancel()
+        self._session.close()
+
+    def _get_progress(self) -> DownloadProgress:
+        now = time.monotonic()
+        while self._samples and now - self._samples[0][0] > self.throughput_window:
+            self._samples.popleft()
+        elapsed = now - self._samples[0][0] if self._samples else 0
+        throughput = sum(size for _, size in self._samples) / elapsed if elapsed > 0 else 0.0
+        # The futures cancelled by cancel() before they started never call _download().
+        cancelled_files = self._cancelled_files + sum(future.cancelled() for future in self._futures)
+        return DownloadProgress(
+            len(self._futures), self._completed, len(self._failed), cancelled_files, self._downloaded_bytes, throughput
+        )
+
+    def _add_bytes(self, size: int) -> None:
+        with self._lock:
+            self._downloaded_bytes += size
+            self._samples.append((time.monotonic(), size))
+
+    def _download(self, url: str, checksum: Optional[str]) -> None:
+        try:
+            if not self.cache.pin(url):
+                for attempt in range(1, self.attempts + 1):
+                    try:
+                        self._fetch(url, checksum)
+                        break
+                    except (requests.RequestException, DownloadVerificationError) as e:
+                        if attempt == self.attempts or self._cancelled.is_set():
+                            raise
+                        Logger.info(f"Retrying download of {url}: {e}")
+                        time.sleep(attempt)
+        except Exception as e:
+            # After cancel(), the errors of the closed session are cancels too.
+            cancelled = isinstance(e, DownloadCancelled) or self._cancelled.is_set()
+            if not cancelled:
+                Logger.error(f"Download failed for {url}: {e}")
+            with self._lock:
+                if cancelled:
+                    self._cancelled_files += 1
+                else:
+                    self._failed[url] = e
+                progress = self._get_progress()
+        else:
+            with self._lock:
+                self._completed += 1
+                progress = self._get_progress()
+
+        if self.on_progress is not None:
+            self.on_progress(progress)
+
+    def _fetch(self, url: str, checksum: Optional[str]) -> None:
+        writer = self.cache.open_writer(url, resume=True, pinned=True)
+        try:
+            headers = {"Range": f"bytes={writer.size}-"} if writer.size else {}
+            with self._session.get(url, headers=headers, stream=True, timeout=self.timeout) as response:
+                if response.status_code == 416:
+                    # Nothing left after writer.size, the file was complete or changed on the server.
+                    writer.restart()
+                    raise DownloadVerificationError(f"Can not resume {url}")
+                response.raise_for_status()
+
+                expected_size = self._get_expected_size(response, writer)
+                for chunk in response.iter_content(chunk_size=self.chunk_size):
+                    if self._cancelled.is_set():
+                        raise DownloadCancelled(url)
+                    writer.write(chunk)
+                    self._add_bytes(len(chunk))
+
+            if checksum is not None and self._hash_file(writer) != checksum.lower():
+                writer.restart()
+                raise DownloadVerificationError(f"Checksum mismatch for {url}")
+            if not writer.commit(expected_size):
+                raise DownloadVerificationError(f"Size mismatch for {url}")
+        finally:
+            # A failed download stays on disk to be resumed.
+            if writer.size:
+                writer.close()
+            else:
+                writer.discard()
+
+    @staticmethod
+    def _get_expected_size(response: requests.Response, writer: CacheWriter) -> Optional[int]:
+        """Return the full size of the file, restarting the writer if the server ignored the Range request."""
+        if response.status_code == 206:
+            match = _content_range_pattern.match(response.headers.get("Content-Range", ""))
+            if match is None or int(match.group(1)) != writer.size:
+                writer.restart()
+                raise DownloadVerificationError(f"Unexpected Content-Range for {response.url}")
+            return None if match.group(2) == "*" else int(match.group(2))
+
+        writer.restart()
+        content_length = response.headers.get("Content-Length")
+        return int(content_length) if content_length is not None else None
+
+    @staticmethod
+    def _hash_file(writer: CacheWriter) -> str:
+        writer.flush()
+        sha256 = hashlib.sha256()
+        with open(writer.temp_path, "rb") as f:
+            for block in iter(lambda: f.read(1024 * 1024), b""):
+                sha256.update(block)
+        return sha256.hexdigest()
@@ -0,0 +1,207 @@
+import ctypes
+import threading
+import time
+from collections import deque
+from typing import Callable, Deque, Optional
+from .bass_player import AudioPlayer, bass
+from .bass_init import (
+    BassFlag, BassSync, BASS_CHANNELINFO, BASS_STREAMPROC_END, BASS_GET_DATA_ERROR, STREAMPROC, SYNCPROC
+)
+from .audio_cache import AudioCache
+from .status import PlaybackStatus
+from exceptions.audio_pplayer import LoadFileError
+from utils.logger import Logger
+
+
+class Track:
+    """A decoding stream read by GaplessPlayer, start is the output position at which it is heard."""
+
+    def __init__(self, source: str, handle: int, memory: Optional[ctypes.Array], length: int) -> None:
+        self.source = source
+        self.handle = handle
+        self.memory = memory
+        self.length = length
+        self.start = 0
+
+
+class GaplessPlayer(AudioPlayer):
+    """
+    Player that can queue the next file to follow the current one without a gap.
+
+    Files are opened as decoding streams and read by a single output stream: when
+    the current one ends, the output callback continues with the next queued one
+    in the same buffer, so its first sample directly follows the last sample of the
+    previous one. A position sync on the output calls on_track_changed, on a BASS
+    thread, when the next file starts being heard.
+
+    Only files with the sample rate and channels of the first one can be queued,
+    BASS can not resample without the bassmix add-on. Position, length and seeking
+    are those of the file being heard.
+    """
+
+    decode_flag = BassFlag.STREAM_DECODE | BassFlag.SAMPLE_FLOAT
+
+    def __init__(self, volume: float, flag: int = BassFlag.AUTO_FREE, cache: Optional[AudioCache] = None) -> None:
+        super().__init__(volume, flag, cache)
+        self.on_track_changed: Optional[Callable[[str], None]] = None
+        self._lock = threading.RLock()
+        self._reading: Optional[Track] = None
+        self._playing: Optional[Track] = None
+        self._queue: Deque[Track] = deque()
+        # Tracks read by the output but not heard yet.
+        self._pending: Deque[Track] = deque()
+        self._format = (0, 0)
+        self._produced = 0
+        self._ended = True
+        # Referenced for as long as BASS may call them.
+        self._stream_proc = STREAMPROC(self._fill)
+        self._sync_proc = SYNCPROC(self._on_sync)
+
+    def load_audio(self, source: str, attempts: Optional[int] = 3, data: Optional[bytes] = None) -> None:
+        """Loads an audio file or a URL for playback, dropping the queued ones."""
+        if self.current_channel:
+            self.stop()
+
+        track = self._open_track(source, data, record=True)
+        if track is None:
+            if attempts:
+                Logger.info(f"Retrying to load {source}, BASS error {self.get_error()}.")
+                time.sleep(0.1)
+                return self.load_audio(source, attempts - 1)
+            raise LoadFileError(source)
+
+        info = BASS_CHANNELINFO()
+        bass.BASS_ChannelGetInfo(track.handle, ctypes.byref(info))
+        with self._lock:
+            self._reading = self._playing = track
+            self._format = (info.freq, info.chans)
+            self._produced = 0
+            self._ended = False
+
+        self.current_channel = bass.BASS_StreamCreate(info.freq, info.chans, self.flag | BassFlag.SAMPLE_FLOAT, self._stream_proc, None)
+        if not self.current_channel:
+            self.stop()
+            raise LoadFileError(source)
+
+        self.source = source
+        self.set_volume(self.volume)
+        self._set_syncs()
+
+    def enqueue(self, source: str, data: Optional[bytes] = None, after: Optional[str] = None) -> bool:
+        """
+        Queue source to be played right after the last queued file, only if it is
+        after when given. Returns False if it can not be played without a gap.
+        """
+        with self._lock:
+            if self._ended or not self._is_last(after):
+                return False
+
+        track = self._open_track(source, data)
+        if track is None:
+            return False
+
+        info = BASS_CHANNELINFO()
+        bass.BASS_ChannelGetInfo(track.handle, ctypes.byref(info))
+        with self._lock:
+            if (info.freq, info.chans) == self._format and not self._ended and self._is_last(after):
+                self._queue.append(track)
+                return True
+
+        bass.BASS_StreamFree(track.handle)
+        return False
+
+    def _is_last(self, source: Optional[str]) -> bool:
+        if source is None:
+            return True
+        last = self._queue[-1] if self._queue else self._reading
+        return last is not None and last.source == source
+
+    def _open_track(self, source: str, data: Optional[bytes], record: bool = False) -> Optional[Track]:
+        handle, memory = self._create_stream(source, data, self.decode_flag, record)
+        if not handle:
+            return None
+        return Track(source, handle, memory, bass.BASS_ChannelGetLength(handle, 0))
+
+    def _fill(self, handle, buffer, length, user) -> int:
+        """STREAMPROC of the output, reads the queued tracks one after the other."""
+        written = 0
+        with self._lock:
+            while written < length and self._reading is not None:
+                track = self._reading
+                read = bass.BASS_ChannelGetData(track.handle, buffer + written, length - written)
+                if read != BASS_GET_DATA_ERROR and read > 0:
+                    written += read
+                    continue
+                if read != BASS_GET_DATA_ERROR and bass.BASS_ChannelIsActive(track.handle) != PlaybackStatus.STOPPED.value:
+                    # A URL waiting for more data, the output stalls until it comes.
+                    break
+
+                bass.BASS_StreamFree(track.handle)
+                track.memory = None
+                self._reading = self._queue.popleft() if self._queue else None
+                if self._reading is not None:
+                    self._reading.start = self._produced + written
+                    self._pending.append(self._reading)
+                    bass.BASS_ChannelSetSync(handle, BassSync.POS | BassSync.ONETIME, self._reading.start, self._sync_proc, None)
+
+            self._produced += written
+            if self._reading is None:
+                self._ended = True
+                return written | BASS_STREAMPROC_END
+        return written
+
+    def _on_sync(self, sync, channel, data, user) -> None:
+        with self._lock:
+            if not self._pending:
+                return
+            self._playing = self._pending.popleft()
+            self.source = self._playing.source
+        if self.on_track_changed is not None:
+            self.on_track_changed(self.source)
+
+    def stop(self) -> None:
+        with self._lock:
+            tracks = list(self._queue)
+            if self._reading is not None:
+                tracks.append(self._reading)
+            for track in tracks:
+                bass.BASS_StreamFree(track.handle)
+                track.memory = None
+            self._queue.clear()
+            self._pending.clear()
+            self._reading = self._playing = None
+            self._ended = True
+        super().stop()
+
+    def get_length(self) -> float:
+        with self._lock:
+            track = self._playing
+        if not self.current_channel or track is None:
+            return 0
+        return bass.BASS_ChannelBytes2Seconds(self.current_channel, track.length)
+
+    def get_position(self) -> float:
+        with self._lock:
+            track = self._playing
+        if not self.current_channel or track is None:
+            return 0
+        position = bass.BASS_ChannelGetPosition(self.current_channel, 0) - track.start
+        return bass.BASS_ChannelBytes2Seconds(self.current_channel, max(position, 0))
+
+    def set_position(self, new_seconds: float) -> bool:
+        """Seek in the file being heard, not possible once the next one is being read."""
+        with self._lock:
+            track = self._playing
+            if not self.current_channel or track is None or track is not self._reading:
+                return False
+            new_seconds = max(0.0, min(new_seconds, self.get_length() - 1))
+            new_position = bass.BASS_ChannelSeconds2Bytes(self.current_channel, new_seconds)
+            if not bass.BASS_ChannelSetPosition(track.handle, new_position, 0):
+                return False
+            # What the output already buffered is heard first.
+            track.start = self._produced - new_position
+            return True
+
+    def set_loop(self, start: float, end: float, seamless: bool = True) -> bool:
+        """Not supported, positions of the output do not belong to a single file."""
+        return False
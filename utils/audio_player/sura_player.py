@@ -1,9 +1,10 @@
 from .bass_player import AudioPlayer
+from .audio_cache import AudioCache
 from utils.settings import SettingsManager
 
 
 class SurahPlayer(AudioPlayer):
     instances = []
     def __init__(self) -> None:
-        super().__init__(SettingsManager.current_settings["audio"]["surah_volume_level"])    
+        super().__init__(SettingsManager.current_settings["audio"]["surah_volume_level"], cache=AudioCache.load())    
         SurahPlayer.instances.append(self)
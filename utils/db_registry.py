@@ -0,0 +1,65 @@
+import os
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, Tuple, Union
+from exceptions.database import DBNotFoundError, DatabaseConnectionError
+
+
+class DatabaseRegistry:
+    """
+    Opens every database once per thread and hands out the same connection afterwards.
+
+    sqlite3 connections can not be shared between threads, so each thread gets its
+    own. Bundled databases are opened read-only and immutable, which lets SQLite
+    skip locking and change detection, and the statement cache of a long-lived
+    connection means repeated queries are prepared only once.
+    """
+
+    cached_statements = 256
+    _local = threading.local()
+
+    @classmethod
+    def _get_connections(cls) -> Dict[Tuple[str, bool], sqlite3.Connection]:
+        connections = getattr(cls._local, "connections", None)
+        if connections is None:
+            connections = cls._local.connections = {}
+        return connections
+
+    @classmethod
+    def get(cls, file_path: Union[str, os.PathLike], read_only: bool = True) -> sqlite3.Connection:
+        """
+        Return this thread's connection to file_path, rows are sqlite3.Row.
+        read_only is for the bundled databases, which never change while the app runs;
+        writable databases are created if they do not exist.
+        """
+        file_path = os.path.abspath(file_path)
+        key = (file_path, read_only)
+        connections = cls._get_connections()
+        conn = connections.get(key)
+        if conn is not None:
+            return conn
+
+        if read_only and not os.path.isfile(file_path):
+            raise DBNotFoundError(file_path)
+
+        try:
+            if read_only:
+                uri = f"{Path(file_path).as_uri()}?mode=ro&immutable=1"
+                conn = sqlite3.connect(uri, uri=True, cached_statements=cls.cached_statements)
+            else:
+                conn = sqlite3.connect(file_path, cached_statements=cls.cached_statements)
+        except sqlite3.Error as e:
+            raise DatabaseConnectionError(file_path, e)
+
+        conn.row_factory = sqlite3.Row
+        connections[key] = conn
+        return conn
+
+    @classmethod
+    def close_all(cls) -> None:
+        """Close the connections opened by the calling thread."""
+        connections = cls._get_connections()
+        for conn in connections.values():
+            conn.close()
+        connections.clear()
@@ -0,0 +1,58 @@
+import importlib
+import threading
+from typing import Any, List
+from utils.logger import Logger
+
+
+class LazyImport:
+    """
+    A class or function of a module that is imported on first use.
+
+    Dialogs and the subsystems behind them are declared with LazyImport instead
+    of being imported at the top of the main window modules, so their modules
+    and dependencies load when they are first opened rather than before the
+    main window is shown. Calling the object, or getting an attribute from it,
+    imports the module and forwards to the real object.
+
+    warm_up() imports every declared module on a background thread, once the
+    main window is idle, so the first opening does not wait for the import.
+    """
+
+    _instances: List["LazyImport"] = []
+
+    def __init__(self, module_name: str, attribute: str) -> None:
+        self.module_name = module_name
+        self.attribute = attribute
+        self._target = None
+        LazyImport._instances.append(self)
+
+    def load(self) -> Any:
+        if self._target is None:
+            # importlib holds a lock per module, a warm-up in progress is waited for.
+            self._target = getattr(importlib.import_module(self.module_name), self.attribute)
+        return self._target
+
+    def __call__(self, *args, **kwargs) -> Any:
+        return self.load()(*args, **kwargs)
+
+    def __getattr__(self, name: str) -> Any:
+        if name.startswith("__"):
+            raise AttributeError(name)
+        return getattr(self.load(), name)
+
+    def __repr__(self) -> str:
+        return f"LazyImport({self.module_name}.{self.attribute})"
+
+    @classmethod
+    def warm_up(cls) -> threading.Thread:
+        """Import every declared module on a background thread."""
+        def run() -> None:
+            for lazy_import in list(cls._instances):
+                try:
+                    lazy_import.load()
+                except Exception as e:
+                    Logger.error(f"Could not preload {lazy_import.module_name}: {e}")
+
+        thread = threading.Thread(target=run, name="LazyImportWarmUp", daemon=True)
+        thread.start()
+        return thread
@@ -1,4 +1,7 @@
 import os
+import atexit
+import threading
+import time
 import configparser
 from utils.const import albayan_folder
 
@@ -7,6 +10,16 @@ class SettingsManager:
     path = os.path.join(albayan_folder, "config.ini")
     config = configparser.ConfigParser()
 
+    # Changes are written to config.ini once no setting changed for flush_delay
+    # seconds, and at most max_flush_delay seconds after the first unsaved change.
+    flush_delay = 1.0
+    max_flush_delay = 5.0
+    _dirty = set()
+    _dirty_since = None
+    _flush_at = 0.0
+    _flush_timer = None
+    _lock = threading.RLock()
+
     default_settings = {
         "general": {
             "language": "Arabic",
@@ -14,7 +27,8 @@ class SettingsManager:
             "auto_start_enabled": False,
             "auto_save_position_enabled": False,
             "check_update_enabled": True,
-            "logging_enabled": True
+            "logging_enabled": True,
+            "preload_in_background_enabled": True
         },
         "audio": {
             "sound_effect_enabled": True,
@@ -29,7 +43,10 @@ class SettingsManager:
         "listening": {
             "reciter": 58,
             "action_after_listening": 0,
-            "forward_time": 5
+            "forward_time": 5,
+            "prefetch_count": 3,
+            "prefetch_memory_limit": 32,
+            "audio_cache_limit": 1024
         },
         "search": {
             "ignore_tashkeel": True,
@@ -46,51 +63,120 @@ class SettingsManager:
     }
 
     @classmethod
-    def write_settings(cls, new_settings: dict, is_reading: bool = False) -> None:
-        try:
-            cls.config.read_dict(new_settings)
-            with open(cls.path, "w", encoding='utf-8') as config_file:
-                cls.config.write(config_file)
-            if not is_reading:
-                cls._current_settings = cls.read_settings()
-        except Exception as e:
-            print(e)
+    def write_settings(cls, new_settings: dict) -> None:
+        """Update the settings in memory, config.ini is written shortly after by flush()."""
+        with cls._lock:
+            current_settings = cls.current_settings
+            for section, settings in new_settings.items():
+                if not cls.config.has_section(section):
+                    cls.config.add_section(section)
+                for setting, value in settings.items():
+                    value = str(value)
+                    if cls.config.get(section, setting, fallback=None) == value:
+                        continue
+                    cls.config.set(section, setting, value)
+                    cls._dirty.add((section, setting))
+                    default_value = cls.default_settings.get(section, {}).get(setting)
+                    if default_value is not None:
+                        try:
+                            current_settings[section][setting] = cls._get_value(section, setting, default_value)
+                        except ValueError as e:
+                            print(e)
+            cls._schedule_flush()
 
     @classmethod
     def read_settings(cls) -> dict:
-        try:
-            cls.config.read(cls.path, encoding='utf-8')
-        except configparser.Error as e:
-            print(e)
-
-        current_settings = {}
-        for section in cls.default_settings:
-            current_settings[section] = {}
-            for setting, default_value in cls.default_settings[section].items():
-                try:
-                    if isinstance(default_value, bool):
-                        current_settings[section][setting] = cls.config.getboolean(
-                            section, setting)
-                    elif isinstance(default_value, int):
-                        current_settings[section][setting] = cls.config.getint(
-                            section, setting)
-                    elif isinstance(default_value, float):
-                        current_settings[section][setting] = cls.config.getfloat(
-                            section, setting)
-                    else:
-                        current_settings[section][setting] = cls.config.get(
-                            section, setting)
-                except Exception as e:
-                    print(e)
-                    cls.write_settings(
-                        {section: {setting: default_value}}, is_reading=True)
-                    current_settings[section][setting] = default_value
-
-        return current_settings
+        with cls._lock:
+            try:
+                cls.config.read(cls.path, encoding='utf-8')
+            except configparser.Error as e:
+                print(e)
+
+            current_settings = {}
+            for section in cls.default_settings:
+                current_settings[section] = {}
+                if not cls.config.has_section(section):
+                    cls.config.add_section(section)
+                for setting, default_value in cls.default_settings[section].items():
+                    try:
+                        current_settings[section][setting] = cls._get_value(section, setting, default_value)
+                    except Exception as e:
+                        print(e)
+                        # Missing settings are written all together by one flush.
+                        cls.config.set(section, setting, str(default_value))
+                        cls._dirty.add((section, setting))
+                        current_settings[section][setting] = default_value
+
+            cls._schedule_flush()
+            return current_settings
+
+    @classmethod
+    def _get_value(cls, section: str, setting: str, default_value):
+        if isinstance(default_value, bool):
+            return cls.config.getboolean(section, setting)
+        elif isinstance(default_value, int):
+            return cls.config.getint(section, setting)
+        elif isinstance(default_value, float):
+            return cls.config.getfloat(section, setting)
+        else:
+            return cls.config.get(section, setting)
+
+    @classmethod
+    def _schedule_flush(cls) -> None:
+        with cls._lock:
+            if not cls._dirty:
+                return
+            now = time.monotonic()
+            if cls._dirty_since is None:
+                cls._dirty_since = now
+            cls._flush_at = min(now + cls.flush_delay, cls._dirty_since + cls.max_flush_delay)
+            # A pending timer is reused, it waits again until _flush_at when it fires early.
+            if cls._flush_timer is None:
+                cls._start_flush_timer(cls._flush_at - now)
+
+    @classmethod
+    def _start_flush_timer(cls, delay: float) -> None:
+        cls._flush_timer = threading.Timer(max(delay, 0), cls._on_flush_timer)
+        cls._flush_timer.daemon = True
+        cls._flush_timer.start()
+
+    @classmethod
+    def _on_flush_timer(cls) -> None:
+        with cls._lock:
+            if threading.current_thread() is not cls._flush_timer:
+                return
+            remaining = cls._flush_at - time.monotonic()
+            if remaining > 0:
+                cls._start_flush_timer(remaining)
+                return
+            cls.flush()
+
+    @classmethod
+    def flush(cls) -> None:
+        """Write the unsaved settings to config.ini, replacing it atomically."""
+        with cls._lock:
+            if cls._flush_timer is not None:
+                cls._flush_timer.cancel()
+                cls._flush_timer = None
+            if not cls._dirty:
+                return
+            temp_path = f"{cls.path}.tmp"
+            try:
+                with open(temp_path, "w", encoding='utf-8') as config_file:
+                    cls.config.write(config_file)
+                    config_file.flush()
+                    os.fsync(config_file.fileno())
+                os.replace(temp_path, cls.path)
+            except Exception as e:
+                print(e)
+                return
+            cls._dirty.clear()
+            cls._dirty_since = None
 
     @classmethod
     def reset_settings(cls) -> None:
         cls.write_settings(cls.default_settings)
+        cls.flush()
 
     @classmethod
     @property
@@ -98,3 +184,7 @@ class SettingsManager:
         if not hasattr(cls, "_current_settings"):
             cls._current_settings = cls.read_settings()
         return cls._current_settings
+
+
+# Unsaved settings are written once when the program exits.
+atexit.register(SettingsManager.flush)
@@ -0,0 +1,130 @@
+import builtins
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from importlib.util import resolve_name
+from typing import Iterator, List, Optional
+
+
+class StartupProfiler:
+    """
+    Records where startup time goes when the program runs with --profile-startup.
+
+    Every module imported for the first time is timed through builtins.__import__,
+    with its cumulative time and its self time, without the modules it imported.
+    The init phases are timed with phase() and single moments, such as the first
+    paint, are recorded with mark(). finish() writes everything as JSON to the
+    path given with --profile-startup=<path>, or to startup_profile.json in the
+    albayan folder. Times are in milliseconds since enable().
+
+    Without the option every method returns immediately, so the calls stay in
+    the startup code.
+    """
+
+    option = "--profile-startup"
+    enabled = False
+    report_path: Optional[str] = None
+    _start = 0.0
+    _imports: List[dict] = []
+    _phases: List[dict] = []
+    _marks: dict = {}
+    _original_import = None
+    _local = threading.local()
+
+    @classmethod
+    def enable_from_args(cls, argv: List[str]) -> bool:
+        """Enable profiling if argv has the option, call it before the imports to measure."""
+        for argument in argv:
+            if argument == cls.option or argument.startswith(cls.option + "="):
+                cls.report_path = argument.partition("=")[2] or None
+                cls.enable()
+                break
+        return cls.enabled
+
+    @classmethod
+    def enable(cls) -> None:
+        if cls.enabled:
+            return
+        cls.enabled = True
+        cls._start = time.perf_counter()
+        cls._original_import = builtins.__import__
+        builtins.__import__ = cls._import
+
+    @classmethod
+    def _elapsed(cls, since: Optional[float] = None) -> float:
+        return round(((since or time.perf_counter()) - cls._start) * 1000, 3)
+
+    @classmethod
+    def _import(cls, name, globals=None, locals=None, fromlist=(), level=0):
+        try:
+            module_name = resolve_name("." * level + name, (globals or {}).get("__package__")) if level else name
+        except (ImportError, ValueError):
+            module_name = name
+        if module_name in sys.modules:
+            return cls._original_import(name, globals, locals, fromlist, level)
+
+        stack = cls._local.__dict__.setdefault("stack", [])
+        stack.append(0.0)
+        start = time.perf_counter()
+        try:
+            return cls._original_import(name, globals, locals, fromlist, level)
+        finally:
+            elapsed = time.perf_counter() - start
+            children = stack.pop()
+            if stack:
+                stack[-1] += elapsed
+            cls._imports.append({
+                "module": module_name,
+                "start": cls._elapsed(start),
+                "cumulative": round(elapsed * 1000, 3),
+                "self": round((elapsed - children) * 1000, 3),
+                "thread": threading.current_thread().name,
+            })
+
+    @classmethod
+    @contextmanager
+    def phase(cls, name: str) -> Iterator[None]:
+        if not cls.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            cls._phases.append({"name": name, "start": cls._elapsed(start), "duration": round((time.perf_counter() - start) * 1000, 3)})
+
+    @classmethod
+    def mark(cls, name: str) -> None:
+        if cls.enabled and name not in cls._marks:
+            cls._marks[name] = cls._elapsed()
+
+    @classmethod
+    def finish(cls) -> Optional[str]:
+        """Stop profiling and write the report, returns its path."""
+        if not cls.enabled:
+            return None
+        builtins.__import__ = cls._original_import
+        cls.enabled = False
+
+        report = {
+            "argv": sys.argv[1:],
+            "python": sys.version,
+            "total": cls._elapsed(),
+            "phases": cls._phases,
+            "marks": cls._marks,
+            "import_total": round(sum(entry["self"] for entry in cls._imports), 3),
+            "imports": sorted(cls._imports, key=lambda entry: entry["cumulative"], reverse=True),
+        }
+
+        if cls.report_path is None:
+            from utils.const import albayan_folder
+            cls.report_path = os.path.join(albayan_folder, "startup_profile.json")
+        # Written under a temporary name so a reader never sees a partial report.
+        temp_path = cls.report_path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        os.replace(temp_path, cls.report_path)
+        return cls.report_path